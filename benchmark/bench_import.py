@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the time taken to import qr, for the short-lived scripts and workers.
+
+Each statement is run in a new interpreter, several times, and the time of an empty interpreter is subtracted. The
+script exits with the status 1 if "import qr" takes more than the budget (in milliseconds), such that a module
+imported eagerly again is noticed.
+
+Usage (from the root of the repository):
+	python benchmark/bench_import.py [--repeat 10] [--budget 50]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+STATEMENTS = (
+	"import qr",
+	"import qr; qr.configure(runtime_type_checks=False)",
+	"from qr import Deadline",
+	"from qr import Info",
+	"from qr import WebEngine",
+	"from qr import Quaero",
+)
+
+
+def measure(statement: str, repeat: int) -> float:
+	"""
+	Return the median number of milliseconds taken by 'statement' in a new interpreter.
+	"""
+	env = dict(os.environ, PYTHONPATH=SRC)
+	durations = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		subprocess.run([sys.executable, "-c", statement], env=env, check=True)
+		durations.append((time.perf_counter() - start) * 1e3)
+	return sorted(durations)[len(durations) // 2]
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--repeat", type=int, default=10, help="number of interpreters started per statement")
+	parser.add_argument("--budget", type=float, default=50., help="maximum number of milliseconds for 'import qr'")
+	args = parser.parse_args()
+	
+	baseline = measure("pass", args.repeat)
+	durations = {statement: measure(statement, args.repeat) - baseline for statement in STATEMENTS}
+	
+	print("{:<56} {:>10}".format("statement", "time (ms)"))
+	for statement, duration in durations.items():
+		print("{:<56} {:>10.1f}".format(statement, duration))
+	
+	if durations["import qr"] > args.budget:
+		print("\n'import qr' takes {:.1f} ms, over the budget of {:.1f} ms".format(durations["import qr"],
+		                                                                        args.budget))
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
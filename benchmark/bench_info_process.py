@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the construction and the processing of Info, on inputs of increasing size.
+
+The time per element must stay constant as the number of elements grows (linear scaling).
+Usage (from the root of the repository):
+	python benchmark/bench_info_process.py [max_elements]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from qr import Info
+
+
+def build_table(n: int) -> list:
+	# Rows of 4 cells, like a table extracted from a web page
+	return [["Title {}".format(i), "Content {}".format(i), i, i / 2] for i in range(n // 4)]
+
+
+def build_nested(n: int) -> list:
+	# Lists of 10 items nested 4 levels deep
+	data = list(range(n))
+	while len(data) > 10:
+		data = [data[i:i + 10] for i in range(0, len(data), 10)]
+	return data
+
+
+def measure(builder, n: int) -> (float, int):
+	data = builder(n)
+	start = time.perf_counter()
+	Info(data=data)
+	elapsed = time.perf_counter() - start
+	
+	# The memory is measured in a second run, as tracemalloc slows down the allocations
+	tracemalloc.start()
+	Info(data=data)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return elapsed, peak
+
+
+def main(max_elements: int = 1000000):
+	print("{:<8} {:>10} {:>12} {:>16} {:>14}".format("input", "elements", "time (s)", "time/element (µs)",
+	                                                   "peak (MiB)"))
+	for builder in (build_table, build_nested):
+		n = 1000
+		while n <= max_elements:
+			elapsed, peak = measure(builder, n)
+			print("{:<8} {:>10} {:>12.3f} {:>16.2f} {:>14.1f}".format(builder.__name__[6:], n, elapsed,
+			                                                            elapsed / n * 1e6, peak / 2 ** 20))
+			n *= 10
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the memory used per instance of WebResult, FrozenWebResult and Info, compared to the same classes
+storing their attributes in a __dict__.
+
+Usage (from the root of the repository):
+	python benchmark/bench_memory.py [instances]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from qr import Info, WebResult
+
+
+class DictWebResult:
+	"""
+	WebResult as it was before using __slots__: same attributes, stored in a __dict__.
+	"""
+	
+	def __init__(self, title, url, thumbnail, date, description, transport=None, thumbnail_store=None):
+		self._transport = transport
+		self._thumbnail_store = thumbnail_store
+		self._title = title
+		self._url = url
+		self._thumbnail = thumbnail
+		self._thumbnail_error = None
+		self._date = date
+		self._description = description
+
+
+class DictInfo:
+	"""
+	Info as it was before using __slots__: same attributes, stored in a __dict__.
+	"""
+	
+	def __init__(self, data, dtype):
+		self._data = data
+		self._dtype = dtype
+		self._strict = False
+		self._summaries = None
+
+
+def measure(build, n: int) -> float:
+	"""
+	Return the number of bytes allocated per instance built by 'build', the attributes being shared.
+	"""
+	tracemalloc.start()
+	before, _ = tracemalloc.get_traced_memory()
+	instances = [build() for _ in range(n)]
+	after, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	# Do not count the list holding the instances
+	return (after - before - sys.getsizeof(instances)) / n
+
+
+def main(n: int = 100000):
+	title, url, thumbnail = "Python debugger", "https://docs.python.org/3/library/pdb.html", "https://python.org/a.png"
+	date, description = "Jan 1, 2019", "The module pdb defines an interactive source code debugger."
+	frozen = WebResult(title, url, thumbnail, date, description).freeze()
+	
+	benchmarks = [
+		("WebResult (__dict__)", lambda: DictWebResult(title, url, thumbnail, date, description)),
+		("WebResult", lambda: WebResult(title, url, thumbnail, date, description)),
+		("FrozenWebResult", lambda: frozen.__class__(title, url, thumbnail, date, description)),
+		("Info (__dict__)", lambda: DictInfo(25, int)),
+		("Info", lambda: Info(data=25, dtype=int, process_data=False)),
+	]
+	print("{:<24} {:>16}".format("class", "bytes/instance"))
+	for name, build in benchmarks:
+		print("{:<24} {:>16.1f}".format(name, measure(build, n)))
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the parsing of the result pages, on the offline corpus of res/test/serp/ (see make_serp_corpus.py).
+
+For each page of each engine, search_html(), search_list_html() and search_list_result() (including the download and
+decoding of the thumbnails) are timed through a transport that replays the corpus, so only the work done by qr is
+measured. The report gives the p50 and p99 of each step, its throughput, and the memory it allocates (peak and
+retained, measured by tracemalloc in a separate run, as tracing slows the code down).
+
+The results are stored in benchmark/results/serp-<version>.json. Give the results of a previous release to --compare
+to list the steps whose p50 has regressed: the script then exits with the status 1 if there is any.
+
+Usage (from the root of the repository):
+	python benchmark/bench_serp.py [--repeat 20] [--parser html.parser] [--output path] [--compare path]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "test"))
+
+import qr
+from qr import WebEngine, prefetch_thumbnails
+
+from serp_fixtures import ENGINES, FixtureTransport, get_queries
+
+
+def get_steps(web_engine: WebEngine, query: str) -> dict:
+	"""
+	Return the steps to time for the given page. The results of the engines other than Google cannot be built yet.
+	"""
+	steps = {
+		"search_html": lambda: web_engine.search_html(query),
+		"search_list_html": lambda: web_engine.search_list_html(query, False),
+	}
+	if web_engine.name.lower() == "google":
+		def search_list_result():
+			results = web_engine.search_list_result(query)
+			prefetch_thumbnails(results)
+			return results
+		
+		steps["search_list_result"] = search_list_result
+	return steps
+
+
+def measure(step, repeat: int) -> dict:
+	# parse_list_html() prints the items of the engines other than Google
+	with contextlib.redirect_stdout(io.StringIO()):
+		step()
+		durations = []
+		for _ in range(repeat):
+			start = time.perf_counter()
+			step()
+			durations.append(time.perf_counter() - start)
+		
+		tracemalloc.start()
+		try:
+			before = tracemalloc.get_traced_memory()[0]
+			value = step()
+			current, peak = tracemalloc.get_traced_memory()
+			del value
+		finally:
+			tracemalloc.stop()
+	
+	durations = np.array(durations) * 1e3
+	return {
+		"p50_ms": float(np.percentile(durations, 50)),
+		"p99_ms": float(np.percentile(durations, 99)),
+		"mean_ms": float(durations.mean()),
+		"pages_per_s": float(1e3 / durations.mean()),
+		"peak_kib": (peak - before) / 1024.,
+		"retained_kib": (current - before) / 1024.,
+	}
+
+
+def run(repeat: int, parser: str) -> dict:
+	transport = FixtureTransport()
+	results = {}
+	for engine, (builder, _) in ENGINES.items():
+		web_engine = builder(transport=transport)
+		web_engine.parser = parser
+		for query in get_queries(engine):
+			for name, step in get_steps(web_engine, query).items():
+				results["{}/{}/{}".format(engine, query, name)] = measure(step, repeat)
+	
+	return {
+		"version": qr.__version__,
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"parser": parser,
+		"repeat": repeat,
+		"date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+		"results": results,
+	}
+
+
+def report(results: dict):
+	print("{:<60} {:>9} {:>9} {:>9} {:>10} {:>10}".format("step", "p50 (ms)", "p99 (ms)", "pages/s", "peak (KiB)",
+	                                                        "kept (KiB)"))
+	for name, r in results["results"].items():
+		print("{:<60} {:>9.2f} {:>9.2f} {:>9.1f} {:>10.1f} {:>10.1f}".format(name, r["p50_ms"], r["p99_ms"],
+		                                                                     r["pages_per_s"], r["peak_kib"],
+		                                                                     r["retained_kib"]))
+
+
+def compare(results: dict, previous: dict, threshold: float) -> list:
+	"""
+	Return the steps whose p50 is more than 'threshold' (relatively) slower than in 'previous'.
+	"""
+	regressions = []
+	print("\nCompared to {} ({}):".format(previous["version"], previous["date"]))
+	for name, r in results["results"].items():
+		old = previous["results"].get(name)
+		if old is None:
+			continue
+		ratio = r["p50_ms"] / old["p50_ms"]
+		flag = "REGRESSION" if ratio > 1. + threshold else ""
+		print("{:<60} {:>9.2f} -> {:>9.2f} ms  x{:.2f} {}".format(name, old["p50_ms"], r["p50_ms"], ratio, flag))
+		if flag:
+			regressions.append(name)
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--repeat", type=int, default=20, help="number of timed runs of each step")
+	parser.add_argument("--parser", default="html.parser", help="HTML parser backend (see qr.HtmlParser)")
+	parser.add_argument("--output", default=None, help="file where the results are stored")
+	parser.add_argument("--compare", default=None, help="results of a previous run to compare with")
+	parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+	args = parser.parse_args()
+	
+	results = run(args.repeat, args.parser)
+	report(results)
+	
+	output = args.output
+	if output is None:
+		output = os.path.join(ROOT, "benchmark", "results", "serp-{}.json".format(qr.__version__))
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	with open(output, 'w') as f:
+		json.dump(results, f, indent="\t")
+	print("\nResults stored in {}".format(os.path.relpath(output)))
+	
+	if args.compare is not None:
+		with open(args.compare) as f:
+			regressions = compare(results, json.load(f), args.threshold)
+		if len(regressions) > 0:
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of the cost per call of the runtime type checks, on some of the most called public methods. The
+unchecked column is measured after configure(runtime_type_checks=False): it includes the test of the switch, which the
+methods do not pay when the checks are disabled before importing qr.
+
+Usage (from the root of the repository):
+	python benchmark/bench_type_checks.py [calls]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import qr
+
+
+def measure(calls: int) -> dict:
+	google = qr.webengine.WebEngine.get_google()
+	result = qr.webresult.WebResult("Title", "https://www.python.org", None, "", "")
+	statements = {
+		"WebEngine.remove_tags": lambda: qr.webengine.WebEngine.remove_tags("<b>Python</b> debugger<br/>"),
+		"WebEngine.get_search_url": lambda: google.get_search_url(["python", "debugger"]),
+		"WebResult.title (setter)": lambda: setattr(result, "title", "Another title"),
+		"WebResult.title (getter)": lambda: result.title,
+	}
+	return {name: timeit.timeit(statement, number=calls) / calls * 1e6 for name, statement in statements.items()}
+
+
+def main(calls: int = 20000):
+	qr.configure(runtime_type_checks=True)
+	checked = measure(calls)
+	qr.configure(runtime_type_checks=False)
+	unchecked = measure(calls)
+	
+	print("{:<28} {:>14} {:>14}".format("method", "checked (µs)", "unchecked (µs)"))
+	for name in checked:
+		print("{:<28} {:>14.2f} {:>14.2f}".format(name, checked[name], unchecked[name]))
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Generate the offline corpus of result pages in res/test/serp/, used by the tests and by bench_serp.py.
+
+The pages are synthetic, but follow the markup of each engine supported by the builders of WebEngine, with 10 results
+per page and the inline styles and scripts that make up most of the size of a real page. They are generated from a
+fixed seed, so running this script again gives the same files.
+
+Usage (from the root of the repository):
+	python benchmark/make_serp_corpus.py
+"""
+import os
+import random
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "test", "serp")
+QUERIES = ("python debugger", "pentatonix daft punk", "artificial intelligence tutorial")
+RESULTS_PER_PAGE = 10
+
+WORDS = ("the", "official", "home", "of", "language", "source", "code", "video", "music", "learn", "guide", "module",
+         "interactive", "documentation", "release", "free", "online", "course", "best", "new", "how", "to", "with",
+         "and", "for", "in", "a", "&amp;", "&#39;s")
+DOMAINS = ("python.org", "docs.python.org", "youtube.com", "wikipedia.org", "stackoverflow.com", "github.com",
+           "realpython.com", "medium.com", "coursera.org", "w3schools.com")
+
+GOOGLE_RESULT = """<div class="g"><div class="rc"><h3 class="r"><a href="/url?q=https://{domain}/{path}/&amp;sa=U&amp;ved={ved}">{title}</a></h3>
+<div class="s"><div class="th"><img src="/images/thumb/{thumbnail}.png" alt="" width="64" height="64"></div>
+<cite class="iUh30">https://{domain}/{path}</cite><span class="st"><span class="f"><span class="nobr">{date}</span> - </span>{description}</span></div></div></div>
+"""
+BING_RESULT = """<li class="b_algo"><h2><a href="https://{domain}/{path}/" h="ID=SERP,{ved}">{title}</a></h2>
+<div class="b_caption"><div class="b_attribution"><cite>https://{domain}/{path}</cite></div><p>{date} &#0183; {description}</p></div></li>
+"""
+YAHOO_RESULT = """<li><div class="dd algo algo-sr"><div class="compTitle"><h3 class="title"><a href="https://r.search.yahoo.com/_ylt={ved}/RU=https%3a%2f%2f{domain}%2f{path}%2f/RK=2">{title}</a></h3>
+<div><span class="fz-ms">{domain}/{path}</span></div></div><div class="compText aAbs"><p class="fz-ms lh-1_43x">{date} &#183; {description}</p></div></div></li>
+"""
+DUCKDUCKGO_RESULT = """<li class="result results_links_deep web-result"><div class="result__body"><h2 class="result__title"><a class="result__a" href="https://{domain}/{path}/">{title}</a></h2>
+<a class="result__snippet" href="https://{domain}/{path}/">{description}</a><div class="result__extras"><span class="result__url">{domain}/{path}</span><span>{date}</span></div></div></li>
+"""
+QWANT_RESULT = """<li class="result--web"><div class="result__title"><a class="result--web--link" href="https://{domain}/{path}/" data-ved="{ved}">{title}</a></div>
+<p class="result--web--url">{domain}/{path}</p><p class="result__desc">{date} - {description}</p></li>
+"""
+
+ENGINES = {
+	"google": ("""<div id="search"><div id="ires"><div id="rso">""", GOOGLE_RESULT, "</div></div></div>"),
+	"bing": ("""<main><ol id="b_results">""", BING_RESULT, "</ol></main>"),
+	"yahoo": ("""<div id="web"><ol class="reg searchCenterMiddle">""", YAHOO_RESULT, "</ol></div>"),
+	"duckduckgo": ("""<div id="links" class="results"><ol class="results--main">""", DUCKDUCKGO_RESULT,
+	               "</ol></div>"),
+	"qwant": ("""<div class="result__list"><ul class="results-column">""", QWANT_RESULT, "</ul></div>"),
+}
+
+
+def get_slug(query: str) -> str:
+	return query.replace(' ', '-')
+
+
+def sentence(rng: random.Random, query: str, words: int) -> str:
+	picked = [rng.choice(WORDS) for _ in range(words)]
+	picked.insert(rng.randrange(len(picked)), "<b>{}</b>".format(query.split()[rng.randrange(len(query.split()))]))
+	return ' '.join(picked)
+
+
+def filler(rng: random.Random, size: int) -> str:
+	# Minified styles and scripts, as inlined by the engines
+	parts = []
+	while sum(len(part) for part in parts) < size:
+		name = ''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6))
+		parts.append(".{}{{margin:{}px;color:#{:06x}}}".format(name, rng.randrange(40), rng.randrange(1 << 24)))
+		parts.append("var {}=function(a,b){{return a.{}(b)||{}}};".format(name, name[:3], rng.randrange(1000)))
+	return ''.join(parts)
+
+
+def make_page(engine: str, query: str, rng: random.Random) -> str:
+	header, template, footer = ENGINES[engine]
+	results = []
+	for i in range(RESULTS_PER_PAGE):
+		# No whitespace between the items of the list
+		results.append(template.strip().format(
+			domain=rng.choice(DOMAINS),
+			path='-'.join(rng.choice(WORDS[:20]) for _ in range(3)),
+			ved="0ahUKEwi{:08x}".format(rng.randrange(1 << 32)),
+			title=sentence(rng, query, 6).capitalize(),
+			date="{} mars 20{}".format(rng.randrange(1, 29), rng.randrange(10, 24)),
+			description=sentence(rng, query, 25).capitalize() + " ...",
+			thumbnail=rng.randrange(1000),
+		))
+	
+	return """<!doctype html><html><head><meta charset="UTF-8"><title>{query} - {engine}</title>
+<style>{style}</style></head><body><form action="/search"><input name="q" value="{query}"></form>
+{header}{results}{footer}
+<script>{script}</script></body></html>
+""".format(query=query, engine=engine.capitalize(), style=filler(rng, 20000), header=header, results=''.join(results),
+	           footer=footer, script=filler(rng, 30000))
+
+
+def main():
+	for engine in ENGINES:
+		os.makedirs(os.path.join(CORPUS, engine), exist_ok=True)
+		for query in QUERIES:
+			rng = random.Random("{}/{}".format(engine, query))
+			path = os.path.join(CORPUS, engine, get_slug(query) + ".html")
+			with open(path, 'w', encoding="utf-8") as f:
+				f.write(make_page(engine, query, rng))
+			print("Written {} ({} bytes)".format(os.path.relpath(path), os.path.getsize(path)))
+
+
+if __name__ == "__main__":
+	main()
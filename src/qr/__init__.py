@@ -1,12 +1,64 @@
 # -*- coding: utf-8 -*-
+"""
+The classes of qr are imported on first use (PEP 562): "import qr" only loads the configuration, such that
+qr.configure() can be called before anything else, and the short-lived scripts only pay for the modules (and the
+dependencies, such as numpy, PIL, bs4 or requests) that they use.
+"""
+import importlib
 
-from qr.information import *
+from qr.config import configure
 
-from qr.webutils import assess_url
-from qr.webengine import WebEngine
-from qr.webresult import WebResult
-from qr.quaero import Quaero
-from qr.searcher import Searcher
+# Map each lazily imported name to the module that defines it
+_lazy_names = {
+	"Info": "qr.information",
+	"TableInfo": "qr.information",
+	"StringColumn": "qr.information",
+	"FormattedInfo": "qr.information",
+	"Deadline": "qr.deadline",
+	"DeadlineExceededError": "qr.deadline",
+	"LatencyTracker": "qr.hedging",
+	"TokenBucket": "qr.ratelimit",
+	"Backoff": "qr.ratelimit",
+	"BlockedError": "qr.ratelimit",
+	"assess_url": "qr.webutils",
+	"assess_urls": "qr.webutils",
+	"normalize_text": "qr.webutils",
+	"normalize_url": "qr.webutils",
+	"Transport": "qr.transport",
+	"RecordingTransport": "qr.recording",
+	"ReplayTransport": "qr.recording",
+	"SerpCache": "qr.cache",
+	"MemoryCache": "qr.cache",
+	"HtmlParser": "qr.parser",
+	"ThumbnailStore": "qr.thumbnail_store",
+	"WebEngine": "qr.webengine",
+	"MetaEngine": "qr.metaengine",
+	"WebResult": "qr.webresult",
+	"FrozenWebResult": "qr.webresult",
+	"prefetch_thumbnails": "qr.webresult",
+	"Quaero": "qr.quaero",
+	"Searcher": "qr.searcher",
+}
 
 __version__ = "1.0"
-__all__ = ["information", "webutils", "webengine", "webresult", "quaero", "searcher"]
+__all__ = ["config", "tracing", "deadline", "hedging", "ratelimit", "information", "webutils", "transport",
+           "recording", "cache", "parser", "thumbnail_store", "webengine", "metaengine", "webresult", "quaero",
+           "searcher"]
+
+
+def __getattr__(name: str):
+	module = _lazy_names.get(name)
+	if module is not None:
+		value = getattr(importlib.import_module(module), name)
+	elif name in __all__:
+		value = importlib.import_module("qr." + name)
+	else:
+		raise AttributeError("module 'qr' has no attribute '{}'".format(name))
+	
+	# The next lookups do not go through __getattr__()
+	globals()[name] = value
+	return value
+
+
+def __dir__() -> list:
+	return sorted(set(globals().keys()) | set(_lazy_names.keys()) | set(__all__))
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Union, Any, Hashable
+
+from qr.config import typechecked
+
+
+class SerpCache:
+	"""
+	Persistent cache of result pages (SERP), stored in a SQLite file.
+	
+	The pages are keyed by the name of the web engine and the normalized keywords (see WebEngine.normalize_keywords),
+	and stored compressed. An entry expires 'ttl' seconds after it has been stored, and the least recently used entries
+	are evicted when the cache holds more than 'max_entries' entries or 'max_bytes' compressed bytes.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, path: str = ":memory:", ttl: Optional[Union[int, float]] = 3600,
+	             max_entries: Optional[int] = None, max_bytes: Optional[int] = None, compression_level: int = 6):
+		"""
+		Constructor of SerpCache.
+		:param path: The path to the SQLite file. By default, the cache is only kept in memory.
+		:type path: str
+		:param ttl: The number of seconds after which an entry expires. None means that entries never expire.
+		:param max_entries: The maximum number of entries. None means no limit.
+		:param max_bytes: The maximum number of compressed bytes stored. None means no limit.
+		:param compression_level: The zlib compression level, from 0 (none) to 9 (best).
+		:type compression_level: int
+		"""
+		if ttl is not None and ttl < 0:
+			raise ValueError("ttl must be a positive number of seconds (got {})".format(ttl))
+		
+		if max_entries is not None and max_entries <= 0:
+			raise ValueError("max_entries must be a positive integer (got {})".format(max_entries))
+		
+		if max_bytes is not None and max_bytes <= 0:
+			raise ValueError("max_bytes must be a positive integer (got {})".format(max_bytes))
+		
+		self._path = path
+		self._ttl = ttl
+		self._max_entries = max_entries
+		self._max_bytes = max_bytes
+		self._compression_level = compression_level
+		self._hits = 0
+		self._misses = 0
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		self._connection.execute("CREATE TABLE IF NOT EXISTS serp (engine TEXT NOT NULL, query TEXT NOT NULL, "
+		                         "content BLOB NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, "
+		                         "accessed REAL NOT NULL, PRIMARY KEY (engine, query))")
+		self._connection.execute("CREATE INDEX IF NOT EXISTS serp_accessed ON serp (accessed)")
+		self._connection.commit()
+	
+	# CACHE METHODS #
+	
+	@typechecked
+	def get(self, engine: str, query: str) -> Optional[str]:
+		"""
+		Return the page stored for the given engine and query, or None if there is none or if it has expired.
+		:param engine: The name of the web engine.
+		:type engine: str
+		:param query: The normalized keywords.
+		:type query: str
+		:return: The HTML content of the page.
+		:rtype: Union[str, None]
+		"""
+		now = time.time()
+		with self._lock:
+			row = self._connection.execute("SELECT content, created FROM serp WHERE engine = ? AND query = ?",
+			                               (engine, query)).fetchone()
+			if row is not None and self.__is_expired(row[1], now):
+				self._connection.execute("DELETE FROM serp WHERE engine = ? AND query = ?", (engine, query))
+				self._connection.commit()
+				row = None
+			
+			if row is None:
+				self._misses += 1
+				return None
+			
+			self._connection.execute("UPDATE serp SET accessed = ? WHERE engine = ? AND query = ?",
+			                         (now, engine, query))
+			self._connection.commit()
+			self._hits += 1
+		
+		return zlib.decompress(row[0]).decode("utf-8")
+	
+	@typechecked
+	def put(self, engine: str, query: str, content: str):
+		"""
+		Store the page of the given engine and query, and evict the least recently used entries if the cache is full.
+		:param engine: The name of the web engine.
+		:type engine: str
+		:param query: The normalized keywords.
+		:type query: str
+		:param content: The HTML content of the page.
+		:type content: str
+		"""
+		data = zlib.compress(content.encode("utf-8"), self._compression_level)
+		now = time.time()
+		with self._lock:
+			self._connection.execute("INSERT OR REPLACE INTO serp (engine, query, content, size, created, accessed) "
+			                         "VALUES (?, ?, ?, ?, ?, ?)", (engine, query, data, len(data), now, now))
+			self.__evict()
+			self._connection.commit()
+	
+	def clear(self):
+		"""
+		Remove all the entries and reset the counters.
+		"""
+		with self._lock:
+			self._connection.execute("DELETE FROM serp")
+			self._connection.commit()
+			self._hits = 0
+			self._misses = 0
+	
+	def close(self):
+		with self._lock:
+			self._connection.close()
+	
+	def __is_expired(self, created: float, now: float) -> bool:
+		return self._ttl is not None and now - created >= self._ttl
+	
+	def __evict(self):
+		# Remove the expired entries first, then the least recently used ones until the bounds are respected
+		if self._ttl is not None:
+			self._connection.execute("DELETE FROM serp WHERE created <= ?", (time.time() - self._ttl,))
+		
+		count, size = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM serp").fetchone()
+		if (self._max_entries is None or count <= self._max_entries) and \
+				(self._max_bytes is None or size <= self._max_bytes):
+			return
+		
+		evicted = []
+		for engine, query, entry_size in self._connection.execute("SELECT engine, query, size FROM serp "
+		                                                          "ORDER BY accessed ASC"):
+			if (self._max_entries is None or count <= self._max_entries) and \
+					(self._max_bytes is None or size <= self._max_bytes):
+				break
+			evicted.append((engine, query))
+			count -= 1
+			size -= entry_size
+		
+		self._connection.executemany("DELETE FROM serp WHERE engine = ? AND query = ?", evicted)
+	
+	# GETTERS #
+	
+	@property
+	def path(self) -> str:
+		return self._path
+	
+	@property
+	def ttl(self) -> Optional[Union[int, float]]:
+		return self._ttl
+	
+	@property
+	def max_entries(self) -> Optional[int]:
+		return self._max_entries
+	
+	@property
+	def max_bytes(self) -> Optional[int]:
+		return self._max_bytes
+	
+	@property
+	def hits(self) -> int:
+		return self._hits
+	
+	@property
+	def misses(self) -> int:
+		return self._misses
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		with self._lock:
+			return self._connection.execute("SELECT COUNT(*) FROM serp").fetchone()[0]
+	
+	def __enter__(self) -> 'SerpCache':
+		return self
+	
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "SerpCache{{path='{}', ttl='{}', max_entries='{}', max_bytes='{}', hits='{}', misses='{}'}}".format(
+			self.path, self.ttl, self.max_entries, self.max_bytes, self.hits, self.misses)
+
+
+class MemoryCache:
+	"""
+	Thread-safe in-memory LRU cache bounded by the total size of its values, in bytes.
+	
+	The values are stored as they are: they should be immutable, as the same object is handed out to every caller.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+		"""
+		Constructor of MemoryCache.
+		:param max_bytes: The maximum total size of the values, in bytes.
+		:type max_bytes: int
+		"""
+		if max_bytes <= 0:
+			raise ValueError("max_bytes must be a positive integer (got {})".format(max_bytes))
+		
+		self._max_bytes = max_bytes
+		self._current_bytes = 0
+		self._hits = 0
+		self._misses = 0
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+	
+	# CACHE METHODS #
+	
+	def get(self, key: Hashable) -> Optional[Any]:
+		"""
+		Return the value stored with the given key and mark it as the most recently used, or None if there is none.
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self._misses += 1
+				return None
+			
+			self._entries.move_to_end(key)
+			self._hits += 1
+			return entry[0]
+	
+	@typechecked
+	def put(self, key: Hashable, value: Any, size: int):
+		"""
+		Store the given value, and evict the least recently used values until the cache fits in 'max_bytes'.
+		:param key: The key of the value.
+		:param value: The value to store. It must be immutable.
+		:param size: The size of the value, in bytes. A value larger than 'max_bytes' is not stored.
+		:type size: int
+		"""
+		if size > self._max_bytes:
+			return
+		
+		with self._lock:
+			old = self._entries.pop(key, None)
+			if old is not None:
+				self._current_bytes -= old[1]
+			
+			self._entries[key] = (value, size)
+			self._current_bytes += size
+			while self._current_bytes > self._max_bytes:
+				_, (_, evicted_size) = self._entries.popitem(last=False)
+				self._current_bytes -= evicted_size
+	
+	def clear(self):
+		"""
+		Remove all the entries and reset the counters.
+		"""
+		with self._lock:
+			self._entries.clear()
+			self._current_bytes = 0
+			self._hits = 0
+			self._misses = 0
+	
+	# GETTERS #
+	
+	@property
+	def max_bytes(self) -> int:
+		return self._max_bytes
+	
+	@property
+	def current_bytes(self) -> int:
+		return self._current_bytes
+	
+	@property
+	def hits(self) -> int:
+		return self._hits
+	
+	@property
+	def misses(self) -> int:
+		return self._misses
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		return len(self._entries)
+	
+	def __contains__(self, key: Hashable) -> bool:
+		return key in self._entries
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "MemoryCache{{max_bytes='{}', current_bytes='{}', hits='{}', misses='{}'}}".format(
+			self.max_bytes, self.current_bytes, self.hits, self.misses)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Global configuration of qr.
+
+The public methods of qr check the types of their arguments at runtime with typeguard. These checks can be disabled in
+production, where their cost is paid at every call:
+- by setting the environment variable QR_RUNTIME_TYPE_CHECKS to 0 before importing qr, or
+- by calling qr.configure(runtime_type_checks=False).
+When disabled before the modules of qr are imported, the decorator typechecked() returns the functions as they are, so
+they cost nothing more than a plain call. The functions decorated while the checks are enabled test the switch at each
+call, so configure() also applies to them, wherever they are referenced. The checks are enabled by default, so the tests
+keep them on.
+"""
+import functools
+import inspect
+import os
+from typing import Callable, Optional
+
+_runtime_type_checks = os.environ.get("QR_RUNTIME_TYPE_CHECKS", "1").strip().lower() not in ("0", "false", "no",
+                                                                                               "off")
+
+
+def typechecked(func: Callable) -> Callable:
+	"""
+	Decorator checking the types of the arguments and of the returned value of 'func' with typeguard, as long as the
+	runtime type checks are enabled. If they are disabled when 'func' is decorated, 'func' is returned as it is, and is
+	never checked.
+	"""
+	if not _runtime_type_checks:
+		return func
+	
+	checked = _check_types(func)
+	if inspect.iscoroutinefunction(func):
+		@functools.wraps(func)
+		async def wrapper(*args, **kwargs):
+			if _runtime_type_checks:
+				return await checked(*args, **kwargs)
+			return await func(*args, **kwargs)
+	else:
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			if _runtime_type_checks:
+				return checked(*args, **kwargs)
+			return func(*args, **kwargs)
+	
+	return wrapper
+
+
+def configure(runtime_type_checks: Optional[bool] = None):
+	"""
+	Change the global configuration of qr. The parameters that are not given are left unchanged.
+	:param runtime_type_checks: Check the types of the arguments of the public methods at runtime. Disabling the checks
+	before importing the other modules of qr removes their cost entirely; disabling them afterward leaves the cost of a
+	call. The methods imported while the checks are disabled are not checked if they are enabled again.
+	:type runtime_type_checks: bool
+	"""
+	global _runtime_type_checks
+	
+	if runtime_type_checks is not None:
+		_runtime_type_checks = runtime_type_checks
+
+
+def is_runtime_type_checks_enabled() -> bool:
+	return _runtime_type_checks
+
+
+def _check_types(func: Callable) -> Callable:
+	# typeguard is slow to import: it is only imported when the first function is decorated, such that importing qr to
+	# call configure() does not pay for it
+	import typeguard
+	
+	return typeguard.typechecked(func)
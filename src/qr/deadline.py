@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import time
+from typing import Optional, Union
+
+from qr.config import typechecked
+
+
+class DeadlineExceededError(TimeoutError):
+	"""
+	Raised when an operation cannot be completed before its deadline.
+	"""
+	pass
+
+
+class Deadline:
+	"""
+	Point in time after which an operation must be abandoned.
+	
+	A deadline is given once to the top-level call (Quaero.search() for instance), and passed down to every call it
+	makes: each download is then given the time that remains, instead of its own timeout.
+		:Example:
+		deadline = Deadline(2.5)
+		content = transport.get(url, timeout=deadline)  # Raise DeadlineExceededError after 2.5 seconds
+	"""
+	
+	__slots__ = ("_expires_at",)
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, timeout: Optional[Union[int, float]] = None):
+		"""
+		Constructor of Deadline.
+		:param timeout: The number of seconds from now until the deadline. None means that the deadline never expires.
+		"""
+		if timeout is not None and timeout < 0:
+			raise ValueError("The timeout must be positive (got {})".format(timeout))
+		
+		self._expires_at = time.monotonic() + timeout if timeout is not None else None
+	
+	# DEADLINE METHODS #
+	
+	def remaining(self) -> Optional[float]:
+		"""
+		Return the number of seconds until the deadline (0 if it has expired), or None if it never expires.
+		"""
+		if self._expires_at is None:
+			return None
+		return max(0., self._expires_at - time.monotonic())
+	
+	def timeout(self, what: str = "The operation") -> Optional[float]:
+		"""
+		Return the number of seconds until the deadline, to be given as the timeout of a blocking call.
+		:param what: The description of the operation, for the error message.
+		:type what: str
+		:return: The number of seconds, or None if the deadline never expires.
+		:raise DeadlineExceededError: If the deadline has already expired.
+		"""
+		remaining = self.remaining()
+		if remaining is not None and remaining <= 0:
+			raise DeadlineExceededError("{} has exceeded its deadline".format(what))
+		return remaining
+	
+	def check(self, what: str = "The operation"):
+		"""
+		Raise DeadlineExceededError if the deadline has expired.
+		"""
+		self.timeout(what)
+	
+	def min(self, other: Optional['Deadline']) -> 'Deadline':
+		"""
+		Return the earliest of the two deadlines.
+		"""
+		if other is None or other._expires_at is None:
+			return self
+		if self._expires_at is None or other._expires_at < self._expires_at:
+			return other
+		return self
+	
+	@staticmethod
+	def of(deadline: Optional[Union['Deadline', int, float]]) -> 'Deadline':
+		"""
+		Convert the deadline argument of the public methods of qr into a Deadline.
+		:param deadline: A Deadline, a number of seconds from now, or None for a deadline that never expires.
+		:return: The deadline.
+		"""
+		if isinstance(deadline, Deadline):
+			return deadline
+		return Deadline(deadline)
+	
+	# GETTERS #
+	
+	@property
+	def expired(self) -> bool:
+		return self._expires_at is not None and time.monotonic() >= self._expires_at
+	
+	@property
+	def expires_at(self) -> Optional[float]:
+		"""
+		The value of time.monotonic() at the deadline, or None if it never expires.
+		"""
+		return self._expires_at
+	
+	# OVERRIDES #
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "Deadline{{remaining='{}'}}".format(self.remaining())
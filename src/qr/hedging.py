@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import bisect
+import collections
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional, Any, Union
+
+from qr.config import typechecked
+from qr.deadline import Deadline, DeadlineExceededError
+
+
+class LatencyTracker:
+	"""
+	Keep the latencies of the last requests, to tell how long a request should take.
+	
+	It is thread-safe. Until 'min_samples' latencies have been recorded, the percentiles are 'initial'.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, window: int = 1000, min_samples: int = 20, initial: Union[int, float] = 1.):
+		"""
+		Constructor of LatencyTracker.
+		:param window: The number of latest latencies kept.
+		:type window: int
+		:param min_samples: The number of latencies to record before computing the percentiles.
+		:type min_samples: int
+		:param initial: The percentiles (in seconds) given until 'min_samples' latencies have been recorded.
+		:type initial: float
+		"""
+		if window <= 0:
+			raise ValueError("window must be a positive integer (got {})".format(window))
+		
+		self._latencies = collections.deque(maxlen=window)
+		# The same latencies, sorted
+		self._sorted = []
+		self._min_samples = min_samples
+		self._initial = initial
+		self._lock = threading.Lock()
+	
+	# TRACKER METHODS #
+	
+	def record(self, latency: float):
+		"""
+		Record the latency (in seconds) of a request.
+		"""
+		with self._lock:
+			if len(self._latencies) == self._latencies.maxlen:
+				oldest = self._latencies.popleft()
+				del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+			self._latencies.append(latency)
+			bisect.insort(self._sorted, latency)
+	
+	def percentile(self, q: float = 95.) -> float:
+		"""
+		Return the q-th percentile of the recorded latencies, in seconds (nearest rank).
+		"""
+		with self._lock:
+			if len(self._sorted) < max(1, self._min_samples):
+				return self._initial
+			index = min(len(self._sorted) - 1, int(len(self._sorted) * q / 100.))
+			return self._sorted[index]
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		return len(self._latencies)
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "LatencyTracker{{samples='{}', p95='{}'}}".format(len(self), self.percentile(95.))
+
+
+# The number of seconds given to the hedged requests that have no deadline. A request that lost the race is not
+# interrupted: it must end by itself, such that it releases its thread
+DEFAULT_TIMEOUT = 30.
+
+# Threads running the hedged requests of the callers that do not give their own executor
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hedge(primary: Callable[[], Any], backup: Callable[[], Any], tracker: LatencyTracker,
+          deadline: Optional[Deadline] = None, q: float = 95., executor: Optional[Executor] = None) -> Any:
+	"""
+	Call 'primary', and if it has not answered after the q-th percentile of the latencies recorded by 'tracker', call
+	'backup' as well. Return the first result.
+	
+	The latency of every request that answers is recorded in 'tracker', including the one that lost the race. If one
+	of the requests fails, the other one is awaited.
+	:param primary: The request to send first.
+	:param backup: The duplicate request, sent to a mirror.
+	:param tracker: The latencies of the previous requests.
+	:param deadline: The deadline of both requests. The requests must stop by themselves at the deadline, as the one
+	that loses the race keeps running in its thread: use hedge_deadline() to bound it.
+	:param q: The percentile after which the backup request is sent.
+	:param executor: The executor running the requests. If None, an executor shared by all the callers is used.
+	:return: The result of the first request that succeeds.
+	:raise DeadlineExceededError: If no request has succeeded before the deadline.
+	"""
+	global _executor
+	
+	if executor is None:
+		if _executor is None:
+			with _executor_lock:
+				if _executor is None:
+					_executor = ThreadPoolExecutor(thread_name_prefix="qr-hedge")
+		executor = _executor
+	deadline = hedge_deadline(deadline)
+	
+	def timed(request: Callable[[], Any]) -> Any:
+		start = time.monotonic()
+		result = request()
+		tracker.record(time.monotonic() - start)
+		return result
+	
+	pending = {executor.submit(timed, primary)}
+	delay = tracker.percentile(q)
+	remaining = deadline.remaining()
+	done, _ = wait(pending, timeout=min(delay, remaining) if remaining is not None else delay)
+	if len(done) == 0 or next(iter(done)).exception() is not None:
+		pending.add(executor.submit(timed, backup))
+	
+	error = None
+	while len(pending) > 0:
+		done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+		if len(done) == 0:
+			break
+		for future in done:
+			if future.exception() is None:
+				for other in pending:
+					other.cancel()
+				return future.result()
+			if error is None:
+				error = future.exception()
+	
+	if error is not None and not deadline.expired:
+		raise error
+	raise DeadlineExceededError("No hedged request has answered before the deadline") from error
+
+
+def hedge_deadline(deadline: Optional[Union[Deadline, int, float]] = None) -> Deadline:
+	"""
+	Return the deadline of hedged requests: the given deadline, or DEFAULT_TIMEOUT seconds from now if it never
+	expires.
+	"""
+	deadline = Deadline.of(deadline)
+	if deadline.remaining() is None:
+		return Deadline(DEFAULT_TIMEOUT)
+	return deadline
@@ -1,6 +1,26 @@
 # -*- coding: utf-8 -*-
+import importlib
 
-from .info import Info
-from .formatted_info import FormattedInfo
+# The classes are imported on first use (PEP 562), as info.py imports numpy and PIL
+_lazy_names = {
+	"Info": ".info",
+	"TableInfo": ".table_info",
+	"StringColumn": ".table_info",
+	"FormattedInfo": ".formatted_info",
+}
 
-__all__ = ["Info", "FormattedInfo"]
+__all__ = ["Info", "TableInfo", "StringColumn", "FormattedInfo"]
+
+
+def __getattr__(name: str):
+	module = _lazy_names.get(name)
+	if module is None:
+		raise AttributeError("module 'qr.information' has no attribute '{}'".format(name))
+	
+	value = getattr(importlib.import_module(module, __name__), name)
+	globals()[name] = value
+	return value
+
+
+def __dir__() -> list:
+	return sorted(set(globals().keys()) | set(__all__))
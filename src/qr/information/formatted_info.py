@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 from abc import ABC, abstractmethod
 from typing import Union, Any
-from typeguard import *
 
+from qr.config import typechecked
 from qr.information.info import Info
 
 
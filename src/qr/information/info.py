@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
-import cmath
-import copy
+import collections.abc
 import warnings
 
 import numpy as np
-from typing import Union, Optional, List, Dict, Tuple, Set, Iterable, Any, Type
+from typing import Union, Optional, List, Dict, Tuple, Set, Iterable, Any, Type, Callable, ForwardRef
 
 import PIL
 from PIL import Image, ImageFile, JpegImagePlugin, GifImagePlugin, PngImagePlugin, ImageChops
-from typeguard import *
+from typeguard import check_type
+
+from qr import tracing
+from qr.config import typechecked
 
 """
 https://stackoverflow.com/questions/45957615/check-a-variable-against-union-type-at-runtime-in-python-3-6
@@ -29,6 +31,9 @@ class Info:
 	- Table (same as the item above) containing other instances of Info
 	"""
 	
+	# Millions of instances are created for large tables, so they do not have any __dict__
+	__slots__ = ("_data", "_dtype", "_strict", "_summaries")
+	
 	__list_images = (
 	Image.Image, JpegImagePlugin.JpegImageFile, GifImagePlugin.GifImageFile, PngImagePlugin.PngImageFile)
 	__union_images = Union[__list_images]
@@ -42,9 +47,24 @@ class Info:
 	                      Tuple[__union_dtype], Dict[__union_dtype, __union_dtype],
 	                      Iterable[__union_dtype]]
 	
+	# Lookup table from the concrete type of a quantum value to its category
+	__quantum_categories = {int: "number", float: "number", complex: "number", bool: "number", str: "text",
+	                        type(None): "none"}
+	__quantum_categories.update({image_class: "image" for image_class in __list_images})
+	# Lookup table from the origin of a generic type to its typing alias (List[int].__origin__ is either List or list,
+	# depending on the version of Python)
+	__origins = {list: List, List: List, tuple: Tuple, Tuple: Tuple, set: Set, Set: Set, dict: Dict, Dict: Dict,
+	             collections.abc.Iterable: Iterable, Iterable: Iterable, type: Type, Type: Type, Union: Union}
+	# Caches of the checkers and of the validity of each dtype met so far
+	__checkers = {}
+	__valid_dtypes = {}
+	# The containers nested deeper than this are detected without their items (List[Any], Dict[Any, Any], ...), such
+	# that the dtype, and its checker, stay small however deep the data is
+	__max_dtype_depth = 32
+	
 	""" CONSTRUCTOR """
 	
-	def __init__(self, data: __union_dtype = None, dtype: Any = None, process_data: bool = True):
+	def __init__(self, data: __union_dtype = None, dtype: Any = None, process_data: bool = True, strict: bool = False):
 		"""
 		Constructor of Info
 		:param data: The data that the instance will handle.
@@ -53,9 +73,14 @@ class Info:
 		:param process_data: Automatically process the data.
 		:type process_data: bool
 		:type dtype: 'dtype' must belong to the authorize types that Info can handle.
+		:param strict: Check the data against the dtype with typeguard. Otherwise, the data is checked by the checkers
+		compiled and cached for each dtype, which are much faster but only understand the types that Info handles.
+		:type strict: bool
 		.. seealso:: is_valid_dtype
 		.. todo:: Test this class
 		"""
+		self._strict = strict
+		self._summaries = None
 		if dtype is not None:
 			self.assess_dtype(dtype)
 		
@@ -84,6 +109,25 @@ class Info:
 		if process_data:
 			self.process(update_attr=True)
 	
+	@staticmethod
+	def create(data: __union_dtype = None, dtype: Any = None, process_data: bool = True, strict: bool = False) -> \
+			'Info':
+		"""
+		Build the most compact representation of 'data': a TableInfo if 'data' is a list of rows whose columns only
+		contain numbers or only contain strings, an Info otherwise.
+		:param data: The data that the instance will handle.
+		:param dtype: The type of data.
+		:param process_data: Automatically process the data (only used if the result is not a TableInfo).
+		:param strict: Check the data against the dtype with typeguard.
+		:return: An instance of TableInfo or Info.
+		.. seealso:: TableInfo
+		"""
+		from qr.information.table_info import TableInfo
+		
+		if TableInfo.is_table(data):
+			return TableInfo(data, dtype=dtype, strict=strict)
+		return Info(data=data, dtype=dtype, process_data=process_data, strict=strict)
+	
 	""" INFO METHODS """
 	
 	def process(self, data: __union_dtype = None, dtype: Any = None, update_attr: bool = False) -> \
@@ -118,15 +162,15 @@ class Info:
 		"""
 		
 		def return_fn(self, data, dtype, use_parameters_as_attr) -> 'Info':
+			# The data has already been checked, so the instance is built without checking it again
 			auto = None
-			try:
-				instance = Info(data=data, dtype=dtype, process_data=False)
-			except TypeError:
+			if not self.check_data_against_dtype(data, dtype, False):
 				auto = self.autodetect_dtype(data)
-				instance = Info(data=data, dtype=auto, process_data=False)
+			instance = Info.__wrap(data, dtype if auto is None else auto, self._strict)
 			
 			if use_parameters_as_attr:
 				self._data = data
+				self._summaries = None
 				if auto is None:
 					self._dtype = dtype
 				else:
@@ -134,73 +178,101 @@ class Info:
 			
 			return instance
 		
-		if data is None:
-			data = self.data
-		
-		if dtype is None:
-			dtype = self.dtype
-		
-		self.assess_dtype(dtype)
-		self.assess_data_against_dtype(data, dtype)
-		
-		""" Check the different type of data, and parse it """
-		
-		# If data is already at a "quantum type", don't do anything more
-		if self.check_data_against_dtype(data, self.__union_quantum_dtype, False):
-			return return_fn(self, data, dtype, update_attr)
-		elif isinstance(data, Info):
-			return return_fn(self, data, dtype, update_attr)
-		# If data is a numpy array, let it as it is because it already handle the value itself.
-		elif self.check_data_against_dtype(data, np.ndarray):
-			return return_fn(self, data, dtype, update_attr)
-		# If data is an Iterable, use recursive concept
-		elif self.check_data_against_dtype(data, Union[list, dict, set, tuple, np.ndarray]):
-			only_info_instances = True
-			only_quantum_type = True
-			for datum in self.data:
-				# If in the list there is an instance of Info, process it again (just in case)
-				if isinstance(datum, Info):
-					datum.process()
-				# Otherwise, check that it is a "quantum type"
-				elif self.check_data_against_dtype(datum, self.__union_quantum_dtype):
-					only_info_instances = False
-				# If there is more than a quantum type
-				else:
-					only_info_instances = False
-					only_quantum_type = False
+		with tracing.span("info.process"):
+			if data is None:
+				data = self.data
 			
-			""" Summary """
+			if dtype is None:
+				dtype = self.dtype
+			
+			self.assess_dtype(dtype)
+			self.assess_data_against_dtype(data, dtype)
 			
-			# If there is only Info instances, then the job is done
-			if only_info_instances:
+			""" Check the different type of data, and parse it """
+			
+			# If data is already at a "quantum type", don't do anything more
+			if self.check_data_against_dtype(data, self.__union_quantum_dtype, False):
+				return return_fn(self, data, dtype, update_attr)
+			elif isinstance(data, Info):
+				return return_fn(self, data, dtype, update_attr)
+			# If data is a numpy array, let it as it is because it already handle the value itself.
+			elif isinstance(data, np.ndarray):
 				return return_fn(self, data, dtype, update_attr)
-			# If not all items are info instances and there is quantum type, then nest all of them in Info class and
-			# process it again (recursive)
-			# elif not only_info_instances and only_quantum_type:
+			# If data is an Iterable, nest all its items in Info (if they are not already)
+			elif isinstance(data, (list, dict, set, tuple)):
+				if not all(isinstance(datum, Info) for datum in data):
+					data = self.__build_tree(data)
+					
+					if dtype == Tuple or self.__get_origin(dtype) == Tuple:
+						data = tuple(data)
+					elif dtype == np.array or self.__get_origin(dtype) == np.array:
+						data = np.array(data)
+			
+			return return_fn(self, data, dtype, update_attr)
+	
+	def __build_tree(self, data: Union[list, dict, set, tuple]) -> List['Info']:
+		"""
+		Nest all the items of 'data' in Info, and do the same for the items of the nested containers.
+		
+		The tree is walked once, with an explicit stack instead of recursive calls, so its depth is not limited by the
+		recursion limit. The items are not copied, and the items that already are instances of Info are kept as they
+		are.
+		:param data: The container to process.
+		:return: The list of the Info nesting the items of 'data'.
+		:raise TypeError: If 'data' or a nested container is a non-empty set, as Info is not hashable.
+		"""
+		Info.__assess_not_set(data)
+		root = []
+		# Each frame holds the iterator over the items of a container, the list of its nested items, and the type of
+		# the container (None for the root)
+		stack = [(iter(data), root, None)]
+		while stack:
+			items, nested, container_type = stack[-1]
+			for datum in items:
+				if isinstance(datum, Info):
+					nested.append(datum)
+				elif isinstance(datum, (list, dict, set, tuple)) and len(datum) > 0:
+					Info.__assess_not_set(datum)
+					# Process the items of the container first, and come back to the current one afterward
+					stack.append((iter(datum), [], type(datum)))
+					break
+				else:
+					# Quantum type, numpy array or empty container. autodetect_dtype() raises a TypeError if the type
+					# of the datum cannot be handled
+					datum_type = type(datum)
+					if datum_type not in self.__quantum_categories:
+						datum_type = self.autodetect_dtype(datum)
+					nested.append(Info.__wrap(datum, datum_type, self._strict))
 			else:
-				try:
-					c_data = copy.deepcopy(data)
-				except AttributeError:
-					c_data = copy.copy(data)
-				data = []
-				for datum in c_data:
-					if isinstance(datum, Info):
-						# datum already processed in previous loop
-						data.append(datum)
-					# elif self.check_data_against_dtype(datum, self.__union_quantum_dtype):
+				stack.pop()
+				if container_type is not None:
+					if container_type == tuple:
+						info = Info.__wrap(tuple(nested), Tuple[Info], self._strict)
 					else:
-						i_datum = Info(data=datum, process_data=False)
-						i_datum = i_datum.process()
-						data.append(i_datum)
-				
-				if dtype == Tuple or (hasattr(dtype, "__origin__") and dtype.__origin__ == Tuple):
-					data = tuple(data)
-				elif dtype == Set or (hasattr(dtype, "__origin__") and dtype.__origin__ == Set):
-					data = set(data)
-				elif dtype == np.array or (hasattr(dtype, "__origin__") and dtype.__origin__ == np.array):
-					data = np.array(data)
+						# The keys of a dictionary are nested in a list
+						info = Info.__wrap(nested, List[Info], self._strict)
+					stack[-1][1].append(info)
 		
-		return return_fn(self, data, dtype, update_attr)
+		return root
+	
+	@staticmethod
+	def __assess_not_set(data: Union[list, dict, set, tuple]):
+		# The items of a set would be nested in a set of Info, but Info is mutable and therefore not hashable
+		if isinstance(data, set):
+			raise TypeError("The items of the set {} cannot be nested in Info, which is not hashable. Use a list or a "
+			                "tuple instead.".format(data))
+	
+	@staticmethod
+	def __wrap(data: Any, dtype: Any, strict: bool) -> 'Info':
+		"""
+		Build an instance of Info without checking 'data' against 'dtype', when it is already known to match.
+		"""
+		instance = Info.__new__(Info)
+		instance._data = data
+		instance._dtype = dtype
+		instance._strict = strict
+		instance._summaries = None
+		return instance
 	
 	""" TYPE-RELATED METHODS """
 	
@@ -209,23 +281,30 @@ class Info:
 		if data is None:
 			data = self.data
 		
+		return self.__autodetect_dtype(data, 0)
+	
+	def __autodetect_dtype(self, data: Any, depth: int) -> Any:
 		dtype = type(data)
-		if self.check_data_against_dtype(data, self.__union_quantum_dtype, False):
+		if dtype in self.__quantum_categories or self.check_data_against_dtype(data, self.__union_quantum_dtype, False):
 			return dtype
 		if isinstance(data, Info):
 			return Info
 		elif hasattr(dtype, "__origin__") and dtype.__origin__ in [List, Tuple, Set]:
 			return dtype
 		else:
+			if depth >= Info.__max_dtype_depth and dtype in [list, tuple, set, dict]:
+				return {list: List[Any], tuple: Tuple[Any, ...], set: Set[Any], dict: Dict[Any, Any]}[dtype]
+			
 			# If dtype is iterable, check its content
 			if dtype in [list, tuple, set]:
 				content = []
 				if len(data) == 0:
 					content = None
 				else:
-					for item in data:
-						# Recursive call
-						content.append(self.autodetect_dtype(item))
+					content = set(map(type, data))
+					# Only recurse when some items are neither quantum nor Info
+					if any(item_type not in self.__quantum_categories and item_type != Info for item_type in content):
+						content = [self.__autodetect_dtype(item, depth + 1) for item in data]
 				
 				# Use content in Union.__args__
 				content = tuple(set(content)) if content is not None else None
@@ -249,10 +328,10 @@ class Info:
 				else:
 					for key in data.keys():
 						# Recursive call
-						keys_content.append(self.autodetect_dtype(key))
+						keys_content.append(self.__autodetect_dtype(key, depth + 1))
 					for value in data.values():
 						# Recursive call
-						values_content.append(self.autodetect_dtype(value))
+						values_content.append(self.__autodetect_dtype(value, depth + 1))
 				
 				# Use keys_content and values_content in Union.__args__
 				keys_content = tuple(set(keys_content)) if keys_content is not None else None
@@ -268,7 +347,6 @@ class Info:
 		# warnings.warn("Cannot detect the type of data : {}".format(dtype), UserWarning)
 		# return dtype
 	
-	@typechecked
 	def check_data_against_dtype(self, data: Any = None, dtype: Any = None, try_autodetect_dtype: bool = True) -> bool:
 		"""
 		Check if the type of the value in 'data' matches the given 'dtype'
@@ -287,17 +365,16 @@ class Info:
 		if dtype is None:
 			dtype = self.dtype
 		
-		try:
-			check_type("data", data, dtype)
+		if self.__matches(data, dtype):
 			return True
-		except TypeError:
-			if try_autodetect_dtype:
-				try:
-					auto_type = self.autodetect_dtype(data)
-					return auto_type == dtype
-				except TypeError:
-					pass
-			return False
+		
+		if try_autodetect_dtype:
+			try:
+				auto_type = self.autodetect_dtype(data)
+				return auto_type == dtype
+			except TypeError:
+				pass
+		return False
 	
 	def assess_data_against_dtype(self, data: Any = None, dtype: Any = None) -> bool:
 		"""
@@ -325,14 +402,7 @@ class Info:
 			dtype = self.dtype
 			is_instance_dtype = True
 		
-		authorize_dtype = self.get_authorize_dtype()
-		
-		# If dtype ∈ authorize_dtype or dtype ⊂ authorize_dtype
-		if dtype in authorize_dtype.__args__ or dtype in self.__list_dtype or dtype in self.__list_images or \
-				(hasattr(dtype, "__args__") and (set(dtype.__args__) < set(authorize_dtype.__args__) or \
-				                                 set(dtype.__args__) < set(self.__list_dtype))):
-			return True
-		elif dtype in [list, dict, tuple, set]:
+		if dtype in [list, dict, tuple, set]:
 			message = "The given dtype is too simple: '{}'. Please use the value List[...], Tuple[...], " \
 			          "Dict[..., ...], Set[...] or Iterable[...] for more precision.".format(dtype)
 			if is_instance_dtype:
@@ -342,15 +412,37 @@ class Info:
 			
 			warnings.warn(message, UserWarning)
 			return True
-		elif hasattr(dtype, "__origin__") and dtype.__origin__ in [List, Dict, Tuple, Set, Iterable]:
-			rec = dtype.__args__
+		
+		try:
+			valid = Info.__valid_dtypes.get(dtype)
+		except TypeError:
+			# The dtype is not hashable, so it cannot be cached
+			return self.__is_valid_dtype(dtype)
+		
+		if valid is None:
+			valid = self.__is_valid_dtype(dtype)
+			Info.__valid_dtypes[dtype] = valid
+		return valid
+	
+	def __is_valid_dtype(self, dtype: Any) -> bool:
+		authorize_dtype = self.get_authorize_dtype()
+		origin = self.__get_origin(dtype)
+		
+		# If dtype ∈ authorize_dtype or dtype ⊂ authorize_dtype
+		if dtype is Any or dtype in authorize_dtype.__args__ or dtype in self.__list_dtype or dtype in self.__list_images or \
+				(getattr(dtype, "__args__", None) and (set(dtype.__args__) < set(authorize_dtype.__args__) or \
+				                                       set(dtype.__args__) < set(self.__list_dtype))):
+			return True
+		elif origin in [List, Dict, Tuple, Set, Iterable]:
+			rec = getattr(dtype, "__args__", None)
 			if rec is not None:
 				if isinstance(rec, tuple):
 					for r in rec:
-						if not self.is_valid_dtype(r):
+						# The ellipsis of Tuple[..., ...]
+						if r is not Ellipsis and not self.is_valid_dtype(r):
 							return False
 			return True
-		elif hasattr(dtype, "__origin__") and dtype.__origin__ in [Union, Optional]:
+		elif origin in [Union, Optional]:
 			# Decompose the dtype
 			items = dtype.__args__
 			if items is None:
@@ -391,47 +483,247 @@ class Info:
 		"""
 		return Info.__union_dtype
 	
+	@staticmethod
+	def __get_origin(dtype: Any) -> Any:
+		"""
+		Return the typing alias from which 'dtype' has been built (List for List[int], Union for Optional[int], ...),
+		whatever the version of Python, or None if 'dtype' is not a generic type.
+		"""
+		origin = getattr(dtype, "__origin__", None)
+		if origin is None:
+			return None
+		return Info.__origins.get(origin, origin)
+	
+	def __matches(self, data: Any, dtype: Any) -> bool:
+		"""
+		Check 'data' against 'dtype' with typeguard if the instance is strict, or with the cached checker of 'dtype'
+		otherwise.
+		"""
+		if self._strict:
+			try:
+				check_type("data", data, dtype)
+				return True
+			except TypeError:
+				return False
+		return Info.__get_checker(dtype)(data)
+	
+	def __check_type(self, name: str, data: Any, dtype: Any):
+		"""
+		Same as typeguard.check_type(), but use the cached checker of 'dtype' if the instance is not strict.
+		:raise TypeError: If 'data' does not match 'dtype'.
+		"""
+		if self._strict:
+			check_type(name, data, dtype)
+		elif not Info.__get_checker(dtype)(data):
+			raise TypeError("type of {} must be {}; got {} instead".format(name, dtype, type(data).__name__))
+	
+	@staticmethod
+	def __get_checker(dtype: Any) -> Callable[[Any], bool]:
+		"""
+		Return the function checking that a data matches 'dtype', compiling it the first time that 'dtype' is met.
+		"""
+		try:
+			checker = Info.__checkers.get(dtype)
+		except TypeError:
+			# The dtype is not hashable, so it cannot be cached
+			return Info.__compile_checker(dtype)
+		
+		if checker is None:
+			checker = Info.__compile_checker(dtype)
+			Info.__checkers[dtype] = checker
+		return checker
+	
+	@staticmethod
+	def __compile_checker(dtype: Any) -> Callable[[Any], bool]:
+		"""
+		Build the function checking that a data matches 'dtype', with the same rules as typeguard (an int is accepted as
+		a float, ...). The types that are not handled by Info are checked by typeguard.
+		"""
+		if dtype is Any:
+			return lambda data: True
+		if dtype is None or dtype is type(None):
+			return lambda data: data is None
+		
+		origin = Info.__get_origin(dtype)
+		args = getattr(dtype, "__args__", None)
+		if origin is None and isinstance(dtype, type):
+			if dtype is float:
+				dtype = (int, float)
+			elif dtype is complex:
+				dtype = (int, float, complex)
+			return lambda data: isinstance(data, dtype)
+		elif origin is Union:
+			# The classes of the Union are checked with a single call to isinstance()
+			classes = ()
+			checkers = ()
+			for arg in args:
+				if arg is type(None):
+					classes += (arg,)
+				elif isinstance(arg, type) and Info.__get_origin(arg) is None:
+					classes += {float: (int, float), complex: (int, float, complex)}.get(arg, (arg,))
+				else:
+					checkers += (Info.__get_checker(arg),)
+			if len(checkers) == 0:
+				return lambda data: isinstance(data, classes)
+			
+			def union_checker(data: Any) -> bool:
+				if isinstance(data, classes):
+					return True
+				for checker in checkers:
+					if checker(data):
+						return True
+				return False
+			
+			return union_checker
+		elif origin in [List, Set] and args:
+			container = list if origin is List else set
+			item_checker = Info.__get_checker(args[0])
+			return lambda data: isinstance(data, container) and all(map(item_checker, data))
+		elif origin is Dict and args:
+			key_checker = Info.__get_checker(args[0])
+			value_checker = Info.__get_checker(args[1])
+			return lambda data: isinstance(data, dict) and all(map(key_checker, data.keys())) and \
+			                    all(map(value_checker, data.values()))
+		elif origin is Tuple and args is not None:
+			if args in [(), ((),)]:
+				return lambda data: data == ()
+			if len(args) == 2 and args[1] is Ellipsis:
+				item_checker = Info.__get_checker(args[0])
+				return lambda data: isinstance(data, tuple) and all(map(item_checker, data))
+			item_checkers = tuple(Info.__get_checker(arg) for arg in args)
+			return lambda data: isinstance(data, tuple) and len(data) == len(item_checkers) and \
+			                    all(checker(item) for checker, item in zip(item_checkers, data))
+		elif origin in [List, Set, Dict, Tuple]:
+			# Generic type without any parameter
+			container = {List: list, Set: set, Dict: dict, Tuple: tuple}[origin]
+			return lambda data: isinstance(data, container)
+		elif origin is Iterable:
+			# typeguard does not check the items of an Iterable, as it would consume it
+			return lambda data: isinstance(data, collections.abc.Iterable)
+		elif origin is Type and args and (args[0] == ForwardRef("Info") or isinstance(args[0], type)):
+			cls = Info if args[0] == ForwardRef("Info") else args[0]
+			return lambda data: isinstance(data, type) and issubclass(data, cls)
+		
+		def typeguard_checker(data: Any) -> bool:
+			try:
+				check_type("data", data, dtype)
+				return True
+			except TypeError:
+				return False
+		
+		return typeguard_checker
+	
 	""" FORMAT FUNCTION """
 	
 	# NUMBER #
 
-	@typechecked
-	def get_min_max(self, value: Iterable[Union[int, float, complex]]) \
+	def get_min_max(self, value: Optional[Union[Iterable[Union[int, float, complex]], np.ndarray]] = None) \
 			-> Tuple[Union[int, float, complex], Union[int, float, complex]]:
-		iteration = iter(value)
-		min = float("-inf")
-		max = float("+inf")
-		for i in iteration:
-			if isinstance(i, int) or isinstance(i, float):
-				if isinstance(min, complex):
-					if i < min.real:
-						min = i
-				else:
-					if i < min:
-						min = i
-				
-				if isinstance(max, complex):
-					if max.real < i:
-						max = i
-				else:
-					if max < i:
-						max = i
-			elif isinstance(i, complex):
-				if isinstance(min, complex):
-					if cmath.phase(i) < cmath.phase(min):
-						min = i
-				else:
-					if cmath.phase(i) < min:
-						min = i
-				
-				if isinstance(max, complex):
-					if cmath.phase(max) < cmath.phase(i):
-						max = i
-				else:
-					if max < cmath.phase(i):
-						max = i
-		return min, max
-
+		"""
+		Return the minimum and the maximum of the given numbers. If there is a complex number among them, the numbers
+		are ordered by their phase.
+		:param value: The numbers (a NumPy array, or an iterable of numbers or of Info nesting numbers). If not given,
+		the data of the instance is taken instead, and the result is cached until the data (or one of its items) is set.
+		:return: The minimum and the maximum.
+		:raise ValueError: If there is no number.
+		:raise TypeError: If 'value' does not only contain numbers.
+		"""
+		return self.__get_summary("min_max", value, self.__compute_min_max)
+	
+	def get_count(self, value: Optional[Union[Iterable[Union[int, float, complex]], np.ndarray]] = None) -> int:
+		"""
+		Return the number of numbers.
+		.. seealso:: get_min_max
+		"""
+		return self.__get_summary("count", value, lambda array: int(array.size))
+	
+	def get_sum(self, value: Optional[Union[Iterable[Union[int, float, complex]], np.ndarray]] = None) \
+			-> Union[int, float, complex]:
+		"""
+		Return the sum of the numbers.
+		.. seealso:: get_min_max
+		"""
+		return self.__get_summary("sum", value, lambda array: array.sum().item())
+	
+	def get_mean(self, value: Optional[Union[Iterable[Union[int, float, complex]], np.ndarray]] = None) \
+			-> Union[float, complex]:
+		"""
+		Return the arithmetic mean of the numbers.
+		:raise ValueError: If there is no number.
+		.. seealso:: get_min_max
+		"""
+		return self.__get_summary("mean", value, self.__compute_mean)
+	
+	def get_percentile(self, q: Union[int, float],
+	                   value: Optional[Union[Iterable[Union[int, float]], np.ndarray]] = None) -> float:
+		"""
+		Return the q-th percentile of the numbers, interpolated linearly between the closest numbers.
+		:param q: The percentile, between 0 and 100.
+		:raise ValueError: If there is no number, or if q is not between 0 and 100.
+		:raise TypeError: If there is a complex number.
+		.. seealso:: get_min_max
+		"""
+		return self.__get_summary(("percentile", q), value, lambda array: self.__compute_percentile(q, array))
+	
+	def __get_summary(self, key: Any, value: Any, compute: Callable[[np.ndarray], Any]) -> Any:
+		# Only the summaries of the data of the instance are cached
+		if value is not None:
+			return compute(self.__get_numbers(value))
+		
+		# The dictionary is only created when needed, as most instances are never summarized
+		if self._summaries is None:
+			self._summaries = {}
+		if key not in self._summaries:
+			self._summaries[key] = compute(self.__get_numbers(self.data))
+		return self._summaries[key]
+	
+	@staticmethod
+	def __get_numbers(value: Any) -> np.ndarray:
+		"""
+		Convert 'value' into a flat NumPy array of numbers.
+		:raise TypeError: If 'value' does not only contain numbers.
+		"""
+		if isinstance(value, (int, float, complex)):
+			value = [value]
+		
+		if isinstance(value, np.ndarray):
+			array = value
+		else:
+			items = value if isinstance(value, (list, tuple)) else list(value)
+			array = np.array(items)
+			if array.dtype == object:
+				# The numbers may be nested in Info
+				array = np.array([item.data if isinstance(item, Info) else item for item in items])
+		
+		# Booleans, integers, floats and complex numbers
+		if array.dtype.kind not in "biufc":
+			raise TypeError("Only numbers can be summarized (got an array of {}).".format(array.dtype))
+		return array.ravel()
+	
+	@staticmethod
+	def __compute_min_max(array: np.ndarray) -> Tuple[Union[int, float, complex], Union[int, float, complex]]:
+		if array.size == 0:
+			raise ValueError("Cannot compute the minimum and the maximum of an empty sequence.")
+		
+		keys = np.angle(array) if array.dtype.kind == 'c' else array
+		return array[np.argmin(keys)].item(), array[np.argmax(keys)].item()
+	
+	@staticmethod
+	def __compute_mean(array: np.ndarray) -> Union[float, complex]:
+		if array.size == 0:
+			raise ValueError("Cannot compute the mean of an empty sequence.")
+		return array.mean().item()
+	
+	@staticmethod
+	def __compute_percentile(q: Union[int, float], array: np.ndarray) -> float:
+		if array.size == 0:
+			raise ValueError("Cannot compute a percentile of an empty sequence.")
+		if not 0 <= q <= 100:
+			raise ValueError("The percentile must be between 0 and 100 (got {}).".format(q))
+		if array.dtype.kind == 'c':
+			raise TypeError("Complex numbers have no percentile.")
+		return float(np.percentile(array, q))
+	
 	@typechecked
 	def as_price(self, value: Union[int, float], currency: str) -> str:
 		if currency == '€':
@@ -529,10 +821,9 @@ class Info:
 			# TODO: parse str to know what is is precisely
 			result["content"] = info
 		# If list/tuple/set/dict
-		elif hasattr(info.dtype, "__origin__") and info.dtype.__origin__ in [List, Tuple, Set, Dict] or \
-				info.dtype in [List, Tuple, Set, Dict]:
-			if hasattr(info.dtype, "__origin__"):
-				base = info.dtype.__origin__
+		elif self.__get_origin(info.dtype) in [List, Tuple, Set, Dict] or info.dtype in [List, Tuple, Set, Dict]:
+			if self.__get_origin(info.dtype) is not None:
+				base = self.__get_origin(info.dtype)
 			else:
 				base = info.dtype
 			pass
@@ -540,10 +831,9 @@ class Info:
 		elif info.dtype == np.ndarray:
 			pass
 		# If Iterable
-		elif hasattr(info.dtype, "__origin__") and info.dtype.__origin__ == Iterable or \
-				info.dtype == Iterable:
-			if hasattr(info.dtype, "__origin__"):
-				base = info.dtype.__origin__
+		elif self.__get_origin(info.dtype) == Iterable or info.dtype == Iterable:
+			if self.__get_origin(info.dtype) is not None:
+				base = self.__get_origin(info.dtype)
 			else:
 				base = info.dtype
 		# If Info
@@ -564,8 +854,9 @@ class Info:
 		return self._data
 	
 	def set_data(self, value: __union_dtype):
-		check_type("value", value, self._dtype)
+		self.__check_type("value", value, self._dtype)
 		self._data = value
+		self._summaries = None
 	
 	data = property(get_data, set_data)
 	
@@ -578,11 +869,15 @@ class Info:
 	
 	dtype = property(get_dtype, set_dtype)
 	
+	@property
+	def strict(self) -> bool:
+		return self._strict
+	
 	""" OVERRIDES """
 	
 	def __getitem__(self, key: Any) -> Any:
 		try:
-			check_type("data", self.data, Union[List, Dict, Tuple, Set, Iterable])
+			self.__check_type("data", self.data, Union[List, Dict, Tuple, Set, Iterable])
 			return self.data[key]
 		except TypeError:
 			if key == 0:
@@ -592,8 +887,9 @@ class Info:
 	
 	def __setitem__(self, key: Any, value: Any) -> None:
 		try:
-			check_type("data", self.data, Union[List, Dict, Tuple, Set, Iterable])
+			self.__check_type("data", self.data, Union[List, Dict, Tuple, Set, Iterable])
 			self.data[key] = value
+			self._summaries = None
 		except TypeError:
 			if key == 0:
 				self.data = value
@@ -603,10 +899,8 @@ class Info:
 	def __eq__(self, other):
 		
 		def objtype2simpletype(dtype: Any) -> type:
-			origin = None
-			if hasattr(dtype, "__origin__") and dtype.__origin__ is not None:
-				origin = dtype.__origin__
-			else:
+			origin = Info.__get_origin(dtype)
+			if origin is None:
 				origin = dtype
 			
 			if origin in [List, Iterable]:
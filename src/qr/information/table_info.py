@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+from typing import Union, Optional, List, Tuple, Any
+
+import numpy as np
+
+from qr.config import typechecked
+from qr.information.info import Info
+
+
+class StringColumn:
+	"""
+	Column of strings stored as the concatenation of its distinct values, and the index of the value of each row.
+	
+	The rows are stored in a NumPy array of indexes instead of one Python string each, and the values that are repeated
+	in the column (which is common in scraped tables) are only stored once.
+	"""
+	
+	__slots__ = ("_text", "_offsets", "_codes")
+	
+	# CONSTRUCTOR #
+	
+	def __init__(self, values: Union[List[str], Tuple[str, ...]] = ()):
+		"""
+		Constructor of StringColumn.
+		:param values: The strings of the column.
+		"""
+		indexes = {}
+		codes = [indexes.setdefault(value, len(indexes)) for value in values]
+		self._text = ''.join(indexes)
+		self._offsets = np.zeros(len(indexes) + 1, dtype=np.int64)
+		np.cumsum(np.fromiter(map(len, indexes), dtype=np.int64, count=len(indexes)), out=self._offsets[1:])
+		self._codes = np.array(codes, dtype=np.int32)
+	
+	# COLUMN METHODS #
+	
+	def to_list(self) -> List[str]:
+		values = [self._text[start:end] for start, end in zip(self._offsets[:-1].tolist(), self._offsets[1:].tolist())]
+		return [values[code] for code in self._codes.tolist()]
+	
+	@property
+	def nbytes(self) -> int:
+		"""
+		The number of bytes used by the column (the text is counted as one byte per character).
+		"""
+		return len(self._text) + self._offsets.nbytes + self._codes.nbytes
+	
+	# OVERRIDES #
+	
+	def __getitem__(self, key: Union[int, slice]) -> Union[str, 'StringColumn']:
+		if isinstance(key, slice):
+			# The slice shares the distinct values of the column
+			column = StringColumn()
+			column._text = self._text
+			column._offsets = self._offsets
+			column._codes = self._codes[key]
+			return column
+		
+		code = int(self._codes[key])
+		return self._text[int(self._offsets[code]):int(self._offsets[code + 1])]
+	
+	def __len__(self) -> int:
+		return len(self._codes)
+	
+	def __eq__(self, other):
+		return isinstance(other, StringColumn) and self.to_list() == other.to_list()
+	
+	def __ne__(self, other):
+		return not self.__eq__(other)
+	
+	def __str__(self) -> str:
+		return str(self.to_list())
+	
+	def __repr__(self) -> str:
+		return "StringColumn{{length='{}', distinct='{}'}}".format(len(self), len(self._offsets) - 1)
+
+
+class TableInfo(Info):
+	"""
+	Columnar representation of a table, i.e. a list of rows with the same length, such that all the cells of a column
+	are numbers of the same kind, or are all strings.
+	
+	The number columns are stored in NumPy arrays, and the string columns in StringColumn, instead of one instance of
+	Info per cell. The cells are nested in Info only when they are accessed:
+		:Example:
+		table = TableInfo([["My title", "My content", 25], ["Title again", "Content again", 48]])
+		table[1]  # Info{[Info{"Title again"}, Info{"Content again"}, Info{48}]}
+		table[1, 2]  # Info{48}
+		table.get_column(2)  # [25, 48]
+	.. note:: A column mixing int and float is stored as float, so its int cells are given back as float.
+	.. seealso:: Info.create
+	"""
+	
+	__slots__ = ("_columns", "_column_types")
+	
+	__numpy_dtypes = {bool: np.bool_, int: np.int64, float: np.float64, complex: np.complex128}
+	
+	# CONSTRUCTOR #
+	
+	def __init__(self, data: Union[list, tuple], dtype: Any = None, strict: bool = False):
+		"""
+		Constructor of TableInfo.
+		:param data: The rows of the table.
+		:type data: list or tuple of lists or tuples
+		:param dtype: The type of data. If not given, it is auto-detected from the columns.
+		:param strict: Check the data against the dtype with typeguard.
+		:type strict: bool
+		:raise TypeError: If 'data' is not a table, or does not match 'dtype'.
+		"""
+		self._strict = strict
+		self._data = None
+		self._summaries = None
+		columns = TableInfo.__split_columns(data)
+		if columns is None:
+			raise TypeError("The given data is not a list of rows whose columns only contain numbers or only contain "
+			                "strings.\n\tdata = {}".format(data))
+		
+		if dtype is not None:
+			self.assess_dtype(dtype)
+			if not self.check_data_against_dtype(data, dtype):
+				raise TypeError("The type of the given data ({}) does not match the given dtype ({}).".format(
+					type(data), dtype))
+		
+		self._column_types = [column_type for column_type, _ in columns]
+		self._columns = [TableInfo.__build_column(column_type, values) for column_type, values in columns]
+		self._dtype = dtype if dtype is not None else self.__get_table_dtype()
+	
+	# TABLE METHODS #
+	
+	@staticmethod
+	def is_table(data: Any) -> bool:
+		"""
+		Check if 'data' can be represented by a TableInfo.
+		:param data: The data to check.
+		:return: Return True if 'data' is a non-empty list of rows with the same length, whose columns only contain
+		numbers of the same kind (bool, int/float/complex) or only contain strings. False otherwise.
+		:rtype: bool
+		"""
+		return TableInfo.__split_columns(data) is not None
+	
+	@typechecked
+	def get_column(self, index: int) -> list:
+		"""
+		Return the values of a column, as Python objects.
+		"""
+		column = self._columns[index]
+		return column.to_list() if isinstance(column, StringColumn) else column.tolist()
+	
+	@typechecked
+	def get_cell(self, row: int, column: int) -> Union[bool, int, float, complex, str]:
+		"""
+		Return the value of a cell, as a Python object.
+		"""
+		value = self._columns[column][row]
+		return value if isinstance(value, str) else value.item()
+	
+	def process(self, data: Any = None, dtype: Any = None, update_attr: bool = False) -> Info:
+		"""
+		The table is already in its final representation, as its cells are nested in Info when they are accessed.
+		.. seealso:: Info.process
+		"""
+		if data is None and dtype is None:
+			return self
+		return super(TableInfo, self).process(data, dtype, update_attr)
+	
+	@staticmethod
+	def __split_columns(data: Any) -> Optional[List[Tuple[type, tuple]]]:
+		# Return the type and the values of each column of the table, or None if 'data' is not a table
+		if not isinstance(data, (list, tuple)) or len(data) == 0 or not isinstance(data[0], (list, tuple)):
+			return None
+		
+		width = len(data[0])
+		if width == 0 or not all(isinstance(row, (list, tuple)) and len(row) == width for row in data):
+			return None
+		
+		columns = []
+		for values in zip(*data):
+			column_type = TableInfo.__get_column_type(values)
+			if column_type is None:
+				return None
+			columns.append((column_type, values))
+		return columns
+	
+	@staticmethod
+	def __get_column_type(values: tuple) -> Optional[type]:
+		types = set(map(type, values))
+		if types == {bool} or types == {str}:
+			return types.pop()
+		elif types <= {int, float, complex}:
+			if complex in types:
+				return complex
+			elif float in types:
+				return float
+			# The integers must fit in a NumPy int64
+			elif -2 ** 63 <= min(values) and max(values) < 2 ** 63:
+				return int
+		return None
+	
+	@staticmethod
+	def __build_column(column_type: type, values: tuple) -> Union[np.ndarray, StringColumn]:
+		if column_type is str:
+			return StringColumn(values)
+		return np.array(values, dtype=TableInfo.__numpy_dtypes[column_type])
+	
+	def __get_table_dtype(self) -> Any:
+		return List[List[Union[tuple(set(self._column_types))]]]
+	
+	# GETTERS & SETTERS #
+	
+	def get_data(self) -> List[list]:
+		"""
+		Return the rows of the table, as lists of Python objects. The rows are built at each call.
+		"""
+		return [list(row) for row in zip(*(self.get_column(index) for index in range(len(self._columns))))]
+	
+	def set_data(self, value: Union[list, tuple]):
+		table = TableInfo(value, strict=self._strict)
+		self._column_types = table._column_types
+		self._columns = table._columns
+		self._dtype = table._dtype
+		self._summaries = None
+	
+	data = property(get_data, set_data)
+	
+	@property
+	def columns(self) -> List[Union[np.ndarray, StringColumn]]:
+		return self._columns
+	
+	@property
+	def column_types(self) -> List[type]:
+		return self._column_types
+	
+	@property
+	def shape(self) -> Tuple[int, int]:
+		return len(self), len(self._columns)
+	
+	@property
+	def nbytes(self) -> int:
+		"""
+		The number of bytes used by the columns of the table.
+		"""
+		return sum(column.nbytes for column in self._columns)
+	
+	# OVERRIDES #
+	
+	def __getitem__(self, key: Union[int, slice, Tuple[int, int]]) -> Info:
+		"""
+		Return a row nested in Info (table[row]), a cell nested in Info (table[row, column]), or a TableInfo of the
+		selected rows (table[start:stop]).
+		"""
+		if isinstance(key, tuple):
+			value = self.get_cell(*key)
+			return Info(data=value, dtype=type(value), process_data=False, strict=self._strict)
+		elif isinstance(key, slice):
+			table = TableInfo.__new__(TableInfo)
+			table._strict = self._strict
+			table._data = None
+			table._summaries = None
+			table._column_types = self._column_types
+			table._columns = [column[key] for column in self._columns]
+			table._dtype = self._dtype
+			return table
+		
+		# Raise an IndexError if the row does not exist
+		row = range(len(self))[key]
+		cells = [self[row, column] for column in range(len(self._columns))]
+		return Info(data=cells, dtype=List[Info], process_data=False, strict=self._strict)
+	
+	def __setitem__(self, key: Any, value: Any) -> None:
+		raise TypeError("TableInfo does not support item assignment, set its data instead.")
+	
+	def __len__(self) -> int:
+		return len(self._columns[0])
+	
+	def __eq__(self, other):
+		if isinstance(other, TableInfo):
+			return self._column_types == other._column_types and len(self) == len(other) and \
+			       all(np.array_equal(a, b) if isinstance(a, np.ndarray) else a == b
+			           for a, b in zip(self._columns, other._columns))
+		return super(TableInfo, self).__eq__(other)
+	
+	def __ne__(self, other):
+		return not self.__eq__(other)
+	
+	def __repr__(self) -> str:
+		return "TableInfo{{shape='{}', dtype='{}'}}".format(self.shape, repr(self.dtype))
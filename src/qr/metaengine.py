@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Union, Optional, List, Iterable, Iterator, Tuple
+
+from qr.config import typechecked
+from qr.deadline import Deadline, DeadlineExceededError
+from qr.parser import HtmlParser
+from qr.webengine import WebEngine
+from qr.webresult import WebResult
+from qr.webutils import normalize_url
+
+
+class MetaEngine:
+	"""
+	Web engine that searches on several web engines concurrently, and merges their results.
+	
+	A search returns as soon as 'quorum' engines have answered, or when 'timeout' seconds have elapsed: a slow engine
+	does not stall the search, and an engine that fails is ignored. The results are deduplicated by normalized url (see
+	qr.webutils.normalize_url), and ranked by reciprocal-rank fusion: each result gets the score sum(1 / (k + rank))
+	over the engines that returned it, where 'rank' is its position (starting at 1) in the results of the engine.
+	
+	The engines are searched in threads owned by the MetaEngine, that are reused by all its searches: close it (or use
+	it as a context manager) to stop them. A MetaEngine can be used wherever a WebEngine is expected by Quaero and
+	Searcher.
+		:Example:
+		meta = MetaEngine([WebEngine.get_google(), WebEngine.get_bing(), WebEngine.get_duckduckgo()], quorum=2,
+		                  timeout=3.)
+		results = meta.search_list_result("python debugger")
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, web_engines: Iterable[WebEngine], quorum: Optional[int] = None,
+	             timeout: Optional[Union[int, float]] = None, k: int = 60, max_workers: Optional[int] = None):
+		"""
+		Constructor of MetaEngine.
+		:param web_engines: The web engines to search on, in order of preference (the first one wins the ties).
+		:param quorum: The number of engines that must have answered before returning. If None, a majority of the
+		engines.
+		:type quorum: Union[int, None]
+		:param timeout: The maximum number of seconds to wait for the quorum. When it expires, the results of the
+		engines that have already answered are returned. If None, wait for the quorum.
+		:type timeout: Union[int, float, None]
+		:param k: The constant of the reciprocal-rank fusion. The higher, the less the top results of each engine
+		weigh against the results returned by many engines.
+		:type k: int
+		:param max_workers: The maximum number of engines searched at once, over all the concurrent searches. If None,
+		4 per web engine.
+		:type max_workers: Union[int, None]
+		"""
+		web_engines = list(web_engines)
+		if len(web_engines) == 0:
+			raise ValueError("A MetaEngine needs at least one web engine")
+		
+		if quorum is None:
+			quorum = len(web_engines) // 2 + 1
+		
+		if max_workers is None:
+			max_workers = 4 * len(web_engines)
+		elif max_workers <= 0:
+			raise ValueError("max_workers must be a positive integer (got {})".format(max_workers))
+		
+		self._web_engines = web_engines
+		self.quorum = quorum
+		self.timeout = timeout
+		self.k = k
+		self._max_workers = max_workers
+		# The threads are only started by the first search
+		self._executor = None
+		self._executor_lock = threading.Lock()
+	
+	# META ENGINE METHODS #
+	
+	@typechecked
+	def search_list_result(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                       deadline: Optional[Union[Deadline, int, float]] = None) -> Optional[List[WebResult]]:
+		"""
+		Search the keywords on all the engines, and return the merged results.
+		:param keywords: The keywords to search.
+		:param deadline: The deadline of the search (see Deadline), or its number of seconds from now. The search stops
+		at the earliest of the deadline and the timeout of the MetaEngine, and the engines are given the same deadline.
+		:return: The deduplicated results, from the best to the worst fused rank.
+		.. note:: If every engine fails, the error of the first one is raised. If no engine has answered in time, a
+		DeadlineExceededError (which is a TimeoutError) is raised.
+		"""
+		deadline = Deadline.of(deadline).min(Deadline(self.timeout))
+		executor = self.__get_executor()
+		# The engines are given the deadline, such that they do not keep the threads beyond it
+		futures = [executor.submit(engine.search_list_result, keywords, deadline) for engine in self._web_engines]
+		try:
+			pending = set(futures)
+			answered = 0
+			while len(pending) > 0 and answered < self.quorum:
+				done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+				if len(done) == 0:
+					# Timeout
+					break
+				answered += sum(1 for future in done if future.exception() is None)
+			
+			return self.__merge(futures, keywords, deadline)
+		finally:
+			# Do not wait for the slow engines: their results are discarded, and the engines that have not started yet
+			# are not searched at all
+			for future in futures:
+				future.cancel()
+	
+	@typechecked
+	async def asearch_list_result(self,
+	                              keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                              executor: Optional[Executor] = None,
+	                              deadline: Optional[Union[Deadline, int, float]] = None) -> Optional[List[WebResult]]:
+		"""
+		Asynchronous version of search_list_result(). The engines that have not answered when it returns are cancelled.
+		"""
+		deadline = Deadline.of(deadline).min(Deadline(self.timeout))
+		tasks = [asyncio.ensure_future(engine.asearch_list_result(keywords, executor=executor, deadline=deadline))
+		         for engine in self._web_engines]
+		try:
+			pending = set(tasks)
+			answered = 0
+			while len(pending) > 0 and answered < self.quorum:
+				done, pending = await asyncio.wait(pending, timeout=deadline.remaining(),
+				                                   return_when=asyncio.FIRST_COMPLETED)
+				if len(done) == 0:
+					# Timeout
+					break
+				answered += sum(1 for task in done if task.exception() is None)
+			
+			return self.__merge(tasks, keywords, deadline)
+		finally:
+			for task in tasks:
+				if not task.done():
+					task.cancel()
+	
+	@typechecked
+	def iter_results(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                 chunk_size: int = 16384, deadline: Optional[Union[Deadline, int, float]] = None) \
+			-> Iterator[WebResult]:
+		"""
+		Search the keywords and yield the merged results. As the ranks are only known once the engines have answered,
+		the results are not streamed: 'chunk_size' is only accepted for compatibility with WebEngine.iter_results().
+		"""
+		results = self.search_list_result(keywords, deadline)
+		for result in results if results is not None else []:
+			yield result
+	
+	@typechecked
+	def search_list_result_many(self,
+	                            queries: Iterable[Union[str, List[Union[str, int, float, complex, int, float, complex]]]],
+	                            max_workers: int = 8, parse_in_processes: bool = False) \
+		-> Iterator[Tuple[Union[str, List[Union[str, int, float, complex]]], Optional[List[WebResult]]]]:
+		"""
+		Search all the given queries concurrently, and yield each query with its merged results as soon as they are
+		ready. At most 2 * max_workers queries are in flight at once.
+		.. seealso:: WebEngine.search_list_result_many
+		"""
+		if max_workers <= 0:
+			raise ValueError("max_workers must be a positive integer (got {})".format(max_workers))
+		
+		if parse_in_processes:
+			raise ValueError("A MetaEngine cannot parse the result pages in processes")
+		
+		queries = iter(queries)
+		executor = ThreadPoolExecutor(max_workers=max_workers)
+		pending = {}
+		
+		def submit(n: int):
+			for query in itertools.islice(queries, n):
+				pending[executor.submit(self.search_list_result, query)] = query
+		
+		try:
+			submit(2 * max_workers)
+			while len(pending) > 0:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					query = pending.pop(future)
+					results = future.result()
+					submit(1)
+					yield query, results
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
+	
+	def close(self):
+		"""
+		Stop the threads of the MetaEngine, without waiting for the engines that are still searching. The next search
+		starts new threads.
+		"""
+		with self._executor_lock:
+			executor, self._executor = self._executor, None
+		if executor is not None:
+			executor.shutdown(wait=False, cancel_futures=True)
+	
+	def __get_executor(self) -> ThreadPoolExecutor:
+		if self._executor is None:
+			with self._executor_lock:
+				if self._executor is None:
+					self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="qr-meta")
+		return self._executor
+	
+	search = search_list_result
+	asearch = asearch_list_result
+	search_many = search_list_result_many
+	
+	@typechecked
+	def fuse(self, rankings: Iterable[Optional[List[WebResult]]]) -> List[WebResult]:
+		"""
+		Merge the results of several engines by reciprocal-rank fusion.
+		:param rankings: The results of each engine, from the best to the worst. None stands for no result.
+		:return: The deduplicated results, from the best to the worst fused rank. Each url is represented by its best
+		ranked result (the first engine wins the ties), and the ties between urls are broken by the best rank.
+		"""
+		# Map each normalized url to [score, best rank, index of the engine, result]
+		merged = {}
+		for index, results in enumerate(rankings):
+			for rank, result in enumerate(results if results is not None else [], start=1):
+				key = normalize_url(result.url) if result.url is not None else ("untitled", index, rank)
+				entry = merged.get(key)
+				if entry is None:
+					merged[key] = [1. / (self.k + rank), rank, index, result]
+				else:
+					entry[0] += 1. / (self.k + rank)
+					if rank < entry[1]:
+						entry[1:] = [rank, index, result]
+		
+		entries = sorted(merged.values(), key=lambda e: (-e[0], e[1], e[2]))
+		return [entry[3] for entry in entries]
+	
+	def __merge(self, futures: list, keywords, deadline: Deadline) -> Optional[List[WebResult]]:
+		# Fuse the results of the engines that have answered. The other engines are kept as None, such that each engine
+		# keeps its index in the ties
+		rankings = []
+		errors = []
+		answered = False
+		for future in futures:
+			if not future.done() or future.cancelled():
+				rankings.append(None)
+			elif future.exception() is not None:
+				errors.append(future.exception())
+				rankings.append(None)
+			else:
+				rankings.append(future.result())
+				answered = True
+		
+		if not answered:
+			# The engines that have failed because of the deadline are like the ones that have not answered
+			errors = [error for error in errors if not isinstance(error, DeadlineExceededError)]
+			if len(errors) > 0 and not deadline.expired:
+				raise errors[0]
+			raise DeadlineExceededError("No web engine has answered to '{}' before the deadline".format(keywords))
+		
+		if all(results is None for results in rankings):
+			return None
+		
+		return self.fuse(rankings)
+	
+	# GETTERS & SETTERS #
+	
+	@property
+	def web_engines(self) -> List[WebEngine]:
+		return list(self._web_engines)
+	
+	@property
+	def name(self) -> str:
+		return '+'.join(engine.name for engine in self._web_engines)
+	
+	@property
+	def max_workers(self) -> int:
+		return self._max_workers
+	
+	@property
+	def parser(self) -> HtmlParser:
+		return self._web_engines[0].parser
+	
+	@parser.setter
+	@typechecked
+	def parser(self, parser: Union[str, HtmlParser]):
+		for engine in self._web_engines:
+			engine.parser = parser
+	
+	@property
+	def quorum(self) -> int:
+		return self._quorum
+	
+	@quorum.setter
+	@typechecked
+	def quorum(self, quorum: int):
+		if not 1 <= quorum <= len(self._web_engines):
+			raise ValueError("The quorum must be between 1 and the number of web engines ({}), got {}".format(
+				len(self._web_engines), quorum))
+		self._quorum = quorum
+	
+	@property
+	def timeout(self) -> Optional[Union[int, float]]:
+		return self._timeout
+	
+	@timeout.setter
+	@typechecked
+	def timeout(self, timeout: Optional[Union[int, float]]):
+		if timeout is not None and timeout < 0:
+			raise ValueError("The timeout must be positive (got {})".format(timeout))
+		self._timeout = timeout
+	
+	@property
+	def k(self) -> int:
+		return self._k
+	
+	@k.setter
+	@typechecked
+	def k(self, k: int):
+		if k < 0:
+			raise ValueError("k must be a positive integer (got {})".format(k))
+		self._k = k
+	
+	# OVERRIDES #
+	
+	def __enter__(self) -> 'MetaEngine':
+		return self
+	
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+	
+	def __eq__(self, o: object) -> bool:
+		return isinstance(o, MetaEngine) and self._web_engines == o._web_engines and self.quorum == o.quorum and \
+		       self.timeout == o.timeout and self.k == o.k
+	
+	def __str__(self) -> str:
+		return "MetaEngine ({})".format(", ".join(str(engine) for engine in self._web_engines))
+	
+	def __repr__(self) -> str:
+		return "MetaEngine{{web_engines='{}', quorum='{}', timeout='{}', k='{}'}}".format(
+			self._web_engines, self.quorum, self.timeout, self.k)
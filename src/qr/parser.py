@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+import html.parser
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup, NavigableString, CData, Tag
+
+from qr.config import typechecked
+
+
+class HtmlParser(ABC):
+	"""
+	Backend used to parse HTML pages and to run CSS selectors on them.
+	
+	WebEngine, Searcher and Quaero take either an instance of HtmlParser or one of the following names:
+	- "html.parser": BeautifulSoup with the parser of the standard library (the slowest, but always available)
+	- "lxml": BeautifulSoup with the lxml parser
+	- "html5lib": BeautifulSoup with the html5lib parser
+	- "selectolax": the selectolax (lexbor) parser, whose selectors run natively in C
+	"""
+	
+	__instances = {}
+	
+	# Features given to BeautifulSoup when the code needs a BeautifulSoup tree whatever the backend
+	soup_features = "html.parser"
+	
+	@property
+	@abstractmethod
+	def name(self) -> str:
+		pass
+	
+	@abstractmethod
+	def parse(self, content: str) -> Any:
+		"""
+		Parse the given HTML content and return the root node.
+		"""
+		pass
+	
+	@abstractmethod
+	def select(self, node: Any, selector: str) -> List[Any]:
+		"""
+		Return all the descendants of 'node' matching the CSS selector.
+		"""
+		pass
+	
+	@abstractmethod
+	def select_one(self, node: Any, selector: str) -> Optional[Any]:
+		"""
+		Return the first descendant of 'node' matching the CSS selector, or None if there is none.
+		"""
+		pass
+	
+	@abstractmethod
+	def get_text(self, node: Any) -> str:
+		"""
+		Return the text of the node and its descendants, without any tag.
+		"""
+		pass
+	
+	@abstractmethod
+	def iter_strings(self, node: Any) -> Iterator[Optional[str]]:
+		"""
+		Iterate over the texts of the node and its descendants in the order of the document, the same texts as
+		get_text(), and yield None for each <br> element.
+		"""
+		pass
+	
+	@abstractmethod
+	def get_attribute(self, node: Any, attribute: str) -> Optional[str]:
+		pass
+	
+	@abstractmethod
+	def remove(self, node: Any):
+		"""
+		Remove the node from its tree.
+		"""
+		pass
+	
+	@abstractmethod
+	def to_html(self, node: Any) -> str:
+		pass
+	
+	# BUILDERS #
+	
+	@staticmethod
+	@typechecked
+	def get(parser: Union[str, 'HtmlParser']) -> 'HtmlParser':
+		"""
+		Return the backend with the given name. The backends are stateless, so the same instance is shared.
+		:param parser: The name of the backend, or the backend itself.
+		:return: The backend.
+		:raise ValueError: If there is no backend with the given name.
+		:raise ImportError: If the library needed by the backend is not installed.
+		"""
+		if isinstance(parser, HtmlParser):
+			return parser
+		
+		name = parser.lower().strip()
+		instance = HtmlParser.__instances.get(name)
+		if instance is None:
+			if name in ("html.parser", "lxml", "html5lib"):
+				instance = SoupParser(name)
+			elif name == "selectolax":
+				instance = SelectolaxParser()
+			else:
+				raise ValueError("No HTML parser found with the name '{}'. Please use 'html.parser', 'lxml', "
+				                 "'html5lib' or 'selectolax'".format(parser))
+			HtmlParser.__instances[name] = instance
+		
+		return instance
+	
+	# OVERRIDES #
+	
+	def __eq__(self, other):
+		return isinstance(other, HtmlParser) and self.name == other.name
+	
+	def __hash__(self):
+		return hash(self.name)
+	
+	def __str__(self):
+		return self.name
+	
+	def __repr__(self):
+		return "{}{{name='{}'}}".format(type(self).__name__, self.name)
+
+
+class SoupParser(HtmlParser):
+	"""
+	BeautifulSoup backend. The selectors are run by soupsieve.
+	"""
+	
+	def __init__(self, features: str = "html.parser"):
+		if features != "html.parser":
+			# Fail now rather than at the first search
+			try:
+				BeautifulSoup("", features=features)
+			except Exception as e:
+				raise ImportError("The BeautifulSoup features '{}' are not available: {}".format(features, e))
+		
+		self._features = features
+	
+	@property
+	def name(self) -> str:
+		return self._features
+	
+	@property
+	def soup_features(self) -> str:
+		return self._features
+	
+	def parse(self, content: str) -> BeautifulSoup:
+		return BeautifulSoup(content, features=self._features)
+	
+	def select(self, node, selector: str) -> list:
+		return node.select(selector)
+	
+	def select_one(self, node, selector: str):
+		return node.select_one(selector)
+	
+	def get_text(self, node) -> str:
+		return node.text
+	
+	def iter_strings(self, node) -> Iterator[Optional[str]]:
+		if isinstance(node, NavigableString):
+			yield str(node)
+			return
+		
+		string_types = getattr(node, "interesting_string_types", (NavigableString, CData))
+		for descendant in node.descendants:
+			if isinstance(descendant, Tag):
+				if descendant.name == "br":
+					yield None
+			elif type(descendant) in string_types:
+				yield str(descendant)
+	
+	def get_attribute(self, node, attribute: str) -> Optional[str]:
+		value = node.get(attribute)
+		# Multi-valued attributes (such as 'class') are given as list by BeautifulSoup
+		if isinstance(value, list):
+			value = ' '.join(value)
+		return value
+	
+	def remove(self, node):
+		node.extract()
+	
+	def to_html(self, node) -> str:
+		return str(node)
+
+
+class SelectolaxParser(HtmlParser):
+	"""
+	selectolax backend, using the lexbor engine.
+	"""
+	
+	def __init__(self):
+		from selectolax.lexbor import LexborHTMLParser
+		self._parser_class = LexborHTMLParser
+	
+	@property
+	def name(self) -> str:
+		return "selectolax"
+	
+	def parse(self, content: str):
+		return self._parser_class(content)
+	
+	def select(self, node, selector: str) -> list:
+		return node.css(selector)
+	
+	def select_one(self, node, selector: str):
+		return node.css_first(selector)
+	
+	def get_text(self, node) -> str:
+		return node.text(deep=True)
+	
+	def iter_strings(self, node) -> Iterator[Optional[str]]:
+		for descendant in node.traverse(include_text=True):
+			if descendant.tag == "-text":
+				yield descendant.text(deep=False)
+			elif descendant.tag == "br":
+				yield None
+	
+	def get_attribute(self, node, attribute: str) -> Optional[str]:
+		return node.attributes.get(attribute)
+	
+	def remove(self, node):
+		node.decompose()
+	
+	def to_html(self, node) -> str:
+		return node.html
+
+
+class BlockSplitter(html.parser.HTMLParser):
+	"""
+	Event-based parser that splits an HTML page, fed incrementally, into the blocks matching a tag and a class.
+	
+	Each block is returned by feed_blocks() as soon as its closing tag has been read, so the blocks of a page can be
+	processed while the rest of the page is still downloading.
+		:Example:
+		splitter = BlockSplitter("div", "g")
+		for chunk in chunks:
+			for block in splitter.feed_blocks(chunk):
+				print(block)  # '<div class="g">...</div>'
+	"""
+	
+	def __init__(self, tag: str = "div", css_class: str = 'g'):
+		super(BlockSplitter, self).__init__(convert_charrefs=False)
+		self._tag = tag
+		self._css_class = css_class
+		# Number of 'tag' opened in the current block, 0 when outside of a block
+		self._depth = 0
+		self._buffer = []
+		self._blocks = []
+	
+	def feed_blocks(self, data: str) -> List[str]:
+		"""
+		Feed the parser with the next part of the page, and return the blocks that have been closed by it.
+		"""
+		self.feed(data)
+		blocks = self._blocks
+		self._blocks = []
+		return blocks
+	
+	def handle_starttag(self, tag, attrs):
+		if self._depth == 0:
+			if tag == self._tag and self._css_class in (dict(attrs).get("class") or "").split():
+				self._depth = 1
+				self._buffer = [self.get_starttag_text()]
+			return
+		
+		self._buffer.append(self.get_starttag_text())
+		if tag == self._tag:
+			self._depth += 1
+	
+	def handle_startendtag(self, tag, attrs):
+		if self._depth > 0:
+			self._buffer.append(self.get_starttag_text())
+	
+	def handle_endtag(self, tag):
+		if self._depth == 0:
+			return
+		
+		self._buffer.append("</{}>".format(tag))
+		if tag == self._tag:
+			self._depth -= 1
+			if self._depth == 0:
+				self._blocks.append(''.join(self._buffer))
+				self._buffer = []
+	
+	def handle_data(self, data):
+		if self._depth > 0:
+			self._buffer.append(data)
+	
+	def handle_entityref(self, name):
+		if self._depth > 0:
+			self._buffer.append("&{};".format(name))
+	
+	def handle_charref(self, name):
+		if self._depth > 0:
+			self._buffer.append("&#{};".format(name))
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
-from typing import Union, Optional, List
-from typeguard import *
+from concurrent.futures import Executor
+from typing import Union, Optional, List, Iterable, Iterator, Tuple
 
+from qr import tracing
+from qr.config import typechecked
+from qr.deadline import Deadline
 from qr.searcher import Searcher
 from qr.information import Info
+from qr.metaengine import MetaEngine
+from qr.parser import HtmlParser
+from qr.transport import Transport
 from qr.webengine import WebEngine
 from qr.webresult import WebResult
 
@@ -13,50 +19,109 @@ class Quaero:
 	# CONSTRUCTOR #
 	
 	@typechecked
-	def __init__(self, web_engine: Union[WebEngine, str, None] = None):
+	def __init__(self, web_engine: Union[WebEngine, MetaEngine, str, None] = None,
+	             transport: Optional[Transport] = None, parser: Optional[Union[str, HtmlParser]] = None):
+		"""
+		Constructor of Quaero.
+		:param web_engine: The web engine, or its name ('google', 'bing', 'yahoo', 'duckduckgo' or 'qwant'). A
+		MetaEngine searches on several web engines at once.
+		:param transport: The transport used for every download. If not given, the shared default transport is used.
+		:param parser: The HTML parser backend (see HtmlParser). If given, it is also set on the web engine. If not,
+		the parser of the web engine is used.
+		"""
+		self._transport = transport
+		
 		if web_engine is None:
-			web_engine = WebEngine.get_google()
+			web_engine = WebEngine.get_google(transport=transport)
 		elif isinstance(web_engine, str):
 			web_engine = web_engine.lower().strip()
 			if web_engine == "google":
-				web_engine = WebEngine.get_google()
+				web_engine = WebEngine.get_google(transport=transport)
 			elif web_engine == "bing":
-				web_engine = WebEngine.get_bing()
+				web_engine = WebEngine.get_bing(transport=transport)
 			elif web_engine == "yahoo":
-				web_engine = WebEngine.get_yahoo()
+				web_engine = WebEngine.get_yahoo(transport=transport)
 			elif web_engine.replace(' ', '') == "duckduckgo":
-				web_engine = WebEngine.get_duckduckgo()
+				web_engine = WebEngine.get_duckduckgo(transport=transport)
 			elif web_engine == "qwant":
-				web_engine = WebEngine.get_qwant()
+				web_engine = WebEngine.get_qwant(transport=transport)
 			else:
 				raise ValueError("No web engine found with the name '{}'. Please use 'google', 'bing', 'yahoo', "
 				                 "'duckduckgo' or 'qwant'".format(web_engine))
 		
+		if parser is not None:
+			web_engine.parser = parser
+		
 		self._web_engine = web_engine
 	
 	# QUAERO METHOD #
 	
 	@typechecked
 	def search(self, keyword: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
-	           website: Optional[Union[str, WebResult]] = None) -> Info:
-		s = Searcher(website)
-		return s.search(keywords=keyword, web_engine=self._web_engine)
+	           website: Optional[Union[str, WebResult]] = None,
+	           deadline: Optional[Union[Deadline, int, float]] = None) -> Info:
+		"""
+		Search the keyword on the website, or on the first result of the web engine if no website is given.
+		:param deadline: The deadline of the whole search (see Deadline), or its number of seconds from now. Every
+		download is given the time that remains.
+		:raise DeadlineExceededError: If the search cannot be completed before the deadline.
+		"""
+		deadline = Deadline.of(deadline)
+		s = Searcher(transport=self._transport, parser=self.web_engine.parser)
+		with tracing.span("quaero.search", engine=self.web_engine.name):
+			return s.search(website=website, keywords=keyword, web_engine=self._web_engine, deadline=deadline)
+	
+	@typechecked
+	async def asearch(self, keyword: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                  website: Optional[Union[str, WebResult]] = None, executor: Optional[Executor] = None,
+	                  deadline: Optional[Union[Deadline, int, float]] = None) -> Info:
+		"""
+		Asynchronous version of search(). Many searches can run concurrently on the same event loop.
+		"""
+		s = Searcher(transport=self._transport, parser=self.web_engine.parser)
+		with tracing.span("quaero.search", engine=self.web_engine.name):
+			return await s.asearch(website=website, keywords=keyword, web_engine=self._web_engine, executor=executor,
+			                       deadline=deadline)
+	
+	@typechecked
+	def search_many(self, queries: Iterable[Union[str, List[Union[str, int, float, complex, int, float, complex]]]],
+	                max_workers: int = 8, parse_in_processes: bool = False) \
+			-> Iterator[Tuple[Union[str, List[Union[str, int, float, complex]]], Optional[List[WebResult]]]]:
+		"""
+		Search all the given queries concurrently on the web engine, and yield each query with its results as soon as
+		they are ready.
+		.. seealso:: WebEngine.search_list_result_many
+		"""
+		return self.web_engine.search_list_result_many(queries, max_workers=max_workers,
+		                                               parse_in_processes=parse_in_processes)
 	
 	# GETTER & SETTER #
 	
 	@typechecked
-	def get_web_engine(self) -> WebEngine:
+	def get_web_engine(self) -> Union[WebEngine, MetaEngine]:
 		if self._web_engine is None:
-			self._web_engine = WebEngine.get_google()
+			self._web_engine = WebEngine.get_google(transport=self._transport)
 		
 		return self._web_engine
 	
 	@typechecked
-	def set_web_engine(self, web_engine: WebEngine):
+	def set_web_engine(self, web_engine: Union[WebEngine, MetaEngine]):
 		self._web_engine = web_engine
 	
 	web_engine = property(get_web_engine, set_web_engine)
 	
+	@typechecked
+	def get_transport(self) -> Transport:
+		if self._transport is None:
+			return Transport.get_default()
+		return self._transport
+	
+	@typechecked
+	def set_transport(self, transport: Optional[Transport]):
+		self._transport = transport
+	
+	transport = property(get_transport, set_transport)
+	
 	# OVERRIDES #
 	
 	def __eq__(self, other):
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+import threading
+import time
+import urllib.error
+from typing import Optional, Union, Iterator
+
+from qr.config import typechecked
+from qr.deadline import Deadline, DeadlineExceededError
+
+
+class BlockedError(OSError):
+	"""
+	Raised when a web engine answers with a block page (a captcha, or a "sorry" page) instead of the results.
+	"""
+	pass
+
+
+class TokenBucket:
+	"""
+	Token-bucket rate limiter, shared by the threads and the asyncio tasks of a web engine.
+	
+	The bucket holds at most 'capacity' tokens, and is refilled with 'rate' tokens per second. Each request takes a
+	token, and waits until one is available. The waiting requests are served in order: each one reserves its token
+	under a lock, and then sleeps (or awaits) without holding the lock.
+	
+	When the engine throttles a request, penalize() makes every request wait, and not only the one that is retried.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, rate: Union[int, float], capacity: int = 1):
+		"""
+		Constructor of TokenBucket.
+		:param rate: The number of tokens added per second, i.e. the sustained number of requests per second.
+		:param capacity: The maximum number of tokens, i.e. the size of the bursts.
+		:type capacity: int
+		"""
+		if rate <= 0:
+			raise ValueError("rate must be positive (got {})".format(rate))
+		
+		if capacity <= 0:
+			raise ValueError("capacity must be a positive integer (got {})".format(capacity))
+		
+		self._rate = rate
+		self._capacity = capacity
+		# The bucket is implemented by virtual scheduling (GCRA): the "theoretical arrival time" of the next request
+		# is the time at which the bucket would be full again. A request can be served 'capacity - 1' intervals
+		# before it
+		self._interval = 1. / rate
+		self._tolerance = (capacity - 1) * self._interval
+		self._arrival = 0.
+		self._lock = threading.Lock()
+		self._acquisitions = 0
+		self._queued = 0.
+		self._max_queued = 0.
+	
+	# BUCKET METHODS #
+	
+	@typechecked
+	def acquire(self, deadline: Optional[Union[Deadline, int, float]] = None) -> float:
+		"""
+		Take a token, waiting until one is available.
+		:param deadline: The deadline of the request (see Deadline), or its number of seconds from now.
+		:return: The number of seconds spent waiting.
+		:raise DeadlineExceededError: If no token is available before the deadline. The token is then not taken.
+		"""
+		delay = self.__reserve(Deadline.of(deadline))
+		if delay > 0:
+			time.sleep(delay)
+		return delay
+	
+	@typechecked
+	async def aacquire(self, deadline: Optional[Union[Deadline, int, float]] = None) -> float:
+		"""
+		Asynchronous version of acquire(). The event loop is not blocked while waiting.
+		"""
+		delay = self.__reserve(Deadline.of(deadline))
+		if delay > 0:
+			await asyncio.sleep(delay)
+		return delay
+	
+	@typechecked
+	def penalize(self, delay: Union[int, float]):
+		"""
+		Do not give any token during the next 'delay' seconds, for instance after the engine has throttled a request.
+		"""
+		with self._lock:
+			# The bucket is empty until the end of the penalty
+			self._arrival = max(self._arrival, time.monotonic() + delay + self._tolerance)
+	
+	def __reserve(self, deadline: Deadline) -> float:
+		# Take a token, and return the number of seconds to wait before using it
+		with self._lock:
+			now = time.monotonic()
+			arrival = max(self._arrival, now)
+			delay = max(0., arrival - self._tolerance - now)
+			
+			remaining = deadline.remaining()
+			if remaining is not None and delay > remaining:
+				raise DeadlineExceededError("No token is available before the deadline (queued for {:.3f} seconds)"
+				                            .format(delay))
+			
+			self._arrival = arrival + self._interval
+			self._acquisitions += 1
+			self._queued += delay
+			self._max_queued = max(self._max_queued, delay)
+			return delay
+	
+	# GETTERS #
+	
+	@property
+	def rate(self) -> Union[int, float]:
+		return self._rate
+	
+	@property
+	def capacity(self) -> int:
+		return self._capacity
+	
+	@property
+	def metrics(self) -> dict:
+		"""
+		The statistics of the time spent waiting for a token: the number of tokens taken ('acquisitions'), and the
+		total, mean and maximum number of seconds spent waiting ('queued', 'mean_queued' and 'max_queued').
+		"""
+		with self._lock:
+			return {
+				"acquisitions": self._acquisitions,
+				"queued": self._queued,
+				"mean_queued": self._queued / self._acquisitions if self._acquisitions > 0 else 0.,
+				"max_queued": self._max_queued,
+			}
+	
+	# OVERRIDES #
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "TokenBucket{{rate='{}', capacity='{}'}}".format(self.rate, self.capacity)
+
+
+class Backoff:
+	"""
+	Retry policy with jittered exponential backoff.
+	
+	The n-th retry (starting at 0) waits a random number of seconds between 0 and min(cap, base * 2^n) ("full
+	jitter"), such that the clients throttled at the same time do not retry at the same time. A longer "Retry-After"
+	given by the server is respected, up to 'cap'.
+	"""
+	
+	# The HTTP status codes of the throttled requests
+	retried_status_codes = frozenset((429, 503))
+	# Markers of the block pages served instead of the results (in lowercase)
+	block_page_markers = ("/sorry/index", "detected unusual traffic", "g-recaptcha", "captcha-form")
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, retries: int = 3, base: Union[int, float] = 0.5, cap: Union[int, float] = 30.):
+		"""
+		Constructor of Backoff.
+		:param retries: The maximum number of retries of a request.
+		:type retries: int
+		:param base: The maximum delay (in seconds) before the first retry.
+		:param cap: The maximum delay (in seconds) before any retry.
+		"""
+		if retries < 0:
+			raise ValueError("retries must be a positive integer (got {})".format(retries))
+		
+		self._retries = retries
+		self._base = base
+		self._cap = cap
+	
+	# BACKOFF METHODS #
+	
+	def delays(self) -> Iterator[float]:
+		"""
+		Yield the (jittered) delay before each retry.
+		"""
+		for attempt in range(self._retries):
+			yield random.uniform(0., min(self._cap, self._base * 2 ** attempt))
+	
+	def is_retried(self, error: Exception) -> bool:
+		"""
+		Tell if the request that raised 'error' must be retried.
+		"""
+		return isinstance(error, BlockedError) or \
+			(isinstance(error, urllib.error.HTTPError) and error.code in self.retried_status_codes)
+	
+	def get_delay(self, error: Exception, delay: float) -> float:
+		"""
+		Return the delay before retrying the request that raised 'error': 'delay', or the "Retry-After" of the server
+		if it is longer (up to 'cap').
+		"""
+		if isinstance(error, urllib.error.HTTPError) and error.headers is not None:
+			retry_after = error.headers.get("Retry-After")
+			try:
+				return max(delay, min(self._cap, float(retry_after)))
+			except (TypeError, ValueError):
+				pass
+		return delay
+	
+	@classmethod
+	def check_page(cls, url: str, content: str):
+		"""
+		Raise BlockedError if 'content' is a block page instead of a result page.
+		"""
+		lowered = content.lower()
+		for marker in cls.block_page_markers:
+			if marker in lowered:
+				raise BlockedError("The web engine has answered '{}' with a block page ('{}')".format(url, marker))
+	
+	# GETTERS #
+	
+	@property
+	def retries(self) -> int:
+		return self._retries
+	
+	@property
+	def base(self) -> Union[int, float]:
+		return self._base
+	
+	@property
+	def cap(self) -> Union[int, float]:
+		return self._cap
+	
+	# OVERRIDES #
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "Backoff{{retries='{}', base='{}', cap='{}'}}".format(self.retries, self.base, self.cap)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import urllib.error
+import zipfile
+from typing import Optional, Union, Iterator
+
+from qr.config import typechecked
+from qr.deadline import Deadline, DeadlineExceededError
+from qr.transport import Transport
+
+# Version of the layout of the archives
+ARCHIVE_VERSION = 1
+INDEX_NAME = "index.json"
+
+
+class RecordingTransport(Transport):
+	"""
+	Transport that records every exchange made through another transport (the result pages, the websites and the
+	thumbnails), such that ReplayTransport can play them again without any network access.
+	
+	The archive is a zip file holding an index of the urls ("index.json") and the bodies, compressed and stored once
+	even when several urls answer the same content (such as the same thumbnail). The error status codes are recorded
+	too, but not the network errors.
+	
+	The archive is written by save(), or when the transport is closed if it has been given a path.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, path: Optional[str] = None, transport: Optional[Transport] = None):
+		"""
+		Constructor of RecordingTransport.
+		:param path: The file where the archive is written when the transport is closed. If None, it must be written
+		with save().
+		:type path: Union[str, None]
+		:param transport: The transport that makes the requests. If not given, the shared default transport is used.
+		:type transport: Union[Transport, None]
+		"""
+		super(RecordingTransport, self).__init__()
+		self._path = path
+		self._transport = transport
+		self._lock = threading.Lock()
+		# url -> (status code, reason, sha1 of the body)
+		self._index = {}
+		# sha1 -> body
+		self._bodies = {}
+	
+	# TRANSPORT METHODS #
+	
+	@typechecked
+	def get(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		try:
+			content = self.transport.get(url, timeout=timeout)
+		except urllib.error.HTTPError as e:
+			self.__record_error(url, e)
+			raise
+		self.__record(url, content)
+		return content
+	
+	@typechecked
+	def iter_content(self, url: str, chunk_size: int = 16384, timeout: Optional[Union[int, float, Deadline]] = None) \
+			-> Iterator[bytes]:
+		# The whole body is recorded, even if the caller stops reading before the end
+		content = self.get(url, timeout=timeout)
+		for i in range(0, len(content), chunk_size):
+			yield content[i:i + chunk_size]
+	
+	@typechecked
+	async def aget(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		try:
+			content = await self.transport.aget(url, timeout=timeout)
+		except urllib.error.HTTPError as e:
+			self.__record_error(url, e)
+			raise
+		self.__record(url, content)
+		return content
+	
+	@typechecked
+	def save(self, path: Optional[str] = None):
+		"""
+		Write the archive of the exchanges recorded so far.
+		:param path: The file to write. If None, the path given to the constructor is used.
+		:type path: Union[str, None]
+		"""
+		if path is None:
+			path = self._path
+		if path is None:
+			raise ValueError("No path has been given for the archive")
+		
+		with self._lock:
+			index = {url: {"status": status, "reason": reason, "body": digest}
+			         for url, (status, reason, digest) in sorted(self._index.items())}
+			bodies = dict(self._bodies)
+		
+		with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+			archive.writestr(INDEX_NAME, json.dumps({"version": ARCHIVE_VERSION, "urls": index}, indent='\t'))
+			for digest in sorted(bodies.keys()):
+				archive.writestr(digest, bodies[digest])
+	
+	def close(self):
+		"""
+		Write the archive if a path has been given, and close the pooled connections of this transport (but not the
+		ones of the recorded transport, which can be shared).
+		"""
+		if self._path is not None:
+			self.save()
+		super(RecordingTransport, self).close()
+	
+	def __record(self, url: str, content: bytes):
+		digest = hashlib.sha1(content).hexdigest()
+		with self._lock:
+			self._bodies[digest] = content
+			self._index[url] = (200, "OK", digest)
+	
+	def __record_error(self, url: str, error: urllib.error.HTTPError):
+		with self._lock:
+			self._index[url] = (error.code, str(error.reason), None)
+	
+	# GETTERS & SETTERS #
+	
+	@property
+	def path(self) -> Optional[str]:
+		return self._path
+	
+	def get_transport(self) -> Transport:
+		if self._transport is None:
+			return Transport.get_default()
+		return self._transport
+	
+	def set_transport(self, transport: Optional[Transport]):
+		self._transport = transport
+	
+	transport = property(get_transport, set_transport)
+	
+	@property
+	def urls(self) -> list:
+		"""
+		The urls recorded so far.
+		"""
+		with self._lock:
+			return sorted(self._index.keys())
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		return len(self._index)
+	
+	def __repr__(self) -> str:
+		return "RecordingTransport{{path='{}', transport='{}'}}".format(self.path, repr(self.transport))
+
+
+class ReplayTransport(Transport):
+	"""
+	Transport that answers the requests from an archive written by RecordingTransport, without any network access.
+	
+	The latency of a network is simulated: each request waits 'latency' seconds, and then the time needed to transfer
+	its body at 'bandwidth' bytes per second. The coroutines wait with asyncio.sleep(), such that the whole pipeline can
+	be load-tested with thousands of concurrent requests. The deadlines are respected as by Transport.
+	
+	The urls that are not in the archive raise an HTTPError 404, as the recorded errors do.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, path: str, latency: Union[int, float] = 0., bandwidth: Optional[Union[int, float]] = None):
+		"""
+		Constructor of ReplayTransport.
+		:param path: The archive written by RecordingTransport.
+		:type path: str
+		:param latency: The number of seconds before the first byte of every response.
+		:param bandwidth: The number of bytes transferred per second. None means an infinite bandwidth.
+		"""
+		if latency < 0:
+			raise ValueError("latency must be positive (got {})".format(latency))
+		
+		if bandwidth is not None and bandwidth <= 0:
+			raise ValueError("bandwidth must be positive (got {})".format(bandwidth))
+		
+		super(ReplayTransport, self).__init__()
+		self._path = path
+		self._latency = latency
+		self._bandwidth = bandwidth
+		self._index, self._bodies = self.__load(path)
+		self._lock = threading.Lock()
+		self._requests = 0
+	
+	# TRANSPORT METHODS #
+	
+	@typechecked
+	def get(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		content = self.__lookup(url)
+		self.__sleep(url, self.__get_delay(len(content)), timeout)
+		return content
+	
+	@typechecked
+	def iter_content(self, url: str, chunk_size: int = 16384, timeout: Optional[Union[int, float, Deadline]] = None) \
+			-> Iterator[bytes]:
+		content = self.__lookup(url)
+		self.__sleep(url, self._latency, timeout)
+		for i in range(0, len(content), chunk_size):
+			chunk = content[i:i + chunk_size]
+			if self._bandwidth is not None:
+				self.__sleep(url, len(chunk) / self._bandwidth, timeout)
+			yield chunk
+	
+	@typechecked
+	async def aget(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		content = self.__lookup(url)
+		delay = self.__get_delay(len(content))
+		remaining = self.__get_remaining(timeout)
+		if remaining is not None and delay > remaining:
+			await asyncio.sleep(remaining)
+			self.__raise_timeout(url, timeout)
+		if delay > 0:
+			await asyncio.sleep(delay)
+		return content
+	
+	@staticmethod
+	def __load(path: str) -> tuple:
+		with zipfile.ZipFile(path) as archive:
+			index = json.loads(archive.read(INDEX_NAME).decode("utf-8"))
+			if index.get("version") != ARCHIVE_VERSION:
+				raise ValueError("Unsupported archive version in '{}' (got {})".format(path, index.get("version")))
+			
+			bodies = {name: archive.read(name) for name in archive.namelist() if name != INDEX_NAME}
+		return index["urls"], bodies
+	
+	def __lookup(self, url: str) -> bytes:
+		with self._lock:
+			self._requests += 1
+		
+		entry = self._index.get(url)
+		if entry is None:
+			raise urllib.error.HTTPError(url, 404, "Not in the archive", {}, None)
+		
+		if entry["status"] >= 400:
+			raise urllib.error.HTTPError(url, entry["status"], entry["reason"], {}, None)
+		
+		return self._bodies[entry["body"]]
+	
+	def __get_delay(self, size: int) -> float:
+		if self._bandwidth is None:
+			return self._latency
+		return self._latency + size / self._bandwidth
+	
+	@staticmethod
+	def __get_remaining(timeout: Optional[Union[int, float, Deadline]]) -> Optional[float]:
+		if isinstance(timeout, Deadline):
+			return timeout.remaining()
+		return timeout
+	
+	@staticmethod
+	def __raise_timeout(url: str, timeout: Optional[Union[int, float, Deadline]]):
+		if isinstance(timeout, Deadline):
+			raise DeadlineExceededError("The download of '{}' has exceeded its deadline".format(url))
+		raise TimeoutError("The download of '{}' has timed out after {} seconds".format(url, timeout))
+	
+	def __sleep(self, url: str, delay: float, timeout: Optional[Union[int, float, Deadline]]):
+		remaining = self.__get_remaining(timeout)
+		if remaining is not None and delay > remaining:
+			time.sleep(remaining)
+			self.__raise_timeout(url, timeout)
+		if delay > 0:
+			time.sleep(delay)
+	
+	# GETTERS & SETTERS #
+	
+	@property
+	def path(self) -> str:
+		return self._path
+	
+	def get_latency(self) -> Union[int, float]:
+		return self._latency
+	
+	@typechecked
+	def set_latency(self, latency: Union[int, float]):
+		if latency < 0:
+			raise ValueError("latency must be positive (got {})".format(latency))
+		self._latency = latency
+	
+	latency = property(get_latency, set_latency)
+	
+	def get_bandwidth(self) -> Optional[Union[int, float]]:
+		return self._bandwidth
+	
+	@typechecked
+	def set_bandwidth(self, bandwidth: Optional[Union[int, float]]):
+		if bandwidth is not None and bandwidth <= 0:
+			raise ValueError("bandwidth must be positive (got {})".format(bandwidth))
+		self._bandwidth = bandwidth
+	
+	bandwidth = property(get_bandwidth, set_bandwidth)
+	
+	@property
+	def urls(self) -> list:
+		return sorted(self._index.keys())
+	
+	@property
+	def requests(self) -> int:
+		"""
+		The number of requests answered (or refused) so far.
+		"""
+		return self._requests
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		return len(self._index)
+	
+	def __repr__(self) -> str:
+		return "ReplayTransport{{path='{}', latency='{}', bandwidth='{}'}}".format(self.path, self.latency,
+		                                                                          self.bandwidth)
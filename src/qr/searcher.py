@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
-import urllib
-import urllib.request
-from typing import Union, Optional, List, Any
+import asyncio
+import os
+from concurrent.futures import Executor
+from typing import Union, Optional, List, Iterable, Any
 
 from bs4 import Tag, Comment, PageElement, BeautifulSoup, Doctype
-from typeguard import *
 
+from qr import tracing
+from qr.config import typechecked
+from qr.deadline import Deadline
 from qr.keywords_error import KeywordsError
+from qr.parser import HtmlParser
+from qr.transport import Transport
 from qr.webengine import WebEngine
 from qr.information import Info
+from qr.metaengine import MetaEngine
 from qr.webutils import assess_url
 
 from qr.webresult import WebResult
@@ -22,16 +28,25 @@ class Searcher:
 	# CONSTRUCTOR
 	
 	@typechecked
-	def __init__(self, website: Optional[Union[str, WebResult]] = None):
+	def __init__(self, website: Optional[Union[str, WebResult]] = None, transport: Optional[Transport] = None,
+	             parser: Union[str, HtmlParser] = "html.parser"):
 		"""
 		Constructor of Searcher.
 		:param website: The website to search on. It can either be an URL to the website, the HTML content of the
 		website or a WebResult (given by WebEngine).
 		:type website: Union[str, WebResult, None]
+		:param transport: The transport used to download the website. If not given, the shared default transport is
+		used.
+		:type transport: Union[Transport, None]
+		:param parser: The HTML parser backend used to parse the website (see HtmlParser).
+		:type parser: Union[str, HtmlParser]
 		"""
+		self._transport = transport
+		self._parser = HtmlParser.get(parser)
+		
 		if website is None:
 			website = None
-
+		
 		# Configure website
 		website = self.__convert_website(website)
 		
@@ -42,8 +57,55 @@ class Searcher:
 	@typechecked
 	def search(self, website: Optional[Union[str, WebResult]] = None,
 	           keywords: Optional[Union[str, List[Union[str, int, float, complex, int, float, complex]]]] = None,
-	           web_engine: Optional[WebEngine] = None) \
+	           web_engine: Optional[Union[WebEngine, MetaEngine]] = None,
+	           deadline: Optional[Union[Deadline, int, float]] = None) -> Info:
+		"""
+		Search the keywords on the website. If no website is given, search on the first result of the web engine.
+		:param deadline: The deadline of the whole search (see Deadline), or its number of seconds from now. It is
+		given to the web engine, and to the download of the website.
+		:raise DeadlineExceededError: If the pages cannot be downloaded before the deadline.
+		"""
+		deadline = Deadline.of(deadline)
+		
+		# If 'website' is None, get the one from the constructor (if given)
+		if website is None:
+			website = self.get_website()
+		
+		# If 'web_engine' is None, get Google
+		if web_engine is None:
+			web_engine = WebEngine.get_google(transport=self._transport)
+			web_engine.parser = self._parser
+		
+		# At least one argument must be given
+		if website is None and keywords is None:
+			raise TypeError("'website' and 'keywords' cannot be both None")
+		
+		# If 'website' is None but 'keyword' is not, then research on the given web engine
+		if website is None and keywords is not None:
+			# Only the first result is needed: stop downloading the result page as soon as it is parsed
+			results = web_engine.iter_results(keywords, deadline=deadline)
+			try:
+				first_result = self.__get_first_result(results, keywords)
+			finally:
+				results.close()
+			website = self.__convert_website(first_result, deadline)
+			self.__write_html_debug(website)
+		else:
+			website = self.__convert_website(website, deadline)
+		
+		return self.__search_website(website, keywords)
+	
+	@typechecked
+	async def asearch(self, website: Optional[Union[str, WebResult]] = None,
+	                  keywords: Optional[Union[str, List[Union[str, int, float, complex, int, float, complex]]]] = None,
+	                  web_engine: Optional[Union[WebEngine, MetaEngine]] = None,
+	                  executor: Optional[Executor] = None, deadline: Optional[Union[Deadline, int, float]] = None) \
 			-> Info:
+		"""
+		Asynchronous version of search(). The pages are downloaded without blocking the event loop, and parsed in the
+		given executor (the default executor of the loop if None).
+		"""
+		deadline = Deadline.of(deadline)
 		
 		# If 'website' is None, get the one from the constructor (if given)
 		if website is None:
@@ -51,7 +113,8 @@ class Searcher:
 		
 		# If 'web_engine' is None, get Google
 		if web_engine is None:
-			web_engine = WebEngine.get_google()
+			web_engine = WebEngine.get_google(transport=self._transport)
+			web_engine.parser = self._parser
 		
 		# At least one argument must be given
 		if website is None and keywords is None:
@@ -59,21 +122,33 @@ class Searcher:
 		
 		# If 'website' is None but 'keyword' is not, then research on the given web engine
 		if website is None and keywords is not None:
-			results = web_engine.search_list_result(keywords)
-			if len(results) > 0:
-				website = results[0]
-				website = self.__convert_website(website)
-				with open("../../out/searcher_first_result.html", 'w') as f:
-					f.write(website)
-			else:
-				raise KeywordsError("Cannot find any results with the following keywords: {}".format(keywords))
+			results = await web_engine.asearch_list_result(keywords, executor=executor, deadline=deadline)
+			website = await self.__aconvert_website(self.__get_first_result(results, keywords), deadline)
+			self.__write_html_debug(website)
+		else:
+			website = await self.__aconvert_website(website, deadline)
 		
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(executor, self.__search_website, website, keywords)
+	
+	@typechecked
+	def __get_first_result(self, results: Optional[Iterable[WebResult]],
+	                       keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) \
+			-> WebResult:
+		for result in results if results is not None else []:
+			return result
+		
+		raise KeywordsError("Cannot find any results with the following keywords: {}".format(keywords))
+	
+	@typechecked
+	def __search_website(self, website: Union[str, WebResult],
+	                     keywords: Optional[Union[str, List[Union[str, int, float, complex, int, float, complex]]]]) \
+			-> Info:
 		# If 'website' is not None but keywords is, then search any content in the given website:
-		if website is not None and keywords is None:
+		if keywords is None:
 			return self.__search_anything(website)
-		
 		# if both 'website' and 'keywords' are not None, then search thoroughly
-		if website is not None and keywords is not None:
+		else:
 			return self.__search_thoroughly(website, keywords)
 	
 	@typechecked
@@ -100,7 +175,8 @@ class Searcher:
 		
 		def extract_text(html: Union[BeautifulSoup, str]) -> List[str]:
 			if isinstance(html, str):
-				html = BeautifulSoup(html, features="html.parser")
+				with tracing.span("searcher.parse", parser=self._parser.name):
+					html = BeautifulSoup(html, features=self._parser.soup_features)
 			
 			# Extract useless tags
 			[soup.extract() for soup in html.contents if isinstance(soup, Doctype)]
@@ -115,23 +191,26 @@ class Searcher:
 			return list(tag.strip() for tag in visible_tags)
 		
 		website = self.__convert_website(website)
-		print(extract_text(website))
+		with tracing.span("searcher.extract"):
+			texts = extract_text(website)
+		print(texts)
 		return Info()
 	
 	@typechecked
-	def __convert_website(self, website: Optional[Union[str, WebResult]]) -> Optional[str]:
+	def __convert_website(self, website: Optional[Union[str, WebResult]], deadline: Optional[Deadline] = None) \
+			-> Optional[str]:
 		"""
 		Configure the given argument such that it returns the HTML content of the given website
 		:param website: The website to convert.
 		:type website: Union[str, WebResult, None]
+		:param deadline: The deadline of the download of the website.
 		:return: Union[str, None]
 		"""
 		def get_html_content(url: str) -> str:
-			req = urllib.request.Request(url=url, headers={'User-Agent': 'Mozilla/5.0'})
-			content = ""
-			with urllib.request.urlopen(req) as f:
-				content = f.read().decode("utf-8")
-			return content
+			with tracing.span("searcher.download", url=url):
+				content = self.transport.get(url, timeout=deadline)
+			tracing.count("bytes_fetched", len(content), kind="website")
+			return content.decode("utf-8")
 		
 		if website is None:
 			return None
@@ -147,6 +226,30 @@ class Searcher:
 		else:
 			return None
 	
+	@typechecked
+	async def __aconvert_website(self, website: Optional[Union[str, WebResult]], deadline: Optional[Deadline] = None) \
+			-> Optional[str]:
+		"""
+		Asynchronous version of __convert_website().
+		"""
+		if isinstance(website, WebResult):
+			website = website.url
+		
+		# If the website is an url, download the page
+		if isinstance(website, str) and assess_url(website):
+			with tracing.span("searcher.download", url=website):
+				content = await self.transport.aget(website, timeout=deadline)
+			tracing.count("bytes_fetched", len(content), kind="website")
+			return content.decode("utf-8")
+		
+		return self.__convert_website(website, deadline)
+	
+	@staticmethod
+	def __write_html_debug(content: str):
+		if os.getenv("DEBUG", False) == "True":
+			with open("../../out/searcher_first_result.html", 'w') as f:
+				f.write(content)
+	
 	# GETTER & SETTER #
 	
 	@typechecked
@@ -159,6 +262,28 @@ class Searcher:
 	
 	website = property(get_website, set_website)
 	
+	@typechecked
+	def get_transport(self) -> Transport:
+		if self._transport is None:
+			return Transport.get_default()
+		return self._transport
+	
+	@typechecked
+	def set_transport(self, transport: Optional[Transport]):
+		self._transport = transport
+	
+	transport = property(get_transport, set_transport)
+	
+	@typechecked
+	def get_parser(self) -> HtmlParser:
+		return self._parser
+	
+	@typechecked
+	def set_parser(self, parser: Union[str, HtmlParser]):
+		self._parser = HtmlParser.get(parser)
+	
+	parser = property(get_parser, set_parser)
+	
 	# OVERRIDES #
 	
 	def __eq__(self, other):
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import sqlite3
+import threading
+from io import BytesIO
+from typing import Optional, Tuple, Union
+from PIL import Image
+
+from qr import tracing
+from qr.config import typechecked
+from qr.cache import MemoryCache
+from qr.deadline import Deadline
+from qr.transport import Transport
+
+
+class ThumbnailStore:
+	"""
+	Content-addressed store of thumbnails.
+	
+	The raw bytes of each thumbnail are stored once per content hash in a SQLite file, and each url is mapped to the
+	hash of its content, so an image is downloaded once per unique url and stored once per unique content. The decoded
+	images are kept in a MemoryCache bounded by 'max_memory_bytes', and can be downscaled to 'max_size' when decoded.
+	The results given a store only keep the url of their thumbnail, and get the image from the store on each access,
+	such that the decoded images kept in memory stay within this bound.
+	.. note:: The same Image instance is given to all the results sharing a thumbnail: it must not be modified.
+	"""
+	
+	# CONSTRUCTOR #
+	
+	@typechecked
+	def __init__(self, path: str = ":memory:", max_memory_bytes: int = 32 * 1024 * 1024,
+	             max_size: Optional[Tuple[int, int]] = None):
+		"""
+		Constructor of ThumbnailStore.
+		:param path: The path to the SQLite file storing the raw bytes. By default, they are only kept in memory.
+		:type path: str
+		:param max_memory_bytes: The maximum number of bytes used by the decoded images.
+		:type max_memory_bytes: int
+		:param max_size: The maximum (width, height) of a decoded image. Larger images are downscaled, keeping their
+		aspect ratio. None means that images are never downscaled.
+		"""
+		self._path = path
+		self._max_size = max_size
+		self._images = MemoryCache(max_memory_bytes)
+		self._downloads = 0
+		self._lock = threading.Lock()
+		self._url_locks = {}
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		self._connection.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, hash TEXT NOT NULL)")
+		self._connection.execute("CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, content BLOB NOT NULL)")
+		self._connection.commit()
+	
+	# STORE METHODS #
+	
+	@typechecked
+	def get_image(self, url: str, transport: Optional[Transport] = None,
+	              timeout: Optional[Union[int, float, Deadline]] = None) -> Image.Image:
+		"""
+		Return the decoded thumbnail at the given url, downloading it only if its url is unknown.
+		:param url: The url of the thumbnail.
+		:type url: str
+		:param transport: The transport used to download the thumbnail. If not given, the shared default transport is
+		used.
+		:param timeout: The maximum number of seconds to wait for the download, or a Deadline.
+		:return: The decoded (and possibly downscaled) image.
+		:raise OSError: If the thumbnail cannot be downloaded or decoded.
+		"""
+		content = None
+		digest = self.get_hash(url)
+		tracing.count("cache.misses" if digest is None else "cache.hits", cache="thumbnail")
+		if digest is None:
+			digest, content = self.__download(url, transport, timeout)
+		
+		image = self._images.get(digest)
+		if image is None:
+			if content is None:
+				content = self.get_content(digest)
+				if content is None:
+					# The url refers to a content that is no longer stored: it is forgotten and downloaded again
+					with self._lock:
+						self._connection.execute("DELETE FROM urls WHERE url = ? AND hash = ?", (url, digest))
+						self._connection.commit()
+					digest, content = self.__download(url, transport, timeout)
+			image = self.__decode(content)
+			self._images.put(digest, image, image.width * image.height * len(image.getbands()))
+		
+		return image
+	
+	def __download(self, url: str, transport: Optional[Transport],
+	               timeout: Optional[Union[int, float, Deadline]]) -> Tuple[str, Optional[bytes]]:
+		# Make sure that concurrent requests of the same url only download it once
+		with self._lock:
+			url_lock = self._url_locks.setdefault(url, threading.Lock())
+		try:
+			with url_lock:
+				content = None
+				digest = self.get_hash(url)
+				if digest is None:
+					if transport is None:
+						transport = Transport.get_default()
+					content = transport.get(url, timeout=timeout)
+					tracing.count("bytes_fetched", len(content), kind="thumbnail")
+					digest = self.put(url, content)
+		finally:
+			# The lock is dropped even after a failure, such that the urls that cannot be downloaded are not kept
+			with self._lock:
+				if self._url_locks.get(url) is url_lock:
+					del self._url_locks[url]
+		return digest, content
+	
+	@typechecked
+	def put(self, url: str, content: bytes) -> str:
+		"""
+		Store the raw bytes of the thumbnail at the given url.
+		:return: The hash of the content.
+		:rtype: str
+		"""
+		digest = hashlib.sha256(content).hexdigest()
+		with self._lock:
+			self._downloads += 1
+			self._connection.execute("INSERT OR IGNORE INTO blobs (hash, content) VALUES (?, ?)", (digest, content))
+			self._connection.execute("INSERT OR REPLACE INTO urls (url, hash) VALUES (?, ?)", (url, digest))
+			self._connection.commit()
+		return digest
+	
+	@typechecked
+	def get_hash(self, url: str) -> Optional[str]:
+		"""
+		Return the hash of the content stored for the given url, or None if the url is unknown.
+		"""
+		with self._lock:
+			row = self._connection.execute("SELECT hash FROM urls WHERE url = ?", (url,)).fetchone()
+		return row[0] if row is not None else None
+	
+	@typechecked
+	def get_content(self, digest: str) -> Optional[bytes]:
+		"""
+		Return the raw bytes stored with the given hash, or None if there is none.
+		"""
+		with self._lock:
+			row = self._connection.execute("SELECT content FROM blobs WHERE hash = ?", (digest,)).fetchone()
+		return row[0] if row is not None else None
+	
+	def close(self):
+		with self._lock:
+			self._connection.close()
+	
+	def __decode(self, content: bytes) -> Image.Image:
+		image = Image.open(BytesIO(content))
+		if self._max_size is not None:
+			# Downscale while decoding (JPEG can be decoded directly at a lower resolution)
+			image.draft(image.mode, self._max_size)
+			image.thumbnail(self._max_size)
+		image.load()
+		return image
+	
+	# GETTERS #
+	
+	@property
+	def path(self) -> str:
+		return self._path
+	
+	@property
+	def max_size(self) -> Optional[Tuple[int, int]]:
+		return self._max_size
+	
+	@property
+	def memory_cache(self) -> MemoryCache:
+		return self._images
+	
+	@property
+	def downloads(self) -> int:
+		"""
+		The number of thumbnails downloaded since the creation of the store.
+		"""
+		return self._downloads
+	
+	# OVERRIDES #
+	
+	def __len__(self) -> int:
+		with self._lock:
+			return self._connection.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+	
+	def __enter__(self) -> 'ThumbnailStore':
+		return self
+	
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+	
+	def __repr__(self) -> str:
+		return "ThumbnailStore{{path='{}', max_size='{}', downloads='{}', memory_cache='{}'}}".format(
+			self.path, self.max_size, self.downloads, repr(self.memory_cache))
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Tracing of the stages of a search.
+
+WebEngine, Searcher, WebResult and Info open a span around each stage of a search (the download of the result page,
+its parsing, the extraction of the results, the download of the thumbnails and of the website, ...), and increment
+counters (the bytes fetched, the results parsed, the cache hits and misses). They are given to the hooks registered
+with add_hook():
+
+	recorder = qr.tracing.TraceRecorder()
+	qr.tracing.add_hook(recorder)
+	Quaero().search("python")
+	print(recorder.spans["webengine.download"], recorder.counters["bytes_fetched"])
+
+OpenTelemetryHook forwards them to OpenTelemetry, if it is installed.
+
+When no hook is registered, span() returns a shared span that does nothing, and count() returns at once: the
+instrumentation then costs a function call per stage.
+"""
+import threading
+import time
+from typing import Any, Optional
+
+try:
+	from opentelemetry import context as otel_context, metrics as otel_metrics, trace as otel_trace
+except ImportError:
+	otel_context = otel_metrics = otel_trace = None
+
+# The registered hooks. The tuple is replaced (and never modified) when a hook is added or removed, such that it can
+# be read without any lock
+_hooks = ()
+_lock = threading.Lock()
+
+
+class TraceHook:
+	"""
+	Receiver of the spans and counters of qr. The methods of the hooks must be thread-safe, and must not raise.
+	"""
+	
+	def on_start(self, name: str, attributes: dict) -> Any:
+		"""
+		Called when a span starts.
+		:param name: The name of the stage, such as "webengine.download".
+		:param attributes: The attributes of the span (such as the name of the engine). They can be completed until
+		the span ends.
+		:return: Any state, given back to on_end().
+		"""
+		return None
+	
+	def on_end(self, name: str, attributes: dict, state: Any, duration: float, error: Optional[BaseException]):
+		"""
+		Called when a span ends.
+		:param state: The value returned by on_start() for this span.
+		:param duration: The duration of the span, in seconds.
+		:param error: The exception that has ended the span, or None.
+		"""
+		pass
+	
+	def on_count(self, name: str, value: int, attributes: dict):
+		"""
+		Called when a counter is incremented.
+		"""
+		pass
+
+
+class Span:
+	"""
+	Span given to the registered hooks. Use span() to create it.
+	"""
+	
+	__slots__ = ("_name", "_attributes", "_hooks", "_states", "_start")
+	
+	def __init__(self, name: str, attributes: dict, hooks: tuple):
+		self._name = name
+		self._attributes = attributes
+		self._hooks = hooks
+		self._states = None
+		self._start = None
+	
+	def set_attribute(self, key: str, value: Any):
+		self._attributes[key] = value
+	
+	@property
+	def name(self) -> str:
+		return self._name
+	
+	@property
+	def attributes(self) -> dict:
+		return self._attributes
+	
+	def __enter__(self) -> 'Span':
+		self._states = [hook.on_start(self._name, self._attributes) for hook in self._hooks]
+		self._start = time.perf_counter()
+		return self
+	
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		duration = time.perf_counter() - self._start
+		# A generator closed by its caller (such as WebEngine.iter_results() after the first result) has not failed
+		error = exc_val if not isinstance(exc_val, GeneratorExit) else None
+		for hook, state in zip(self._hooks, self._states):
+			hook.on_end(self._name, self._attributes, state, duration, error)
+		return False
+
+
+class _NoopSpan:
+	"""
+	Span returned when no hook is registered.
+	"""
+	
+	__slots__ = ()
+	
+	def set_attribute(self, key: str, value: Any):
+		pass
+	
+	def __enter__(self) -> '_NoopSpan':
+		return self
+	
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		return False
+
+
+_noop_span = _NoopSpan()
+
+
+def span(name: str, **attributes):
+	"""
+	Return a context manager measuring the stage 'name' for the registered hooks.
+	"""
+	hooks = _hooks
+	if not hooks:
+		return _noop_span
+	return Span(name, attributes, hooks)
+
+
+def count(name: str, value: int = 1, **attributes):
+	"""
+	Increment the counter 'name' by 'value' for the registered hooks.
+	"""
+	hooks = _hooks
+	if hooks:
+		for hook in hooks:
+			hook.on_count(name, value, attributes)
+
+
+def is_enabled() -> bool:
+	"""
+	Tell if a hook is registered. The callers can test it before computing an expensive attribute.
+	"""
+	return len(_hooks) > 0
+
+
+def add_hook(hook: TraceHook):
+	global _hooks
+	
+	with _lock:
+		if hook not in _hooks:
+			_hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: TraceHook):
+	global _hooks
+	
+	with _lock:
+		_hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def get_hooks() -> tuple:
+	return _hooks
+
+
+class TraceRecorder(TraceHook):
+	"""
+	Hook aggregating the spans and the counters in memory.
+	
+	'spans' maps the name of each stage to its statistics: the number of spans ("count"), the number of them that
+	ended with an error ("errors"), and their total and maximum durations in seconds ("total" and "max"). 'counters'
+	maps the name of each counter to its value, summed over all the attributes.
+	"""
+	
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.spans = {}
+		self.counters = {}
+	
+	def on_end(self, name: str, attributes: dict, state: Any, duration: float, error: Optional[BaseException]):
+		with self._lock:
+			stats = self.spans.get(name)
+			if stats is None:
+				stats = self.spans[name] = {"count": 0, "errors": 0, "total": 0., "max": 0.}
+			stats["count"] += 1
+			stats["errors"] += error is not None
+			stats["total"] += duration
+			stats["max"] = max(stats["max"], duration)
+	
+	def on_count(self, name: str, value: int, attributes: dict):
+		with self._lock:
+			self.counters[name] = self.counters.get(name, 0) + value
+	
+	def reset(self):
+		with self._lock:
+			self.spans = {}
+			self.counters = {}
+	
+	def __repr__(self) -> str:
+		return "TraceRecorder{{spans='{}', counters='{}'}}".format(self.spans, self.counters)
+
+
+class OpenTelemetryHook(TraceHook):
+	"""
+	Hook forwarding the spans and the counters to OpenTelemetry. The spans of a thread are nested in the span that is
+	current when they start.
+	"""
+	
+	def __init__(self, tracer: Any = None, meter: Any = None):
+		"""
+		Constructor of OpenTelemetryHook.
+		:param tracer: The OpenTelemetry tracer. If None, the tracer "qr" of the global tracer provider is used.
+		:param meter: The OpenTelemetry meter. If None, the meter "qr" of the global meter provider is used.
+		:raise ImportError: If OpenTelemetry is not installed.
+		"""
+		if otel_trace is None:
+			raise ImportError("OpenTelemetryHook requires the package opentelemetry-api")
+		
+		self._tracer = tracer if tracer is not None else otel_trace.get_tracer("qr")
+		self._meter = meter if meter is not None else otel_metrics.get_meter("qr")
+		self._counters = {}
+		self._lock = threading.Lock()
+	
+	def on_start(self, name: str, attributes: dict) -> Any:
+		span = self._tracer.start_span(name, attributes=attributes)
+		token = otel_context.attach(otel_trace.set_span_in_context(span))
+		return span, token
+	
+	def on_end(self, name: str, attributes: dict, state: Any, duration: float, error: Optional[BaseException]):
+		span, token = state
+		otel_context.detach(token)
+		span.set_attributes(attributes)
+		if error is not None:
+			span.record_exception(error)
+			span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(error)))
+		span.end()
+	
+	def on_count(self, name: str, value: int, attributes: dict):
+		counter = self._counters.get(name)
+		if counter is None:
+			with self._lock:
+				counter = self._counters.get(name)
+				if counter is None:
+					counter = self._counters[name] = self._meter.create_counter(name)
+		counter.add(value, attributes)
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import urllib.error
+import weakref
+from typing import Optional, Union, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from qr.config import typechecked
+from qr.deadline import Deadline, DeadlineExceededError
+
+# aiohttp is slow to import: it is imported by the first asynchronous request (False if it is not installed)
+_aiohttp = None
+
+
+def _get_aiohttp():
+	"""
+	Return the module aiohttp, or None if it is not installed.
+	"""
+	global _aiohttp
+	
+	if _aiohttp is None:
+		try:
+			import aiohttp
+			_aiohttp = aiohttp
+		except ImportError:
+			_aiohttp = False
+	return _aiohttp or None
+
+
+class Transport:
+	"""
+	HTTP transport shared by WebEngine, Searcher and WebResult.
+
+	The transport keeps one pool of keep-alive connections per host, such that a result page and all of its
+	thumbnails reuse a handful of sockets instead of paying a new TCP+TLS handshake for every request.
+	
+	The coroutines aget() and aget_text() use a non-blocking aiohttp session when aiohttp is installed, and fall back
+	on running the blocking session in the event loop's default executor otherwise. One aiohttp session is kept per
+	event loop. It must be released by awaiting aclose() (or with "async with transport:") before its event loop is
+	closed; the sessions of the event loops closed without it are only forgotten.
+	
+	The timeout of every method can be a Deadline: the request is then given the time that remains until the deadline,
+	and DeadlineExceededError is raised when it expires (including while the body is being read).
+	"""
+
+	__default = None
+	__default_lock = threading.Lock()
+
+	# CONSTRUCTOR #
+
+	@typechecked
+	def __init__(self, pool_size: int = 10, pool_connections: int = 10, user_agent: str = "Mozilla/5.0"):
+		"""
+		Constructor of Transport.
+		:param pool_size: The maximum number of keep-alive connections kept for each host.
+		:type pool_size: int
+		:param pool_connections: The number of hosts for which a connection pool is kept.
+		:type pool_connections: int
+		:param user_agent: The User-Agent header sent with every request.
+		:type user_agent: str
+		"""
+		if pool_size <= 0:
+			raise ValueError("pool_size must be a positive integer (got {})".format(pool_size))
+
+		if pool_connections <= 0:
+			raise ValueError("pool_connections must be a positive integer (got {})".format(pool_connections))
+
+		self._pool_size = pool_size
+		self._pool_connections = pool_connections
+		self._user_agent = user_agent
+		self._session = self.__create_session()
+		# An aiohttp session is bound to the event loop that created it: one session is kept per event loop
+		self._async_sessions = weakref.WeakKeyDictionary()
+		self._async_lock = threading.Lock()
+
+	# TRANSPORT METHODS #
+
+	@typechecked
+	def get(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		"""
+		Download the content at the given url, reusing a pooled connection when possible.
+		:param url: The url to download.
+		:type url: str
+		:param timeout: The maximum number of seconds to wait for the server, or a Deadline. None means no timeout.
+		:return: The raw body of the response.
+		:rtype: bytes
+		:raise urllib.error.HTTPError: If the server answers with an error status code.
+		:raise DeadlineExceededError: If 'timeout' is a Deadline that expires before the end of the body.
+		"""
+		if isinstance(timeout, Deadline):
+			# The timeout of requests only bounds each read: check the deadline between the chunks
+			return b''.join(self.iter_content(url, timeout=timeout))
+		
+		response = self._session.get(url, timeout=timeout)
+		self.raise_for_status(url, response)
+		return response.content
+
+	@typechecked
+	def get_text(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None, encoding: str = "utf-8") -> str:
+		"""
+		Download the content at the given url and decode it.
+		:param url: The url to download.
+		:type url: str
+		:param timeout: The maximum number of seconds to wait for the server, or a Deadline. None means no timeout.
+		:param encoding: The encoding used to decode the body.
+		:type encoding: str
+		:return: The decoded body of the response.
+		:rtype: str
+		"""
+		return self.get(url, timeout=timeout).decode(encoding)
+
+	@typechecked
+	def iter_content(self, url: str, chunk_size: int = 16384, timeout: Optional[Union[int, float, Deadline]] = None) \
+			-> Iterator[bytes]:
+		"""
+		Download the content at the given url chunk by chunk, as the bytes arrive.
+		
+		If the iterator is closed before the end of the body, the connection is closed instead of being read until the
+		end.
+		:param url: The url to download.
+		:type url: str
+		:param chunk_size: The maximum size of each chunk, in bytes.
+		:type chunk_size: int
+		:param timeout: The maximum number of seconds to wait for the server, or a Deadline. None means no timeout.
+		:return: An iterator over the chunks of the body.
+		:raise urllib.error.HTTPError: If the server answers with an error status code.
+		"""
+		deadline = timeout if isinstance(timeout, Deadline) else None
+		try:
+			response = self._session.get(url, timeout=self.__get_timeout(url, timeout), stream=True)
+		except requests.exceptions.Timeout as e:
+			self.__raise_for_deadline(url, deadline, e)
+			raise
+		
+		try:
+			self.raise_for_status(url, response)
+			for chunk in response.iter_content(chunk_size=chunk_size):
+				if deadline is not None:
+					deadline.check("The download of '{}'".format(url))
+				yield chunk
+		except requests.exceptions.RequestException as e:
+			self.__raise_for_deadline(url, deadline, e)
+			raise
+		finally:
+			response.close()
+	
+	@typechecked
+	async def aget(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None) -> bytes:
+		"""
+		Asynchronous version of get().
+		:param url: The url to download.
+		:type url: str
+		:param timeout: The maximum number of seconds to wait for the server, or a Deadline. None means no timeout.
+		:return: The raw body of the response.
+		:rtype: bytes
+		:raise urllib.error.HTTPError: If the server answers with an error status code.
+		"""
+		aiohttp = _get_aiohttp()
+		if aiohttp is None:
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(None, self.get, url, timeout)
+		
+		deadline = timeout if isinstance(timeout, Deadline) else None
+		session = self.__get_async_session()
+		try:
+			async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.__get_timeout(url, timeout))) \
+					as response:
+				if response.status >= 400:
+					raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+				return await response.read()
+		except asyncio.TimeoutError as e:
+			self.__raise_for_deadline(url, deadline, e)
+			raise
+	
+	@typechecked
+	async def aget_text(self, url: str, timeout: Optional[Union[int, float, Deadline]] = None,
+	                    encoding: str = "utf-8") -> str:
+		"""
+		Asynchronous version of get_text().
+		"""
+		content = await self.aget(url, timeout=timeout)
+		return content.decode(encoding)
+	
+	def close(self):
+		"""
+		Close all the pooled connections.
+		"""
+		self._session.close()
+	
+	async def aclose(self):
+		"""
+		Close all the pooled connections, including the ones of the asynchronous session. It must be awaited in the
+		event loop that used the transport, before this event loop is closed.
+		"""
+		self.close()
+		with self._async_lock:
+			session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+			self.__forget_closed_loops()
+		if session is not None:
+			await session.close()
+
+	@staticmethod
+	def raise_for_status(url: str, response: requests.Response):
+		"""
+		Raise the same error as urllib.request.urlopen if the response has an error status code.
+		"""
+		if response.status_code >= 400:
+			raise urllib.error.HTTPError(url, response.status_code, response.reason, response.headers, None)
+
+	@staticmethod
+	def __get_timeout(url: str, timeout: Optional[Union[int, float, Deadline]]) -> Optional[Union[int, float]]:
+		if isinstance(timeout, Deadline):
+			return timeout.timeout("The download of '{}'".format(url))
+		return timeout
+	
+	@staticmethod
+	def __raise_for_deadline(url: str, deadline: Optional[Deadline], error: Exception):
+		# A request that times out (or whose connection is closed) because of its deadline raises DeadlineExceededError
+		if deadline is not None and deadline.expired:
+			raise DeadlineExceededError("The download of '{}' has exceeded its deadline".format(url)) from error
+	
+	def __create_session(self) -> requests.Session:
+		session = requests.Session()
+		session.headers["User-Agent"] = self._user_agent
+		adapter = HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=self._pool_size)
+		session.mount("http://", adapter)
+		session.mount("https://", adapter)
+		return session
+	
+	def __get_async_session(self) -> 'aiohttp.ClientSession':
+		loop = asyncio.get_running_loop()
+		with self._async_lock:
+			session = self._async_sessions.get(loop)
+			if session is not None:
+				return session
+			
+			self.__forget_closed_loops()
+			aiohttp = _get_aiohttp()
+			connector = aiohttp.TCPConnector(limit=self._pool_size * self._pool_connections,
+			                                 limit_per_host=self._pool_size)
+			session = aiohttp.ClientSession(connector=connector, headers={"User-Agent": self._user_agent})
+			self._async_sessions[loop] = session
+			return session
+	
+	def __forget_closed_loops(self):
+		# A session refers to its event loop, which is therefore not collected while the session is kept. The sessions
+		# of the event loops closed without aclose() can no longer be closed: they are only forgotten
+		for loop in [loop for loop in self._async_sessions.keys() if loop.is_closed()]:
+			self._async_sessions.pop(loop).detach()
+
+	# BUILDERS #
+
+	@staticmethod
+	def get_default() -> 'Transport':
+		"""
+		Return the transport shared by every object that has not been given one explicitly.
+		"""
+		if Transport.__default is None:
+			with Transport.__default_lock:
+				if Transport.__default is None:
+					Transport.__default = Transport()
+		return Transport.__default
+
+	# GETTERS #
+
+	@property
+	def pool_size(self) -> int:
+		return self._pool_size
+
+	@property
+	def pool_connections(self) -> int:
+		return self._pool_connections
+
+	@property
+	def user_agent(self) -> str:
+		return self._user_agent
+
+	# OVERRIDES #
+
+	def __enter__(self) -> 'Transport':
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+	async def __aenter__(self) -> 'Transport':
+		return self
+	
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.aclose()
+	
+	def __str__(self) -> str:
+		return self.__repr__()
+
+	def __repr__(self) -> str:
+		return "Transport{{pool_size='{}', pool_connections='{}', user_agent='{}'}}".format(
+			self.pool_size, self.pool_connections, self.user_agent)
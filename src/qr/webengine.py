@@ -1,13 +1,28 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import codecs
+import collections
 import os
 import re
+import sys
+import threading
+import time
 import urllib.parse
-import urllib.request
-from bs4 import BeautifulSoup, Tag
-from typing import Union, Optional, List, Iterable, Tuple
-from typeguard import *
+import itertools
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from bs4 import BeautifulSoup
+from typing import Union, Optional, List, Iterable, Iterator, Tuple, Any
 
-from qr.webutils import assess_url
+from qr import tracing
+from qr.config import typechecked
+from qr.cache import SerpCache, MemoryCache
+from qr.deadline import Deadline
+from qr.hedging import LatencyTracker, hedge, hedge_deadline
+from qr.ratelimit import TokenBucket, Backoff
+from qr.parser import HtmlParser, BlockSplitter
+from qr.thumbnail_store import ThumbnailStore
+from qr.transport import Transport
+from qr.webutils import assess_url, assess_urls, normalize_text, normalize_url
 from qr.webresult import WebResult
 
 
@@ -15,9 +30,45 @@ class WebEngine:
 	"""
 	Class that represents a web engine, such as Google.
 	"""
-
+	
+	# CSS selectors used to extract the Google results. The title selectors are tried in order.
+	google_selectors = {
+		"item": "div.g",
+		"titles": ("h3.r", "h3.p9j1ue", "h3"),
+		"link": "a[href]",
+		"date": "span.st span.f span.nobr",
+		"description": "span.st",
+		"description_date": "span.f",
+		"thumbnail": "img[src]",
+	}
+	
 	@typechecked
-	def __init__(self, name: str, home_url: str, pattern_search_url: str):
+	def __init__(self, name: str, home_url: str, pattern_search_url: str, transport: Optional[Transport] = None,
+	             cache: Optional[SerpCache] = None, memory_cache: Optional[MemoryCache] = None,
+	             parser: Union[str, HtmlParser] = "html.parser", thumbnail_store: Optional[ThumbnailStore] = None,
+	             mirror_pattern_search_url: Optional[str] = None, latency_tracker: Optional[LatencyTracker] = None,
+	             rate_limiter: Optional[TokenBucket] = None, backoff: Optional[Backoff] = None,
+	             page_parameter: Optional[str] = None, first_offset: int = 0, results_per_page: int = 10):
+		"""
+		Constructor of WebEngine.
+		:param mirror_pattern_search_url: The pattern search url of a mirror of the engine. If given, the requests are
+		hedged: a request that has not answered after the 95th percentile of the latencies of the engine is sent again
+		to the mirror, and the first answer is kept. The hedged requests that have no deadline are given
+		qr.hedging.DEFAULT_TIMEOUT seconds, such that the request that loses the race ends.
+		:type mirror_pattern_search_url: Union[str, None]
+		:param latency_tracker: The latencies of the hedged requests. A new tracker is created if None.
+		:param rate_limiter: The rate limiter of the requests to the engine, shared by all the threads and tasks using
+		it. If None, the requests are not limited.
+		:param backoff: The retry policy of the requests that are throttled (status 429 or 503) or answered with a block
+		page (see Backoff). If None, they are not retried, and the block pages are not detected.
+		:param page_parameter: The parameter of the query string giving the offset of the first result of a page (such
+		as "start" for Google). If None, only the first page of results can be downloaded.
+		:type page_parameter: Union[str, None]
+		:param first_offset: The offset of the first result of the first page (0 or 1, depending on the engine).
+		:type first_offset: int
+		:param results_per_page: The number of results of each page, used to compute the offset of the next pages.
+		:type results_per_page: int
+		"""
 		if len(name) == 0:
 			raise TypeError("name must be a non-empty string")
 		
@@ -27,13 +78,40 @@ class WebEngine:
 		if not assess_url(pattern_search_url.format("")):
 			raise TypeError("The pattern search url '{}' is not a valid url".format(pattern_search_url.format("")))
 		
+		if first_offset < 0:
+			raise ValueError("first_offset must be a positive integer (got {})".format(first_offset))
+		
+		if results_per_page <= 0:
+			raise ValueError("results_per_page must be a positive integer (got {})".format(results_per_page))
+		
 		self._name = name
 		self._home_url = home_url
 		self._pattern_search_url = pattern_search_url
-
+		self._transport = transport
+		self._cache = cache
+		self._memory_cache = memory_cache
+		self._parser = HtmlParser.get(parser)
+		self._thumbnail_store = thumbnail_store
+		self._mirror_pattern_search_url = mirror_pattern_search_url
+		self._latency_tracker = latency_tracker if latency_tracker is not None else LatencyTracker()
+		# The threads of the hedged requests are only started by the first one
+		self._hedge_executor = None
+		self._hedge_executor_lock = threading.Lock()
+		self._rate_limiter = rate_limiter
+		self._backoff = backoff
+		self._page_parameter = page_parameter
+		self._first_offset = first_offset
+		self._results_per_page = results_per_page
+	
 	@typechecked
-	def search_html(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) \
-		-> Optional[str]:
+	def normalize_keywords(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) \
+		-> str:
+		"""
+		Join the keywords and encode them such that they can be inserted in the pattern search url.
+		:param keywords: The keywords to search.
+		:return: The url-encoded keywords.
+		:rtype: str
+		"""
 		attributes = ""
 		
 		if isinstance(keywords, str) or isinstance(keywords, int) or isinstance(keywords, float) or \
@@ -50,33 +128,128 @@ class WebEngine:
 		if self.name.lower() == "qwant":
 			attributes = attributes.replace('+', "%20")
 		
-		url = self.pattern_search_url.format(attributes)
+		return attributes
+	
+	@typechecked
+	def get_search_url(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) -> str:
+		return self.pattern_search_url.format(self.normalize_keywords(keywords))
+	
+	@typechecked
+	def get_page_url(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                 page: int = 0) -> str:
+		"""
+		Return the url of a result page of the keywords.
+		:param page: The index of the page, starting at 0.
+		:type page: int
+		:raise ValueError: If the page is not the first one, and the engine has no page parameter.
+		"""
+		return self.__get_page_url(self.pattern_search_url, self.normalize_keywords(keywords), page)
+	
+	@typechecked
+	def search_html(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                deadline: Optional[Union[Deadline, int, float]] = None, page: int = 0) -> Optional[str]:
+		"""
+		Search the keywords and return the HTML content of the result page.
+		:param keywords: The keywords to search.
+		:param deadline: The deadline of the download (see Deadline), or its number of seconds from now.
+		:param page: The index of the result page, starting at 0 (see get_page_url()).
+		:type page: int
+		:return: The HTML content of the result page.
+		:raise DeadlineExceededError: If the page cannot be downloaded before the deadline.
+		"""
+		query = self.normalize_keywords(keywords)
+		key = self.__get_cache_key(query, page)
+		if self._cache is not None:
+			content = self._cache.get(self.name, key)
+			if content is not None:
+				tracing.count("cache.hits", cache="serp", engine=self.name)
+				return content
+			tracing.count("cache.misses", cache="serp", engine=self.name)
+		
+		content = self.__download(query, Deadline.of(deadline), page)
 		
-		req = urllib.request.Request(url=url, headers={'User-Agent': 'Mozilla/5.0'})
-		content = None
-		with urllib.request.urlopen(req) as f:
-			content = f.read().decode("utf-8")
+		if self._cache is not None:
+			self._cache.put(self.name, key, content)
 		
 		if os.getenv("DEBUG", False) == "True":
 			self.__write_html_debug(content)
 		
 		return content
-
+	
+	@typechecked
+	async def asearch_html(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                       deadline: Optional[Union[Deadline, int, float]] = None, page: int = 0) -> Optional[str]:
+		"""
+		Asynchronous version of search_html(). The page is downloaded, and the cache queried, without blocking the
+		event loop.
+		"""
+		query = self.normalize_keywords(keywords)
+		key = self.__get_cache_key(query, page)
+		loop = asyncio.get_running_loop()
+		if self._cache is not None:
+			# The SQLite queries block: they are run in the default executor, as the parsing is
+			content = await loop.run_in_executor(None, self._cache.get, self.name, key)
+			if content is not None:
+				tracing.count("cache.hits", cache="serp", engine=self.name)
+				return content
+			tracing.count("cache.misses", cache="serp", engine=self.name)
+		
+		content = await self.__aget_text(self.__get_page_url(self.pattern_search_url, query, page),
+		                                 Deadline.of(deadline))
+		
+		if self._cache is not None:
+			await loop.run_in_executor(None, self._cache.put, self.name, key, content)
+		
+		if os.getenv("DEBUG", False) == "True":
+			self.__write_html_debug(content)
+		
+		return content
+	
 	@typechecked
 	def search_list_html(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
-	                     result_as_str: bool = True) -> Union[List[str], List[Tag], None]:
+	                     result_as_str: bool = True) -> Union[List[str], List[Any], None]:
+		"""
+		Search the keywords and return the HTML of each result.
 		
-		content = self.search_html(keywords)
-		soup = BeautifulSoup(content, features="html.parser")
+		If the engine has a memory cache and 'result_as_str' is True, the results are memoized. Tags are never
+		memoized, as BeautifulSoup trees are mutable.
+		"""
+		if self._memory_cache is None or not result_as_str:
+			return self.parse_list_html(self.search_html(keywords), keywords, result_as_str)
 		
+		key = ("html", self.name, self.normalize_keywords(keywords))
+		items = self._memory_cache.get(key)
+		if items is None:
+			items = self.parse_list_html(self.search_html(keywords), keywords, result_as_str)
+			if items is None:
+				return None
+			items = tuple(items)
+			self._memory_cache.put(key, items, sys.getsizeof(items) + sum(sys.getsizeof(item) for item in items))
+		
+		return list(items)
+	
+	@typechecked
+	def parse_list_html(self, content: str,
+	                    keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                    result_as_str: bool = True) -> Union[List[str], List[Any], None]:
+		"""
+		Extract the results from the HTML content of a result page.
+		:param content: The HTML content of the result page, as returned by search_html().
+		:param keywords: The keywords used to get the result page.
+		:param result_as_str: If True, return the results as strings, otherwise as nodes of the parser backend
+		(BeautifulSoup tags for the BeautifulSoup backends).
+		:return: The list of results.
+		"""
 		if self.name.lower() == "google":
-			divs_g = soup.find_all("div", {"class": 'g'})
-			items = []
-			for div in divs_g:
-				items.append(str(div) if result_as_str else div)
+			with tracing.span("webengine.parse", engine=self.name, parser=self._parser.name):
+				items = self._parser.select(self._parser.parse(content), self.google_selectors["item"])
+			if result_as_str:
+				items = [self._parser.to_html(item) for item in items]
 			
 			return items
 		else:
+			with tracing.span("webengine.parse", engine=self.name, parser=self._parser.name):
+				soup = BeautifulSoup(content, features=self._parser.soup_features)
 			containers = soup.find_all("ol")
 			if containers is None or len(containers) == 0:
 				containers = soup.find_all("ul")
@@ -115,12 +288,83 @@ class WebEngine:
 			return html_items
 		
 		return None
-
+	
 	@typechecked
-	def search_list_result(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) \
-		-> Optional[List[WebResult]]:
+	def search_list_result(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                       deadline: Optional[Union[Deadline, int, float]] = None,
+	                       max_results: Optional[int] = None) -> Optional[List[WebResult]]:
+		"""
+		Search the keywords and return the results.
+		
+		If the engine has a memory cache, the results of the first page are memoized and returned as FrozenWebResult
+		snapshots shared by all the callers.
+		:param keywords: The keywords to search.
+		:param deadline: The deadline of the download of the result pages (see Deadline), or its number of seconds
+		from now.
+		:param max_results: If given, walk the result pages until this number of results is reached (see
+		iter_deep_results()). Otherwise, only the results of the first page are returned.
+		:type max_results: Union[int, None]
+		:raise DeadlineExceededError: If the result page cannot be downloaded before the deadline.
+		"""
+		if max_results is not None:
+			return list(self.iter_deep_results(keywords, max_results, deadline))
+		
+		if self._memory_cache is None:
+			return self.parse_list_result(self.search_html(keywords, deadline), keywords)
+		
+		key = ("results", self.name, self.normalize_keywords(keywords))
+		results = self._memory_cache.get(key)
+		tracing.count("cache.misses" if results is None else "cache.hits", cache="memory", engine=self.name)
+		if results is None:
+			results = self.__memoize_results(key, self.parse_list_result(self.search_html(keywords, deadline),
+			                                                             keywords))
+		
+		return list(results) if results is not None else None
+	
+	@typechecked
+	async def asearch_list_result(self,
+	                              keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                              executor: Optional[Executor] = None,
+	                              deadline: Optional[Union[Deadline, int, float]] = None) -> Optional[List[WebResult]]:
+		"""
+		Asynchronous version of search_list_result(). The result page is downloaded without blocking the event loop,
+		and parsed in the given executor (the default executor of the loop if None). The requests are not hedged.
+		"""
+		if self._memory_cache is None:
+			content = await self.asearch_html(keywords, deadline)
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(executor, self.parse_list_result, content, keywords)
+		
+		key = ("results", self.name, self.normalize_keywords(keywords))
+		results = self._memory_cache.get(key)
+		tracing.count("cache.misses" if results is None else "cache.hits", cache="memory", engine=self.name)
+		if results is None:
+			content = await self.asearch_html(keywords, deadline)
+			loop = asyncio.get_running_loop()
+			results = self.__memoize_results(key, await loop.run_in_executor(executor, self.parse_list_result,
+			                                                                 content, keywords))
+		
+		return list(results) if results is not None else None
+	
+	def __memoize_results(self, key: tuple, results: Optional[List[WebResult]]) -> Optional[Tuple[WebResult, ...]]:
+		if results is None:
+			return None
 		
-		items = self.search_list_html(keywords, result_as_str=False)
+		results = tuple(result.freeze() for result in results)
+		self._memory_cache.put(key, results, sys.getsizeof(results) + sum(r.get_memory_size() for r in results))
+		return results
+	
+	@typechecked
+	def parse_list_result(self, content: str,
+	                      keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]]) \
+		-> Optional[List[WebResult]]:
+		"""
+		Build the WebResult instances from the HTML content of a result page.
+		:param content: The HTML content of the result page, as returned by search_html().
+		:param keywords: The keywords used to get the result page.
+		:return: The list of results.
+		"""
+		items = self.parse_list_html(content, keywords, result_as_str=False)
 		if isinstance(keywords, Iterable):
 			list_keywords = ' '.join(map(str, keywords))
 		else:
@@ -129,91 +373,63 @@ class WebEngine:
 		results = []
 		
 		if self.name.lower() == "google":
-			for i in items:
-				h3_r = i.find("h3", {"class": 'r'})
-				
-				if h3_r is None:
-					# In case the result is in big-thumbnail-format
-					h3_r = i.find("h3", {"class": "p9j1ue"})
+			parser = self._parser
+			selectors = self.google_selectors
+			with tracing.span("webengine.extract", engine=self.name):
+				for item in items:
+					h3_r = None
+					for selector in selectors["titles"]:
+						h3_r = parser.select_one(item, selector)
+						if h3_r is not None:
+							break
 					
 					if h3_r is None:
-						# Worst-case scenario
-						h3_r = i.find("h3")
-						
-						# Very-worst-case scenario
-						if h3_r is None:
-							continue
-				
-				# Get url
-				h3_r_a = h3_r.find('a')
-				
-				if h3_r_a is None:
-					continue
-				elif not h3_r_a.has_attr("href"):
-					continue
-				
-				part_url = h3_r_a["href"]
-				
-				# Add '/' if there is none
-				if not self.home_url.endswith('/'):
-					part_url = '/' + part_url
-				# Remove '/' if it is both on 'home_url' and 'part_url'
-				if self.home_url.endswith('/') and part_url.startswith('/'):
-					part_url = part_url[1:]
-				
-				# Construct the URL
-				url = self.home_url + part_url
-				
-				# Get title
-				title = str(self.remove_tags(h3_r_a.text))
-				
-				# Get date
-				span_st = i.find("span", {"class": 'st'})
-				
-				date = ""
-				if span_st is not None:
-					span_f = span_st.find("span", {"class": 'f'})
+						continue
 					
-					if span_f is not None:
-						span_nobr = span_f.find("span", {"class": "nobr"})
-						
-						if span_nobr is not None:
-							date = self.remove_tags(span_nobr.text)
-				
-				# If date is None, search in the description
-				date_in_desc = True if date == "" else False
-				
-				# Get description
-				if span_st is not None:
-					# Extract the date (don't need it anymore)
-					[s.extract() for s in span_st("span", {"class": 'f'})]
-					description = span_st.text;
-					if date_in_desc and " ... " in description:
-						date = description.split(" ... ")[0]
-						description = description.split(" ... ")[1]
-					date = self.remove_tags(date, False)
-					description = self.remove_tags(description, True)
-				else:
-					description = ""
-				
-				# Get the thumbnail
-				img = i.find("img")
-				
-				thumbnail = None
-				if img is not None:
-					if img.has_attr("src"):
-						thumbnail = img["src"]
+					# Get url
+					h3_r_a = parser.select_one(h3_r, selectors["link"])
+					if h3_r_a is None:
+						continue
+					
+					url = self.__join_home_url(parser.get_attribute(h3_r_a, "href"))
+					
+					# Get title
+					title = normalize_text(h3_r_a, parser=parser)
+					
+					# Get date
+					span_nobr = parser.select_one(item, selectors["date"])
+					date = normalize_text(span_nobr, parser=parser) if span_nobr is not None else ""
+					
+					# If date is None, search in the description
+					date_in_desc = True if date == "" else False
+					
+					# Get description
+					span_st = parser.select_one(item, selectors["description"])
+					if span_st is not None:
+						# Extract the date (don't need it anymore)
+						for span_f in parser.select(span_st, selectors["description_date"]):
+							parser.remove(span_f)
+						description = normalize_text(span_st, True, parser)
+						if date_in_desc and " ... " in description:
+							date = description.split(" ... ")[0]
+							description = description.split(" ... ")[1]
+					else:
+						description = ""
+					
+					# Get the thumbnail
+					img = parser.select_one(item, selectors["thumbnail"])
+					
+					thumbnail = None
+					if img is not None:
+						thumbnail = parser.get_attribute(img, "src")
 						# Reconstruct the URL if it is a partial URL
 						if thumbnail.startswith('/'):
-							# Add '/' if there is none
-							if not self.home_url.endswith('/'):
-								part_thumbnail = '/' + part_thumbnail
-							
-							# Construct the URL
-							thumbnail = self.home_url + part_thumbnail
-				
-				results.append(WebResult(title=title, url=url, thumbnail=thumbnail, date=date, description=description))
+							thumbnail = self.__join_home_url(thumbnail)
+					
+					results.append(WebResult(title=title, url=url, thumbnail=thumbnail, date=date, description=description,
+					                         transport=self.transport, thumbnail_store=self._thumbnail_store))
 			
+			tracing.count("results_parsed", len(results), engine=self.name)
 			return results
 		else:
 			item = items[0]
@@ -231,7 +447,7 @@ class WebEngine:
 				a_s = item.find_all('a')
 				# Search every possible title and the number of keywords inside it
 				for a in a_s:
-					possible_title = self.remove_tags(a.content)
+					possible_title = normalize_text(a)
 					match = re.findall(list_keywords, possible_title)
 					nb_keywords = len(match) if match is not None else 0
 					nb_words = len(possible_title.split())
@@ -245,11 +461,8 @@ class WebEngine:
 						title = possible_title[2]
 				
 				# Search URL
-				hrefs = []
-				for a in item.find_all('a'):
-					if a.has_attr("href"):
-						if assess_url(a["href"]):
-							hrefs.append(a["href"])
+				hrefs = [a["href"] for a in item.find_all('a') if a.has_attr("href")]
+				hrefs = [href for href, valid in zip(hrefs, assess_urls(hrefs)) if valid]
 				
 				# Delete duplicate
 				hrefs = list(set(hrefs))
@@ -267,19 +480,337 @@ class WebEngine:
 				
 				# Search description
 				description = ""
-				
+			
 			raise TypeError("Not configured yet. Please try to make a search with google")
 		
 		return None
 	
+	@typechecked
+	def iter_results(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                 chunk_size: int = 16384, deadline: Optional[Union[Deadline, int, float]] = None) \
+			-> Iterator[WebResult]:
+		"""
+		Search the keywords and yield each result as soon as it has been downloaded.
+		
+		The result page is fed chunk by chunk into an event-based parser, and each result is built as soon as its
+		block is closed. If the caller stops iterating (for instance after the first result), the rest of the page is
+		not downloaded. The page is only stored in the cache of the engine if it has been read until the end.
+		If the requests of the engine are hedged or retried, the page is downloaded by search_list_result() instead.
+		:param keywords: The keywords to search.
+		:param chunk_size: The maximum number of bytes read from the socket at once.
+		:type chunk_size: int
+		:param deadline: The deadline of the download of the result page (see Deadline), or its number of seconds from
+		now.
+		:return: An iterator over the results, in the order of the page.
+		"""
+		query = self.normalize_keywords(keywords)
+		content = self._cache.get(self.name, query) if self._cache is not None else None
+		if self._cache is not None:
+			tracing.count("cache.misses" if content is None else "cache.hits", cache="serp", engine=self.name)
+		memoized = self._memory_cache is not None and ("results", self.name, query) in self._memory_cache
+		
+		# Only the Google results can be delimited while streaming
+		if self.name.lower() != "google" or content is not None or memoized or \
+				self._mirror_pattern_search_url is not None or self._backoff is not None:
+			if content is None:
+				results = self.search_list_result(keywords, deadline)
+			else:
+				results = self.parse_list_result(content, keywords)
+			
+			for result in results if results is not None else []:
+				yield result
+			return
+		
+		tag, css_class = self.google_selectors["item"].split('.', 1)
+		splitter = BlockSplitter(tag, css_class)
+		decoder = codecs.getincrementaldecoder("utf-8")()
+		chunks = []
+		if self._rate_limiter is not None:
+			self._rate_limiter.acquire(deadline)
+		url = self.pattern_search_url.format(query)
+		# The span includes the parsing of the blocks, which is interleaved with the download
+		with tracing.span("webengine.download", engine=self.name, url=url):
+			for chunk in self.transport.iter_content(url, chunk_size=chunk_size, timeout=Deadline.of(deadline)):
+				tracing.count("bytes_fetched", len(chunk), kind="serp", engine=self.name)
+				text = decoder.decode(chunk)
+				chunks.append(text)
+				for block in splitter.feed_blocks(text):
+					for result in self.parse_list_result(block, keywords):
+						yield result
+		
+		text = decoder.decode(b'', final=True)
+		chunks.append(text)
+		for block in splitter.feed_blocks(text):
+			for result in self.parse_list_result(block, keywords):
+				yield result
+		
+		content = ''.join(chunks)
+		if self._cache is not None:
+			self._cache.put(self.name, query, content)
+		
+		if os.getenv("DEBUG", False) == "True":
+			self.__write_html_debug(content)
+	
+	@typechecked
+	def iter_deep_results(self, keywords: Union[str, List[Union[str, int, float, complex, int, float, complex]]],
+	                      max_results: int = 100, deadline: Optional[Union[Deadline, int, float]] = None,
+	                      prefetch_pages: int = 3) -> Iterator[WebResult]:
+		"""
+		Search the keywords on as many result pages as needed, and yield up to 'max_results' results.
+		
+		Up to 'prefetch_pages' pages are downloaded while the results of the previous ones are parsed and yielded, but
+		no page beyond the ones needed to reach 'max_results' is requested. Each download acquires the rate limiter of
+		the engine, which therefore bounds the pages in flight too. The results already yielded by a previous page
+		(with the same normalized url) are skipped, and the pages are walked until the caller stops iterating,
+		'max_results' is reached, or a page has no new result. The pages are stored in the cache of the engine, but the
+		results are not memoized.
+		:param keywords: The keywords to search.
+		:param max_results: The maximum number of results.
+		:type max_results: int
+		:param deadline: The deadline of the download of all the pages (see Deadline), or its number of seconds from
+		now.
+		:param prefetch_pages: The maximum number of pages downloaded at once.
+		:type prefetch_pages: int
+		:return: An iterator over the results, in the order of the pages.
+		:raise ValueError: If max_results or prefetch_pages is not positive.
+		"""
+		if max_results <= 0:
+			raise ValueError("max_results must be a positive integer (got {})".format(max_results))
+		if prefetch_pages <= 0:
+			raise ValueError("prefetch_pages must be a positive integer (got {})".format(prefetch_pages))
+		
+		deadline = Deadline.of(deadline)
+		paginated = self._page_parameter is not None
+		window = prefetch_pages if paginated else 1
+		seen = set()
+		count = 0
+		next_page = 0
+		# The futures of the pages in flight, in the order of the pages
+		pending = collections.deque()
+		executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix="qr-page")
+		
+		def submit(parsing: int):
+			"""
+			Fill the window with the next pages, as long as the pages in flight (and the 'parsing' one) cannot be
+			enough to reach max_results.
+			"""
+			nonlocal next_page
+			while len(pending) < window and (paginated or next_page == 0) and \
+					count + (len(pending) + parsing) * self._results_per_page < max_results:
+				pending.append(executor.submit(self.search_html, keywords, deadline, next_page))
+				next_page += 1
+		
+		try:
+			submit(0)
+			while pending:
+				content = pending.popleft().result()
+				submit(1)
+				
+				new_results = 0
+				for result in self.parse_list_result(content, keywords) or []:
+					# The results without url cannot be compared, so they are all kept
+					if result.url is not None:
+						key = normalize_url(result.url)
+						if key in seen:
+							continue
+						seen.add(key)
+					
+					new_results += 1
+					count += 1
+					yield result
+					if count >= max_results:
+						return
+				
+				if new_results == 0 or not paginated:
+					return
+				
+				# The page gave fewer results than expected (duplicates): request the next ones
+				submit(0)
+		finally:
+			executor.shutdown(wait=False, cancel_futures=True)
+	
+	@typechecked
+	def search_list_result_many(self,
+	                            queries: Iterable[Union[str, List[Union[str, int, float, complex, int, float, complex]]]],
+	                            max_workers: int = 8, parse_in_processes: bool = False) \
+		-> Iterator[Tuple[Union[str, List[Union[str, int, float, complex]]], Optional[List[WebResult]]]]:
+		"""
+		Search all the given queries concurrently, and yield each query with its results as soon as they are ready.
+		
+		The result pages are downloaded by a pool of 'max_workers' threads. At most 2 * max_workers queries are in
+		flight at once, so 'queries' can be a lazy iterable of any length.
+		:param queries: The keywords of each search.
+		:param max_workers: The number of workers downloading (and parsing) the result pages.
+		:type max_workers: int
+		:param parse_in_processes: If True, the result pages are parsed by a pool of 'max_workers' processes instead of
+		the downloading threads.
+		:type parse_in_processes: bool
+		:return: An iterator of (query, results), in completion order.
+		.. note:: If a search fails, its exception is raised by the iterator and the remaining searches are cancelled.
+		"""
+		if max_workers <= 0:
+			raise ValueError("max_workers must be a positive integer (got {})".format(max_workers))
+		
+		queries = iter(queries)
+		fetcher = ThreadPoolExecutor(max_workers=max_workers)
+		parser = ProcessPoolExecutor(max_workers=max_workers) if parse_in_processes else None
+		# Map each future to its query, and tell if the future only downloads the page (True) or gives the results
+		pending = {}
+		
+		def submit(n: int):
+			for query in itertools.islice(queries, n):
+				if parser is None:
+					pending[fetcher.submit(self.search_list_result, query)] = (query, False)
+				else:
+					pending[fetcher.submit(self.search_html, query)] = (query, True)
+		
+		try:
+			submit(2 * max_workers)
+			while len(pending) > 0:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					query, is_download = pending.pop(future)
+					if is_download:
+						parse_future = parser.submit(_parse_list_result, self.name, self.home_url,
+						                             self.pattern_search_url, self._parser.name, future.result(), query)
+						pending[parse_future] = (query, False)
+					else:
+						results = future.result()
+						if parser is not None and results is not None:
+							# The results have been built in another process, give them the transport of this engine
+							for result in results:
+								result.transport = self._transport
+								result.thumbnail_store = self._thumbnail_store
+						submit(1)
+						yield query, results
+		finally:
+			fetcher.shutdown(wait=False, cancel_futures=True)
+			if parser is not None:
+				parser.shutdown(wait=False, cancel_futures=True)
+	
 	search = search_list_result
+	asearch = asearch_list_result
+	search_many = search_list_result_many
 	
 	@staticmethod
 	@typechecked
 	def remove_tags(message: str, replace_br_by_newline: bool = False) -> str:
-		if replace_br_by_newline:
-			message = re.sub(r'</?br[\s]*/?>', '\n', message)
-		return re.sub(r'</?[^>]*/?>', '', message)
+		"""
+		Remove the tags of an HTML fragment, decode its entities and collapse its whitespace.
+		.. note:: The entities and the whitespace used to be kept as they were: "a &amp;  b" was returned as it is, and
+		is now returned as "a & b".
+		.. seealso:: qr.webutils.normalize_text
+		"""
+		return normalize_text(message, replace_br_by_newline)
+	
+	def __download(self, query: str, deadline: Deadline, page: int = 0) -> str:
+		url = self.__get_page_url(self.pattern_search_url, query, page)
+		if self._mirror_pattern_search_url is None:
+			return self.__get_text(url, deadline)
+		
+		mirror_url = self.__get_page_url(self._mirror_pattern_search_url, query, page)
+		deadline = hedge_deadline(deadline)
+		return hedge(lambda: self.__get_text(url, deadline), lambda: self.__get_text(mirror_url, deadline),
+		             self._latency_tracker, deadline, executor=self.__get_hedge_executor())
+	
+	def __get_hedge_executor(self) -> ThreadPoolExecutor:
+		# Each engine has its own threads, such that the slow requests of an engine do not delay the other engines
+		if self._hedge_executor is None:
+			with self._hedge_executor_lock:
+				if self._hedge_executor is None:
+					self._hedge_executor = ThreadPoolExecutor(thread_name_prefix="qr-hedge-{}".format(self.name))
+		return self._hedge_executor
+	
+	def __get_page_url(self, pattern_search_url: str, query: str, page: int) -> str:
+		url = pattern_search_url.format(query)
+		if page == 0:
+			return url
+		
+		if page < 0:
+			raise ValueError("page must be a positive integer (got {})".format(page))
+		
+		if self._page_parameter is None:
+			raise ValueError("The web engine {} cannot download the result page {}".format(self.name, page))
+		
+		return "{}{}{}={}".format(url, '&' if '?' in url else '?', self._page_parameter,
+		                          self._first_offset + page * self._results_per_page)
+	
+	def __get_cache_key(self, query: str, page: int) -> str:
+		# The first page is cached under its query, as before the pagination
+		if page == 0:
+			return query
+		return "{}&{}={}".format(query, self._page_parameter, page)
+	
+	def __get_text(self, url: str, deadline: Deadline) -> str:
+		# Download the page, waiting for the rate limiter, and retrying it while it is throttled
+		delays = self._backoff.delays() if self._backoff is not None else iter(())
+		while True:
+			if self._rate_limiter is not None:
+				self._rate_limiter.acquire(deadline)
+			try:
+				with tracing.span("webengine.download", engine=self.name, url=url):
+					content = self.transport.get(url, timeout=deadline)
+				tracing.count("bytes_fetched", len(content), kind="serp", engine=self.name)
+				content = content.decode("utf-8")
+				if self._backoff is not None:
+					self._backoff.check_page(url, content)
+				return content
+			except OSError as e:
+				delay = self.__get_retry_delay(e, delays, deadline)
+				if delay is None:
+					raise
+				if self._rate_limiter is None:
+					time.sleep(delay)
+	
+	async def __aget_text(self, url: str, deadline: Deadline) -> str:
+		# Asynchronous version of __get_text()
+		delays = self._backoff.delays() if self._backoff is not None else iter(())
+		while True:
+			if self._rate_limiter is not None:
+				await self._rate_limiter.aacquire(deadline)
+			try:
+				with tracing.span("webengine.download", engine=self.name, url=url):
+					content = await self.transport.aget(url, timeout=deadline)
+				tracing.count("bytes_fetched", len(content), kind="serp", engine=self.name)
+				content = content.decode("utf-8")
+				if self._backoff is not None:
+					self._backoff.check_page(url, content)
+				return content
+			except OSError as e:
+				delay = self.__get_retry_delay(e, delays, deadline)
+				if delay is None:
+					raise
+				if self._rate_limiter is None:
+					await asyncio.sleep(delay)
+	
+	def __get_retry_delay(self, error: OSError, delays: Iterator[float], deadline: Deadline) -> Optional[float]:
+		# Return the delay before retrying the request that raised 'error', or None if it must not be retried. With a
+		# rate limiter, the whole engine waits for the delay: the retry will wait for its token
+		if self._backoff is None or not self._backoff.is_retried(error):
+			return None
+		
+		delay = next(delays, None)
+		if delay is None:
+			return None
+		
+		delay = self._backoff.get_delay(error, delay)
+		remaining = deadline.remaining()
+		if remaining is not None and delay >= remaining:
+			return None
+		
+		if self._rate_limiter is not None:
+			self._rate_limiter.penalize(delay)
+		return delay
+	
+	def __join_home_url(self, part_url: str) -> str:
+		# Add '/' if there is none
+		if not self.home_url.endswith('/') and not part_url.startswith('/'):
+			part_url = '/' + part_url
+		# Remove '/' if it is both on 'home_url' and 'part_url'
+		if self.home_url.endswith('/') and part_url.startswith('/'):
+			part_url = part_url[1:]
+		
+		return self.home_url + part_url
 	
 	@staticmethod
 	def __write_html_debug(content: str):
@@ -289,29 +820,39 @@ class WebEngine:
 	# BUILDERS #
 	
 	@staticmethod
-	def get_google():
+	def get_google(transport: Optional[Transport] = None, hedge: bool = False):
+		"""
+		Return the Google web engine. If 'hedge' is True, the slow requests to google.fr are sent again to google.com.
+		"""
 		return WebEngine(name="Google", home_url="https://www.google.com/",
-		                 pattern_search_url="https://www.google.fr/search?q={}&ie=UTF-8&oe=UTF-8")
+		                 pattern_search_url="https://www.google.fr/search?q={}&ie=UTF-8&oe=UTF-8",
+		                 transport=transport,
+		                 mirror_pattern_search_url="https://www.google.com/search?q={}&ie=UTF-8&oe=UTF-8" if hedge
+		                 else None, page_parameter="start")
 	
 	@staticmethod
-	def get_bing():
+	def get_bing(transport: Optional[Transport] = None):
 		return WebEngine(name="Bing", home_url="https://www.bing.com/",
-		                 pattern_search_url="https://www.bing.com/search?q={}")
+		                 pattern_search_url="https://www.bing.com/search?q={}",
+		                 transport=transport, page_parameter="first", first_offset=1)
 	
 	@staticmethod
-	def get_yahoo():
-		return WebEngine(name="Bing", home_url="https://www.yahoo.com/",
-		                 pattern_search_url="https://www.search.yahoo.com/search?p={}&ei=UTF-8")
+	def get_yahoo(transport: Optional[Transport] = None):
+		return WebEngine(name="Yahoo", home_url="https://www.yahoo.com/",
+		                 pattern_search_url="https://www.search.yahoo.com/search?p={}&ei=UTF-8",
+		                 transport=transport, page_parameter="b", first_offset=1)
 	
 	@staticmethod
-	def get_duckduckgo():
+	def get_duckduckgo(transport: Optional[Transport] = None):
 		return WebEngine(name="DuckDuckGo", home_url="https://duckduckgo.com/",
-		                 pattern_search_url="https://duckduckgo.com/?q={}")
+		                 pattern_search_url="https://duckduckgo.com/?q={}",
+		                 transport=transport, page_parameter="s")
 	
 	@staticmethod
-	def get_qwant():
+	def get_qwant(transport: Optional[Transport] = None):
 		return WebEngine(name="Qwant", home_url="https://www.qwant.com/",
-		                 pattern_search_url="https://www.qwant.com/?q={}")
+		                 pattern_search_url="https://www.qwant.com/?q={}",
+		                 transport=transport, page_parameter="offset")
 	
 	# GETTERS & SETTERS #
 	
@@ -342,6 +883,96 @@ class WebEngine:
 	def pattern_search_url(self, pattern_search_url: str):
 		self._pattern_search_url = pattern_search_url
 	
+	@property
+	def transport(self) -> Transport:
+		if self._transport is None:
+			return Transport.get_default()
+		return self._transport
+	
+	@transport.setter
+	@typechecked
+	def transport(self, transport: Optional[Transport]):
+		self._transport = transport
+	
+	@property
+	def cache(self) -> Optional[SerpCache]:
+		return self._cache
+	
+	@cache.setter
+	@typechecked
+	def cache(self, cache: Optional[SerpCache]):
+		self._cache = cache
+	
+	@property
+	def memory_cache(self) -> Optional[MemoryCache]:
+		return self._memory_cache
+	
+	@memory_cache.setter
+	@typechecked
+	def memory_cache(self, memory_cache: Optional[MemoryCache]):
+		self._memory_cache = memory_cache
+	
+	@property
+	def parser(self) -> HtmlParser:
+		return self._parser
+	
+	@parser.setter
+	@typechecked
+	def parser(self, parser: Union[str, HtmlParser]):
+		self._parser = HtmlParser.get(parser)
+	
+	@property
+	def thumbnail_store(self) -> Optional[ThumbnailStore]:
+		return self._thumbnail_store
+	
+	@thumbnail_store.setter
+	@typechecked
+	def thumbnail_store(self, thumbnail_store: Optional[ThumbnailStore]):
+		self._thumbnail_store = thumbnail_store
+	
+	@property
+	def mirror_pattern_search_url(self) -> Optional[str]:
+		return self._mirror_pattern_search_url
+	
+	@mirror_pattern_search_url.setter
+	@typechecked
+	def mirror_pattern_search_url(self, mirror_pattern_search_url: Optional[str]):
+		self._mirror_pattern_search_url = mirror_pattern_search_url
+	
+	@property
+	def latency_tracker(self) -> LatencyTracker:
+		return self._latency_tracker
+	
+	@property
+	def rate_limiter(self) -> Optional[TokenBucket]:
+		return self._rate_limiter
+	
+	@rate_limiter.setter
+	@typechecked
+	def rate_limiter(self, rate_limiter: Optional[TokenBucket]):
+		self._rate_limiter = rate_limiter
+	
+	@property
+	def backoff(self) -> Optional[Backoff]:
+		return self._backoff
+	
+	@backoff.setter
+	@typechecked
+	def backoff(self, backoff: Optional[Backoff]):
+		self._backoff = backoff
+	
+	@property
+	def page_parameter(self) -> Optional[str]:
+		return self._page_parameter
+	
+	@property
+	def first_offset(self) -> int:
+		return self._first_offset
+	
+	@property
+	def results_per_page(self) -> int:
+		return self._results_per_page
+	
 	# OVERRIDES #
 	
 	def __eq__(self, o: object) -> bool:
@@ -354,3 +985,16 @@ class WebEngine:
 	def __repr__(self) -> str:
 		return "WebEngine{name='{}', home_url='{}', pattern_search_url='{}'}".format(self.name, self.home_url,
 		                                                                             self.pattern_search_url)
+
+
+def _parse_list_result(name: str, home_url: str, pattern_search_url: str, parser: str, content: str,
+                       keywords: Union[str, List[Union[str, int, float, complex]]]) -> Optional[List[WebResult]]:
+	"""
+	Parse a result page in a worker process of WebEngine.search_list_result_many().
+	"""
+	results = WebEngine(name, home_url, pattern_search_url, parser=parser).parse_list_result(content, keywords)
+	if results is not None:
+		# Do not send the transport back to the main process
+		for result in results:
+			result.transport = None
+	return results
@@ -1,34 +1,46 @@
 # -*- coding: utf-8 -*-
-import urllib
-from urllib import request
-import requests
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 from io import BytesIO
-from typing import Optional, Union
-from typeguard import *
+from typing import Optional, Union, Iterable
 from PIL import Image
 
+from qr import tracing
+from qr.config import typechecked
+from qr.deadline import Deadline
+from qr.thumbnail_store import ThumbnailStore
+from qr.transport import Transport
 from qr.webutils import assess_url
 
 
 class WebResult:
 	"""
 	Class that represents a result given by a web engine, such as google.
+	
+	A thumbnail given as an url is only downloaded when the attribute 'thumbnail' is read for the first time. Use
+	prefetch_thumbnails() to download the thumbnails of many results concurrently. A download that fails is not tried
+	again, unless force_download_thumbnail() is called (see thumbnail_error).
+	
+	With a ThumbnailStore, the result only keeps the url of its thumbnail, and the image is given by the store on each
+	access: the decoded images are only kept by the store, within its memory bound.
 	"""
 	
+	# Millions of results are kept in memory for deduplication and ranking, so they do not have any __dict__
+	__slots__ = ("_transport", "_thumbnail_store", "_title", "_url", "_thumbnail", "_thumbnail_error", "_date",
+	             "_description")
+	
 	@typechecked
 	def __init__(self, title: Optional[str], url: Optional[str], thumbnail: Optional[Union[Image.Image, str]],
-	             date: Optional[str], description: Optional[str]):
+	             date: Optional[str], description: Optional[str], transport: Optional[Transport] = None,
+	             thumbnail_store: Optional[ThumbnailStore] = None):
+		self._transport = transport
+		self._thumbnail_store = thumbnail_store
 		self._title = title
 		self._url = url
 		self._thumbnail = thumbnail
+		self._thumbnail_error = None
 		self._date = date
 		self._description = description
-		
-		if self._thumbnail is not None and isinstance(self._thumbnail, str):
-			#try:
-			self.force_download_thumbnail(self._thumbnail)
-			#except TypeError:
-			#	pass
 	
 	# GETTERS & SETTERS #
 	
@@ -52,14 +64,39 @@ class WebResult:
 	
 	@property
 	def thumbnail(self) -> Optional[Union[Image.Image, str]]:
+		"""
+		The thumbnail of the result. If it is still an url, it is downloaded first. If the download fails, the url is
+		returned instead, and the download is not tried again.
+		"""
+		if isinstance(self._thumbnail, str) and self._thumbnail_error is None:
+			try:
+				return self.__download_thumbnail()
+			except (TypeError, OSError) as e:
+				self._thumbnail_error = e
+		
 		return self._thumbnail
 	
 	@thumbnail.setter
 	@typechecked
-	def thumbnail(self, value: Optional[Union[Image.Image, str]], download_if_url: bool = True):
+	def thumbnail(self, value: Optional[Union[Image.Image, str]]):
 		self._thumbnail = value
-		if download_if_url:
-			self._thumbnail = self.__get_image()
+		self._thumbnail_error = None
+	
+	@property
+	def thumbnail_error(self) -> Optional[Exception]:
+		"""
+		The error raised by the last download of the thumbnail, or None if it has not failed.
+		"""
+		return self._thumbnail_error
+	
+	@property
+	def is_thumbnail_downloaded(self) -> bool:
+		"""
+		False if the thumbnail is an url that has not been downloaded yet.
+		"""
+		if isinstance(self._thumbnail, str):
+			return self._thumbnail_store is not None and self._thumbnail_store.get_hash(self._thumbnail) is not None
+		return True
 	
 	@property
 	def date(self) -> Optional[str]:
@@ -78,28 +115,98 @@ class WebResult:
 	@typechecked
 	def description(self, value: Optional[str]):
 		self._description = value
-
+	
+	@property
+	def transport(self) -> Transport:
+		if self._transport is None:
+			return Transport.get_default()
+		return self._transport
+	
+	@transport.setter
+	@typechecked
+	def transport(self, value: Optional[Transport]):
+		self._transport = value
+	
+	@property
+	def thumbnail_store(self) -> Optional[ThumbnailStore]:
+		return self._thumbnail_store
+	
+	@thumbnail_store.setter
+	@typechecked
+	def thumbnail_store(self, value: Optional[ThumbnailStore]):
+		self._thumbnail_store = value
+	
 	@typechecked
-	def force_download_thumbnail(self, url: str = None):
-		img = self.__get_image(url)
+	def force_download_thumbnail(self, url: str = None, timeout: Optional[Union[int, float, Deadline]] = None):
+		"""
+		Download the thumbnail (or the image at the given url), and replace the url of the thumbnail by the image (by
+		the given url if the result has a ThumbnailStore). The download is tried even if a previous one has failed.
+		:param url: The url of the image. If None, the url of the thumbnail.
+		:param timeout: The maximum number of seconds to wait for the download, or a Deadline.
+		:raise TypeError: If the url is not a valid url.
+		:raise OSError: If the image cannot be downloaded or decoded. The error is kept in thumbnail_error.
+		"""
+		try:
+			self.__download_thumbnail(url, timeout)
+		except (TypeError, OSError) as e:
+			self._thumbnail_error = e
+			raise
+	
+	def __download_thumbnail(self, url: str = None, timeout: Optional[Union[int, float, Deadline]] = None):
+		# Not type-checked, as it is called when the attribute 'thumbnail' is read
+		img = self.__get_image(url, timeout)
 		if isinstance(img, str):
 			raise TypeError("Could not download the image using the url '{}'.".format(img))
 		elif img is None:
-			raise TypeError("Could not download the image using the url ''.".format(url if url is not None else self._thumbnail))
+			raise TypeError("Could not download the image using the url '{}'.".format(url if url is not None else self._thumbnail))
+		elif self._thumbnail_store is not None:
+			# The store keeps the image: the result only keeps its url
+			if url is not None:
+				self._thumbnail = url
 		else:
 			self._thumbnail = img
-
-	@typechecked
-	def __get_image(self, url: str = None):
+		self._thumbnail_error = None
+		return img
+	
+	def __get_image(self, url: str = None, timeout: Optional[Union[int, float, Deadline]] = None):
 		if url is None:
 			url = self._thumbnail
 		
 		if url is not None and isinstance(url, str) and assess_url(url):
-			reponse = requests.get(self._thumbnail)
-			return Image.open(BytesIO(reponse.content))
+			with tracing.span("webresult.thumbnail", url=url):
+				if self._thumbnail_store is not None:
+					return self._thumbnail_store.get_image(url, self.transport, timeout)
+				
+				content = self.transport.get(url, timeout=timeout)
+				tracing.count("bytes_fetched", len(content), kind="thumbnail")
+				return Image.open(BytesIO(content))
 		
 		return url
 	
+	def freeze(self) -> 'FrozenWebResult':
+		"""
+		Return an immutable snapshot of this result, that can be shared between threads and callers.
+		"""
+		return FrozenWebResult(title=self._title, url=self._url, thumbnail=self._thumbnail, date=self._date,
+		                       description=self._description, transport=self._transport,
+		                       thumbnail_store=self._thumbnail_store)
+	
+	def get_memory_size(self) -> int:
+		"""
+		Estimate the number of bytes used by this result, including its strings and its decoded thumbnail.
+		"""
+		size = sys.getsizeof(self)
+		for value in (self._title, self._url, self._date, self._description):
+			if value is not None:
+				size += sys.getsizeof(value)
+		
+		if isinstance(self._thumbnail, Image.Image):
+			size += self._thumbnail.width * self._thumbnail.height * len(self._thumbnail.getbands())
+		elif self._thumbnail is not None:
+			size += sys.getsizeof(self._thumbnail)
+		
+		return size
+	
 	# OVERRIDES #
 	
 	def __eq__(self, o: object) -> bool:
@@ -112,7 +219,7 @@ class WebResult:
 		          "url='{}'," \
 		          "thumbnail='{}'," \
 		          "date='{}'," \
-		          "description='{}'}}".format(self.title, self.url, self.thumbnail, self.date, self.description)
+		          "description='{}'}}".format(self.title, self.url, self._thumbnail, self.date, self.description)
 		return content
 	
 	def __repr__(self) -> str:
@@ -120,7 +227,7 @@ class WebResult:
 		if self._thumbnail is not None:
 			if isinstance(self._thumbnail, str):
 				string += "[Thumbnail URL: {}]\n".format(self._thumbnail)
-			elif isinstance(self.thumbnail, Image.Image):
+			elif isinstance(self._thumbnail, Image.Image):
 				string += "[Thumbnail Image: {}]\n".format(self._thumbnail)
 			else:
 				string += "[Thumbnail object: {}]\n".format(str(self._thumbnail))
@@ -136,3 +243,106 @@ class WebResult:
 		
 		return string
 
+
+@typechecked
+def prefetch_thumbnails(results: Iterable[WebResult], max_workers: int = 8,
+                        deadline: Optional[Union[Deadline, int, float]] = None):
+	"""
+	Download concurrently the thumbnails of the given results that are still urls.
+	
+	A thumbnail that cannot be downloaded stays an url, as when the attribute 'thumbnail' is read, and its download is
+	not tried again. The thumbnails of the FrozenWebResult instances are only downloaded if they have a ThumbnailStore,
+	as they cannot be modified.
+	:param results: The results whose thumbnails must be downloaded.
+	:param max_workers: The maximum number of thumbnails downloaded at once.
+	:type max_workers: int
+	:param deadline: The deadline of the downloads (see Deadline), or its number of seconds from now. The function
+	returns at the deadline, and the thumbnails that are not downloaded yet stay urls.
+	"""
+	if max_workers <= 0:
+		raise ValueError("max_workers must be a positive integer (got {})".format(max_workers))
+	
+	pending = [result for result in results if (result.thumbnail_store is not None or
+	                                            not isinstance(result, FrozenWebResult)) and
+	           not result.is_thumbnail_downloaded and result.thumbnail_error is None]
+	if len(pending) == 0:
+		return
+	
+	deadline = Deadline.of(deadline)
+	
+	def download(result: WebResult):
+		try:
+			result.force_download_thumbnail(timeout=deadline)
+		except (TypeError, OSError):
+			# Including DeadlineExceededError
+			pass
+	
+	executor = ThreadPoolExecutor(max_workers=min(max_workers, len(pending)))
+	try:
+		wait([executor.submit(download, result) for result in pending], timeout=deadline.remaining())
+	finally:
+		executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FrozenWebResult(WebResult):
+	"""
+	Immutable snapshot of a WebResult. See WebResult.freeze().
+	
+	The snapshot is shared (for instance by the memory cache of WebEngine), so reading its thumbnail never downloads
+	it: it is the image if the thumbnail had been downloaded when the snapshot was taken, the image kept by its
+	ThumbnailStore if the store has it (see prefetch_thumbnails()), and its url otherwise.
+	"""
+	
+	__slots__ = ()
+	
+	def __init__(self, title: Optional[str], url: Optional[str], thumbnail: Optional[Union[Image.Image, str]],
+	             date: Optional[str], description: Optional[str], transport: Optional[Transport] = None,
+	             thumbnail_store: Optional[ThumbnailStore] = None):
+		object.__setattr__(self, "_transport", transport)
+		object.__setattr__(self, "_thumbnail_store", thumbnail_store)
+		object.__setattr__(self, "_title", title)
+		object.__setattr__(self, "_url", url)
+		object.__setattr__(self, "_thumbnail", thumbnail)
+		object.__setattr__(self, "_thumbnail_error", None)
+		object.__setattr__(self, "_date", date)
+		object.__setattr__(self, "_description", description)
+	
+	def freeze(self) -> 'FrozenWebResult':
+		return self
+	
+	# GETTERS & SETTERS #
+	
+	@property
+	def thumbnail(self) -> Optional[Union[Image.Image, str]]:
+		if isinstance(self._thumbnail, str) and self.is_thumbnail_downloaded:
+			try:
+				return self._thumbnail_store.get_image(self._thumbnail, self.transport)
+			except OSError:
+				pass
+		return self._thumbnail
+	
+	@thumbnail.setter
+	def thumbnail(self, value: Optional[Union[Image.Image, str]]):
+		raise AttributeError("A FrozenWebResult cannot be modified (attribute 'thumbnail')")
+	
+	def force_download_thumbnail(self, url: str = None, timeout: Optional[Union[int, float, Deadline]] = None):
+		"""
+		Download the thumbnail into the ThumbnailStore of the snapshot.
+		:raise AttributeError: If the snapshot has no ThumbnailStore, or if an url is given.
+		"""
+		if self._thumbnail_store is None or url is not None:
+			raise AttributeError("The thumbnail of a FrozenWebResult can only be downloaded into its ThumbnailStore")
+		
+		if isinstance(self._thumbnail, str):
+			self._thumbnail_store.get_image(self._thumbnail, self.transport, timeout)
+	
+	# OVERRIDES #
+	
+	def __setattr__(self, key, value):
+		raise AttributeError("A FrozenWebResult cannot be modified (attribute '{}')".format(key))
+	
+	def __delattr__(self, key):
+		raise AttributeError("A FrozenWebResult cannot be modified (attribute '{}')".format(key))
+	
+	def __hash__(self) -> int:
+		return hash((self.title, self.url, self.date, self.description))
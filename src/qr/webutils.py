@@ -1,12 +1,176 @@
 # -*- coding: utf-8 -*-
+import functools
+import html
 import re
+import urllib.parse
+from typing import Iterable, List, Any, Optional, Union
+
+from qr.parser import HtmlParser
+
+_URL_REGEX = re.compile(r'^((?:http|ftp)?s?://)?'  # http:// or https://
+                        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # domain...
+                        r'localhost|'  # localhost...
+                        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+                        r'(?::\d+)?'  # optional port
+                        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+# The schemes accepted by _URL_REGEX
+_URL_SCHEMES = frozenset(("http", "https", "ftp", "ftps", "s", ""))
+# Tokens of an HTML fragment, for normalize_text(). Every character belongs to a token
+_TEXT_TOKENS = re.compile(r'(?P<text>[^<&\s]+)|'  # text
+                          r'(?P<space>\s+)|'  # whitespace
+                          r'(?P<br><\s*/?\s*br\b[^>]*>)|'  # <br>, <br/> or </br>
+                          r'(?P<tag><[^>]*>)|'  # any other tag
+                          r'(?P<entity>&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);?)|'  # entity
+                          r'(?P<other>[<&])')  # '<' or '&' that do not start a tag or an entity
+# The number of decoded entities kept by _decode_entity(). The pages use a handful of entities, but the numeric ones
+# are unbounded
+_ENTITIES_CACHE_SIZE = 1024
 
 
 def assess_url(url: str) -> bool:
-	regex = re.compile(r'^((?:http|ftp)?s?://)?'  # http:// or https://
-	                   r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'  # domain...
-	                   r'localhost|'  # localhost...
-	                   r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-	                   r'(?::\d+)?'  # optional port
-	                   r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-	return re.match(regex, url) is not None
+	return _prefilter_url(url) and _URL_REGEX.match(url) is not None
+
+
+def assess_urls(urls: Iterable[str]) -> List[bool]:
+	"""
+	Assess many urls at once. The urls that appear several times (which is common for the links of a page) are only
+	assessed once.
+	:param urls: The urls to assess.
+	:return: The result of assess_url() for each url, in the same order.
+	:rtype: list
+	"""
+	results = {}
+	assessed = []
+	for url in urls:
+		result = results.get(url)
+		if result is None:
+			result = results[url] = assess_url(url)
+		assessed.append(result)
+	return assessed
+
+
+def normalize_url(url: str) -> str:
+	"""
+	Normalize an url, such that the urls of the same page given by different web engines are equal: the redirections
+	of the web engines ("https://www.google.com/url?q=<url>") are followed, the scheme and the host are lowercased, and
+	"www.", the fragment and the trailing slash are removed.
+		:Example:
+		normalize_url("https://www.google.com/url?q=https://WWW.Python.org/#news")  # 'https://python.org'
+	:param url: The url to normalize.
+	:return: The normalized url.
+	:rtype: str
+	"""
+	url = url.strip()
+	try:
+		parts = urllib.parse.urlsplit(url)
+		if parts.netloc == '' and "://" not in url:
+			# No scheme ("www.python.org/doc")
+			parts = urllib.parse.urlsplit("//" + url)
+	except ValueError:
+		return url
+	
+	if parts.path == "/url":
+		query = urllib.parse.parse_qs(parts.query)
+		for target in query.get('q', []) + query.get("url", []):
+			if target.startswith(("http://", "https://")):
+				return normalize_url(target)
+	
+	host = parts.netloc.lower()
+	if host.startswith("www."):
+		host = host[4:]
+	
+	return urllib.parse.urlunsplit((parts.scheme.lower(), host, parts.path.rstrip('/'), parts.query, ''))
+
+
+def _prefilter_url(url: str) -> bool:
+	"""
+	Reject the strings that cannot match _URL_REGEX (empty strings, anchors, relative paths, "javascript:..." links,
+	...) without running it. Return True if the regex must be run.
+	"""
+	# The domain (or the ip) starts with an alphanumeric character, and contains a dot unless it is localhost
+	if len(url) == 0 or ('.' not in url and "localhost" not in url.lower()):
+		return False
+	
+	try:
+		scheme = urllib.parse.urlsplit(url).scheme
+	except ValueError:
+		# Let the regex decide
+		return True
+	
+	if url.startswith("://", len(scheme)):
+		return scheme.lower() in _URL_SCHEMES
+	return url[0].isalnum()
+
+
+def normalize_text(content: Union[str, Any], replace_br_by_newline: bool = False,
+                   parser: Optional[Union[str, HtmlParser]] = None) -> str:
+	"""
+	Extract the text of an HTML fragment: remove the tags, decode the entities, and collapse the whitespace into single
+	spaces (the whitespace at the beginning and at the end is removed).
+	
+	The fragment is read in a single scan. It can also be a node of a parse tree, whose texts are then read directly,
+	without serializing it again.
+		:Example:
+		normalize_text("<b>Python</b>  &amp;\n<i>debugger</i><br/>Text", True)  # 'Python & debugger\nText'
+	:param content: The HTML fragment, or a node built by 'parser'.
+	:param replace_br_by_newline: Replace each <br> by a newline. Otherwise, it separates the words as a space.
+	:type replace_br_by_newline: bool
+	:param parser: The backend that built the node (or its name). BeautifulSoup by default. Not used if 'content' is
+	a string.
+	:return: The normalized text.
+	:rtype: str
+	"""
+	if isinstance(content, str):
+		# Fast path for the text without any tag or entity (such as the text already extracted by the parser)
+		if '<' not in content and '&' not in content:
+			return ' '.join(content.split())
+		return _normalize_tokens(content, replace_br_by_newline)
+	
+	parser = HtmlParser.get(parser if parser is not None else "html.parser")
+	lines = [[]]
+	for string in parser.iter_strings(content):
+		if string is not None:
+			lines[-1].append(string)
+		elif replace_br_by_newline:
+			lines.append([])
+		else:
+			lines[-1].append(' ')
+	
+	lines = [' '.join(''.join(line).split()) for line in lines]
+	return '\n'.join(lines).strip()
+
+
+def _normalize_tokens(content: str, replace_br_by_newline: bool) -> str:
+	parts = []
+	# The separator to write before the next text: '' (none), ' ', or newlines
+	separator = ''
+	for match in _TEXT_TOKENS.finditer(content):
+		kind = match.lastgroup
+		if kind == "space":
+			if separator == '':
+				separator = ' '
+			continue
+		elif kind == "br":
+			if replace_br_by_newline:
+				separator = separator.strip(' ') + '\n'
+			elif separator == '':
+				separator = ' '
+			continue
+		elif kind == "tag":
+			continue
+		elif kind == "entity":
+			text = _decode_entity(match.group())
+		else:
+			text = match.group()
+		
+		if len(parts) > 0 and separator != '':
+			parts.append(separator)
+		separator = ''
+		parts.append(text)
+	
+	return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=_ENTITIES_CACHE_SIZE)
+def _decode_entity(entity: str) -> str:
+	return html.unescape(entity)
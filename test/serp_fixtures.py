@@ -0,0 +1,75 @@
+"""
+Offline corpus of result pages (res/test/serp/, generated by benchmark/make_serp_corpus.py), and the transport that
+replays it instead of the network.
+"""
+import os
+import urllib.error
+import urllib.parse
+
+from qr import Transport, WebEngine
+
+RES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "test")
+CORPUS = os.path.join(RES, "serp")
+
+# The builder of each engine of the corpus, and the host names of its result pages
+ENGINES = {
+	"google": (WebEngine.get_google, ("www.google.fr", "www.google.com")),
+	"bing": (WebEngine.get_bing, ("www.bing.com",)),
+	"yahoo": (WebEngine.get_yahoo, ("www.search.yahoo.com",)),
+	"duckduckgo": (WebEngine.get_duckduckgo, ("duckduckgo.com",)),
+	"qwant": (WebEngine.get_qwant, ("www.qwant.com",)),
+}
+
+
+def get_queries(engine: str) -> list:
+	"""
+	Return the queries whose result page is in the corpus for the given engine.
+	"""
+	return sorted(name[:-len(".html")].replace('-', ' ') for name in os.listdir(os.path.join(CORPUS, engine))
+	              if name.endswith(".html"))
+
+
+class FixtureTransport(Transport):
+	"""
+	Transport answering the requests from the corpus, without any network access.
+	
+	A search url is answered with the page of its engine and query, any image with res/test/test.png, and any other
+	url with a small page. The urls that are not in the corpus raise an HTTPError 404.
+	"""
+	
+	def __init__(self):
+		super(FixtureTransport, self).__init__()
+		self.hosts = {host: engine for engine, (_, hosts) in ENGINES.items() for host in hosts}
+		self.files = {}
+		self.requests = 0
+	
+	def get(self, url, timeout=None):
+		self.requests += 1
+		parts = urllib.parse.urlsplit(url)
+		engine = self.hosts.get(parts.netloc)
+		if parts.path.endswith((".png", ".jpg")):
+			return self.__read(os.path.join(RES, "test.png"))
+		elif engine is not None and parts.path != "/url":
+			query = urllib.parse.parse_qs(parts.query)
+			query = (query.get('q') or query.get('p') or [''])[0]
+			path = os.path.join(CORPUS, engine, query.replace(' ', '-') + ".html")
+			if not os.path.isfile(path):
+				raise urllib.error.HTTPError(url, 404, "Not in the corpus", {}, None)
+			return self.__read(path)
+		else:
+			return "<html><body><p>Page of {}</p></body></html>".format(url).encode("utf-8")
+	
+	def iter_content(self, url, chunk_size=16384, timeout=None):
+		content = self.get(url, timeout)
+		for i in range(0, len(content), chunk_size):
+			yield content[i:i + chunk_size]
+	
+	async def aget(self, url, timeout=None):
+		return self.get(url, timeout)
+	
+	def __read(self, path: str) -> bytes:
+		content = self.files.get(path)
+		if content is None:
+			with open(path, "rb") as f:
+				content = self.files[path] = f.read()
+		return content
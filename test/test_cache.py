@@ -0,0 +1,107 @@
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from qr import SerpCache, MemoryCache, WebEngine, FrozenWebResult
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+class TestSerpCache(TestCase):
+
+	def test_get_put(self):
+		cache = SerpCache()
+		self.assertIsNone(cache.get("Google", "python+debugger"))
+		cache.put("Google", "python+debugger", GOOGLE_PAGE)
+		self.assertEqual(GOOGLE_PAGE, cache.get("Google", "python+debugger"))
+		self.assertIsNone(cache.get("Bing", "python+debugger"))
+		self.assertEqual(1, cache.hits)
+		self.assertEqual(2, cache.misses)
+	
+	def test_ttl(self):
+		cache = SerpCache(ttl=0)
+		cache.put("Google", "python", GOOGLE_PAGE)
+		self.assertIsNone(cache.get("Google", "python"))
+		self.assertEqual(0, len(cache))
+	
+	def test_lru_eviction(self):
+		cache = SerpCache(max_entries=2)
+		cache.put("Google", "a", "page a")
+		cache.put("Google", "b", "page b")
+		cache.get("Google", "a")
+		cache.put("Google", "c", "page c")
+		self.assertEqual(2, len(cache))
+		self.assertIsNone(cache.get("Google", "b"))
+		self.assertEqual("page a", cache.get("Google", "a"))
+		self.assertEqual("page c", cache.get("Google", "c"))
+	
+	def test_persistence(self):
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "serp.sqlite")
+			with SerpCache(path) as cache:
+				cache.put("Google", "python", GOOGLE_PAGE)
+			with SerpCache(path) as cache:
+				self.assertEqual(GOOGLE_PAGE, cache.get("Google", "python"))
+	
+	def test_web_engine_cache(self):
+		transport = StubTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		google.cache = SerpCache()
+		self.assertEqual(google.search_list_result("python debugger"), google.search_list_result(["python", "debugger"]))
+		self.assertEqual(1, len(transport.urls))
+		self.assertEqual(1, google.cache.hits)
+	
+	def test_web_engine_async_cache(self):
+		class ThreadCache(SerpCache):
+			threads = set()
+			
+			def get(self, engine, query):
+				self.threads.add(threading.current_thread())
+				return super().get(engine, query)
+			
+			def put(self, engine, query, content):
+				self.threads.add(threading.current_thread())
+				super().put(engine, query, content)
+		
+		transport = StubTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		google.cache = ThreadCache()
+		self.assertEqual(GOOGLE_PAGE, asyncio.run(google.asearch_html("python")))
+		self.assertEqual(GOOGLE_PAGE, asyncio.run(google.asearch_html("python")))
+		self.assertEqual(1, len(transport.urls))
+		self.assertEqual(1, google.cache.hits)
+		# The SQLite queries have not blocked the event loop
+		self.assertNotIn(threading.main_thread(), ThreadCache.threads)
+
+
+class TestMemoryCache(TestCase):
+	
+	def test_byte_bound(self):
+		cache = MemoryCache(max_bytes=100)
+		cache.put("a", "value a", 40)
+		cache.put("b", "value b", 40)
+		self.assertEqual("value a", cache.get("a"))
+		cache.put("c", "value c", 40)
+		self.assertEqual(80, cache.current_bytes)
+		self.assertNotIn("b", cache)
+		self.assertIn("a", cache)
+		cache.put("d", "too large", 101)
+		self.assertIsNone(cache.get("d"))
+		self.assertEqual(1, cache.hits)
+		self.assertEqual(1, cache.misses)
+	
+	def test_web_engine_memory_cache(self):
+		transport = StubTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		google.memory_cache = MemoryCache()
+		results = google.search_list_result("python debugger")
+		self.assertTrue(all(isinstance(result, FrozenWebResult) for result in results))
+		self.assertRaises(AttributeError, setattr, results[0], "title", "Another title")
+		
+		self.assertEqual(results, google.search_list_result(["python", "debugger"]))
+		self.assertIs(results[0], google.search_list_result("python debugger")[0])
+		self.assertEqual(google.search_list_html("python debugger"), google.search_list_html("python debugger"))
+		self.assertEqual(2, len(transport.urls))
+		self.assertEqual(3, google.memory_cache.hits)
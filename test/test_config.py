@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import qr
+from qr import config
+
+
+class TestConfig(TestCase):
+
+	def tearDown(self):
+		qr.configure(runtime_type_checks=True)
+	
+	def test_runtime_type_checks(self):
+		self.assertTrue(config.is_runtime_type_checks_enabled())
+		result = qr.webresult.WebResult("Title", "https://www.python.org", None, "", "")
+		self.assertRaises(TypeError, setattr, result, "title", 5)
+		# A reference taken before configure() is called
+		set_url = qr.webresult.WebResult.url.fset
+		
+		qr.configure(runtime_type_checks=False)
+		self.assertFalse(config.is_runtime_type_checks_enabled())
+		result.title = 5
+		self.assertEqual(5, result.title)
+		set_url(result, 6)
+		self.assertEqual(6, result.url)
+		self.assertEqual("python", qr.webengine.WebEngine.remove_tags("<b>python</b>"))
+		
+		qr.configure(runtime_type_checks=True)
+		self.assertRaises(TypeError, setattr, result, "title", 6)
+		self.assertRaises(TypeError, set_url, result, 7)
+		self.assertRaises(TypeError, qr.webengine.WebEngine.remove_tags, 5)
+	
+	def test_decorator(self):
+		def function(value: int) -> int:
+			return value
+		
+		checked = config.typechecked(function)
+		self.assertIsNot(function, checked)
+		self.assertRaises(TypeError, checked, "5")
+		
+		qr.configure(runtime_type_checks=False)
+		self.assertIs(function, config.typechecked(function))
+		self.assertEqual("5", checked("5"))
+	
+	def test_lazy_imports(self):
+		# "import qr" must not import the submodules nor their dependencies
+		src = os.path.dirname(os.path.dirname(os.path.abspath(qr.__file__)))
+		statement = "import sys, qr; qr.configure(runtime_type_checks=False); print(sorted(name for name in (" \
+		            "'numpy', 'PIL', 'bs4', 'requests', 'aiohttp', 'typeguard', 'qr.webengine', 'qr.information.info')" \
+		            " if name in sys.modules))"
+		output = subprocess.run([sys.executable, "-c", statement], env=dict(os.environ, PYTHONPATH=src),
+		                        stdout=subprocess.PIPE, check=True).stdout
+		self.assertEqual("[]", output.decode("utf-8").strip())
+		
+		self.assertIs(qr.webengine.WebEngine, qr.WebEngine)
+		self.assertIs(qr.information.info.Info, qr.Info)
+		self.assertIn("Quaero", dir(qr))
+		self.assertIn("TableInfo", dir(qr.information))
+		self.assertRaises(AttributeError, getattr, qr, "Unknown")
+		self.assertRaises(AttributeError, getattr, qr.information, "Unknown")
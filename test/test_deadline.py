@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import TestCase
+
+from qr import Deadline, DeadlineExceededError, LatencyTracker, WebEngine, Searcher, MetaEngine, WebResult, \
+	prefetch_thumbnails
+from qr import hedging
+from qr.hedging import hedge
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+class DelayTransport(StubTransport):
+	"""
+	Transport that waits before answering the urls containing 'slow', and records the timeouts it is given.
+	"""
+	
+	def __init__(self, page: str, delay: float = 1.):
+		super(DelayTransport, self).__init__(page)
+		self.delay = delay
+		self.timeouts = []
+	
+	def get(self, url, timeout=None):
+		self.timeouts.append(timeout)
+		if "slow" in url:
+			if isinstance(timeout, Deadline) and timeout.remaining() is not None:
+				time.sleep(min(self.delay, timeout.remaining()))
+				timeout.check()
+			else:
+				time.sleep(self.delay)
+		return super(DelayTransport, self).get(url, timeout)
+
+
+class TestDeadline(TestCase):
+
+	def test_deadline(self):
+		deadline = Deadline(10)
+		self.assertFalse(deadline.expired)
+		self.assertLessEqual(deadline.remaining(), 10)
+		self.assertGreater(deadline.timeout(), 9)
+		self.assertIsNone(Deadline().remaining())
+		self.assertIsNone(Deadline().timeout())
+		self.assertIs(deadline, Deadline.of(deadline))
+		self.assertIs(deadline, Deadline().min(deadline))
+		self.assertIs(deadline, deadline.min(Deadline(20)))
+		self.assertRaises(ValueError, Deadline, -1)
+		
+		expired = Deadline(0)
+		self.assertTrue(expired.expired)
+		self.assertEqual(0, expired.remaining())
+		self.assertRaises(DeadlineExceededError, expired.check)
+		self.assertRaises(TimeoutError, expired.timeout)
+	
+	def test_latency_tracker(self):
+		tracker = LatencyTracker(window=100, min_samples=10, initial=2.)
+		for i in range(9):
+			tracker.record(i / 100.)
+		self.assertEqual(2., tracker.percentile(95))
+		for i in range(9, 200):
+			tracker.record(i / 100.)
+		# Only the last 100 latencies are kept
+		self.assertEqual(100, len(tracker))
+		self.assertEqual(1.95, tracker.percentile(95))
+		self.assertEqual(1.5, tracker.percentile(50))
+	
+	def test_hedge(self):
+		tracker = LatencyTracker(min_samples=0)
+		for i in range(100):
+			tracker.record(0.01)
+		
+		def slow():
+			time.sleep(1.)
+			return "primary"
+		
+		start = time.monotonic()
+		self.assertEqual("mirror", hedge(slow, lambda: "mirror", tracker))
+		self.assertLess(time.monotonic() - start, 0.5)
+		self.assertEqual("primary", hedge(lambda: "primary", lambda: "mirror", tracker))
+		
+		def fail():
+			raise OSError("Connection refused")
+		
+		self.assertEqual("mirror", hedge(fail, lambda: "mirror", tracker))
+		self.assertRaises(OSError, hedge, fail, fail, tracker)
+		self.assertRaises(DeadlineExceededError, hedge, slow, slow, tracker, Deadline(0.1))
+		
+		# Without any deadline, the hedged requests are given a default timeout
+		default_timeout = hedging.DEFAULT_TIMEOUT
+		hedging.DEFAULT_TIMEOUT = 0.1
+		try:
+			start = time.monotonic()
+			self.assertRaises(DeadlineExceededError, hedge, slow, slow, tracker)
+			self.assertLess(time.monotonic() - start, 0.5)
+		finally:
+			hedging.DEFAULT_TIMEOUT = default_timeout
+	
+	def test_hedged_engine(self):
+		transport = DelayTransport(GOOGLE_PAGE)
+		google = WebEngine(name="Google", home_url="https://www.google.com/",
+		                   pattern_search_url="https://www.google.fr/slow?q={}", transport=transport,
+		                   mirror_pattern_search_url="https://www.google.com/search?q={}",
+		                   latency_tracker=LatencyTracker(initial=0.05))
+		start = time.monotonic()
+		self.assertEqual(2, len(google.search_list_result("python")))
+		self.assertLess(time.monotonic() - start, 0.5)
+		self.assertEqual(2, len(list(google.iter_results("python"))))
+		# The hedged requests run in the threads of the engine
+		self.assertTrue(any(thread.name.startswith("qr-hedge-Google") for thread in threading.enumerate()))
+		self.assertIsNotNone(WebEngine.get_google(hedge=True).mirror_pattern_search_url)
+		self.assertIsNone(WebEngine.get_google().mirror_pattern_search_url)
+	
+	def test_propagation(self):
+		transport = DelayTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		deadline = Deadline(5)
+		Searcher(transport=transport).search(keywords="python", web_engine=google, deadline=deadline)
+		# The result page and the first result have been downloaded with the same deadline
+		self.assertEqual(2, len(transport.timeouts))
+		self.assertTrue(all(timeout is deadline for timeout in transport.timeouts))
+		
+		google.pattern_search_url = "https://www.google.fr/slow?q={}"
+		self.assertRaises(DeadlineExceededError, google.search_list_result, "python", Deadline(0.1))
+		meta = MetaEngine([google])
+		self.assertRaises(DeadlineExceededError, meta.search_list_result, "python", 0.1)
+	
+	def test_prefetch_thumbnails(self):
+		transport = DelayTransport(GOOGLE_PAGE, delay=2.)
+		results = [WebResult("Python", "https://www.python.org/", "https://www.python.org/slow.png", None, None,
+		                     transport=transport) for _ in range(3)]
+		start = time.monotonic()
+		prefetch_thumbnails(results, deadline=0.1)
+		self.assertLess(time.monotonic() - start, 1.)
+		self.assertFalse(any(result.is_thumbnail_downloaded for result in results))
+		self.assertTrue(all(isinstance(timeout, Deadline) for timeout in transport.timeouts))
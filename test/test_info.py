@@ -1,6 +1,6 @@
 import numpy as np
 from unittest import TestCase
-from typing import Union, List, Dict, Tuple, Set, Iterable
+from typing import Union, Optional, List, Dict, Tuple, Set, Iterable, Any
 
 from PIL import Image, JpegImagePlugin, PngImagePlugin
 
@@ -78,6 +78,11 @@ class TestInfo(TestCase):
 		self.assertEqual(info2processed, test_info2)
 		self.assertEqual(test_info2, self.info2.process())
 		self.assertEqual(self.info2, self.info2.process())
+		
+		# Info is not hashable, so the items of a set cannot be nested
+		for data in ({1, 2}, [{1, 2}], ({"a"}, 3)):
+			self.assertRaisesRegex(TypeError, "cannot be nested in Info", Info, data)
+		self.assertEqual(set(), Info(set()).data)
 	
 	def test_autodetect_dtype(self):
 		i = Info()
@@ -282,3 +287,101 @@ class TestInfo(TestCase):
 		self.assertRaises(TypeError, i.is_valid_dtype(WebEngine))
 		self.assertRaises(TypeError, i.is_valid_dtype(Union[WebEngine, WebResult]))
 		self.assertRaises(TypeError, i.is_valid_dtype(Union[WebEngine, int]))
+	
+	def test_strict(self):
+		fast = Info()
+		strict = Info(strict=True)
+		values = ["", 1, 2.0, 3j, True, None, [1, 2], [1, "a"], [], (1,), (1, 2), {1}, {1: "a"}, {"a": 1},
+		          np.array([1, 2])]
+		dtypes = [int, float, complex, str, bool, np.ndarray, List[int], List[Union[int, str]], Tuple[int],
+		          Tuple[int, ...], Set[int], Dict[int, str], Iterable[int], Union[int, str], Optional[int]]
+		for value in values:
+			for dtype in dtypes:
+				self.assertEqual(strict.check_data_against_dtype(value, dtype, False),
+				                 fast.check_data_against_dtype(value, dtype, False),
+				                 "data = {}, dtype = {}".format(repr(value), dtype))
+	
+	def test_large_table(self):
+		rows = [["Title {}".format(i), "Content {}".format(i), i, i / 2] for i in range(10000)]
+		info = Info(data=rows, process_data=False)
+		self.assertEqual(List[List[Union[str, int, float]]], info.dtype)
+		self.assertTrue(info.check_data_against_dtype())
+	
+	def test_process_without_copy(self):
+		title = Info("Title")
+		row = ["Content", 25]
+		processed = Info(data=[title, row], process_data=False).process()
+		self.assertIs(title, processed.data[0])
+		self.assertIs(row[0], processed.data[1].data[0].data)
+		self.assertEqual(List[Info], processed.data[1].dtype)
+	
+	def test_process_deep(self):
+		data = 1
+		for _ in range(150):
+			data = [data, "item"]
+		info = Info(data=data)
+		for _ in range(150):
+			self.assertEqual("item", info.data[1].data)
+			info = info.data[0]
+		self.assertEqual(1, info.data)
+	
+	def test_process_very_deep(self):
+		# Deeper than the recursion limit
+		for nest in (lambda data: [data, 2], lambda data: [data]):
+			data = 1
+			for _ in range(2000):
+				data = nest(data)
+			info = Info(data=data)
+			self.assertEqual(List[Info], info.dtype)
+			for _ in range(2000):
+				info = info.data[0]
+			self.assertEqual(1, info.data)
+		
+		data = 1
+		for _ in range(2000):
+			data = {"k": data}
+		# Only the keys of a dictionary are nested
+		self.assertEqual([Info("k")], Info(data=data).data)
+		
+		# The containers nested too deeply are detected without their items
+		dtype = Info().autodetect_dtype(data)
+		for _ in range(32):
+			self.assertEqual(str, dtype.__args__[0])
+			dtype = dtype.__args__[1]
+		self.assertEqual(Dict[Any, Any], dtype)
+		self.assertTrue(Info().check_data_against_dtype(data, Info().autodetect_dtype(data)))
+	
+	def test_get_min_max(self):
+		i = Info()
+		self.assertEqual((-3, 25), i.get_min_max([4, -3, 25, 0.5]))
+		self.assertEqual((-1.5, 9.0), i.get_min_max(np.array([[1.0, -1.5], [9.0, 2.0]])))
+		self.assertEqual((1 + 0j, 1j), i.get_min_max([1j, 1 + 0j, 1 + 1j]))
+		self.assertEqual((2, 48), i.get_min_max([Info(25), Info(2), Info(48)]))
+		self.assertRaises(ValueError, i.get_min_max, [])
+		self.assertRaises(TypeError, i.get_min_max, [1, "2"])
+	
+	def test_summaries(self):
+		info = Info(data=[1, 2, 3, 4], process_data=False)
+		self.assertEqual(4, info.get_count())
+		self.assertEqual(10, info.get_sum())
+		self.assertEqual(2.5, info.get_mean())
+		self.assertEqual(2.5, info.get_percentile(50))
+		self.assertEqual(4.0, info.get_percentile(100))
+		self.assertRaises(ValueError, info.get_percentile, 101)
+		self.assertRaises(TypeError, info.get_percentile, 50, [1j])
+		
+		# The summaries are cached until the data is set
+		self.assertEqual((1, 4), info.get_min_max())
+		info.data = [5, 6]
+		self.assertEqual((5, 6), info.get_min_max())
+		self.assertEqual(11, info.get_sum())
+		
+		info = Info(data=[1, 2, 3])
+		self.assertEqual(6, info.get_sum())
+		info[0] = 100
+		self.assertEqual(105, info.get_sum())
+		self.assertEqual((2, 100), info.get_min_max())
+	
+	def test_slots(self):
+		self.assertFalse(hasattr(Info(25), "__dict__"))
+		self.assertFalse(hasattr(self.info1.process(), "__dict__"))
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+from qr import MetaEngine, WebEngine, WebResult, Quaero, Transport, normalize_url
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+# The same results as GOOGLE_PAGE, with urls that differ until they are normalized
+BING_PAGE = GOOGLE_PAGE.replace("/url?q=https://www.python.org/", "/url?q=https://Python.org&amp;sa=U")
+
+
+class SlowTransport(StubTransport):
+	"""
+	Transport that waits before answering.
+	"""
+	
+	def __init__(self, page: str, delay: float):
+		super(SlowTransport, self).__init__(page)
+		self.delay = delay
+	
+	def get(self, url, timeout=None):
+		time.sleep(self.delay)
+		return super(SlowTransport, self).get(url, timeout)
+	
+	async def aget(self, url, timeout=None):
+		await asyncio.sleep(self.delay)
+		return super(SlowTransport, self).get(url, timeout)
+
+
+class FailingTransport(Transport):
+
+	def get(self, url, timeout=None):
+		raise OSError("Connection refused")
+	
+	async def aget(self, url, timeout=None):
+		raise OSError("Connection refused")
+
+
+def get_google(transport: Transport) -> WebEngine:
+	return WebEngine(name="Google", home_url="https://www.google.com/",
+	                 pattern_search_url="https://www.google.fr/search?q={}", transport=transport)
+
+
+class TestMetaEngine(TestCase):
+
+	def test_normalize_url(self):
+		self.assertEqual("https://python.org", normalize_url("https://www.google.com/url?q=https://WWW.Python.org/"))
+		self.assertEqual("https://python.org", normalize_url("https://python.org/#about"))
+		self.assertEqual("http://docs.python.org/3?a=b", normalize_url("HTTP://Docs.Python.org/3/?a=b#pdb"))
+	
+	def test_fuse(self):
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE))])
+		a, b, c = (WebResult(title, "https://{}.org/".format(title), None, None, None) for title in "abc")
+		c_duplicate = WebResult("c bis", "https://www.c.org", None, None, None)
+		# 'c' is returned by both engines with the best ranks, and represented by its best ranked result
+		fused = meta.fuse([[a, c, b], None, [c_duplicate, b]])
+		self.assertEqual([c_duplicate, b, a], fused)
+		self.assertEqual([a, b], meta.fuse([[a], [b]]))
+	
+	def test_search_list_result(self):
+		google = get_google(StubTransport(GOOGLE_PAGE))
+		bing = get_google(StubTransport(BING_PAGE))
+		meta = MetaEngine([google, bing], quorum=2)
+		results = meta.search_list_result("python debugger")
+		# The two pages give the same urls, once normalized
+		self.assertEqual(google.search_list_result("python debugger"), results)
+		self.assertEqual(list(meta.iter_results("python debugger")), results)
+		self.assertEqual("Google+Google", meta.name)
+	
+	def test_quorum_and_timeout(self):
+		slow = get_google(SlowTransport(BING_PAGE, 2.))
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), slow], quorum=1)
+		start = time.monotonic()
+		self.assertEqual(2, len(meta.search_list_result("python")))
+		self.assertLess(time.monotonic() - start, 1.)
+		
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), slow], quorum=2, timeout=0.2)
+		start = time.monotonic()
+		self.assertEqual(2, len(meta.search_list_result("python")))
+		self.assertLess(time.monotonic() - start, 1.)
+		
+		meta = MetaEngine([slow], timeout=0.1)
+		self.assertRaises(TimeoutError, meta.search_list_result, "python")
+	
+	def test_executor(self):
+		slow = get_google(SlowTransport(BING_PAGE, 0.3))
+		with MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), slow], quorum=1, max_workers=3) as meta:
+			for _ in range(5):
+				self.assertEqual(2, len(meta.search_list_result("python")))
+			# The threads are reused by the searches, even when the slow engine has not answered yet
+			threads = [thread for thread in threading.enumerate() if thread.name.startswith("qr-meta")]
+			self.assertLessEqual(len(threads), 3)
+		
+		self.assertRaises(ValueError, MetaEngine, [slow], max_workers=0)
+	
+	def test_failures(self):
+		meta = MetaEngine([get_google(FailingTransport()), get_google(StubTransport(GOOGLE_PAGE))], quorum=1)
+		self.assertEqual(2, len(meta.search_list_result("python")))
+		
+		meta = MetaEngine([get_google(FailingTransport())])
+		self.assertRaises(OSError, meta.search_list_result, "python")
+		self.assertRaises(ValueError, MetaEngine, [])
+		self.assertRaises(ValueError, MetaEngine, [get_google(FailingTransport())], quorum=2)
+	
+	def test_asearch_list_result(self):
+		slow = get_google(SlowTransport(BING_PAGE, 2.))
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), get_google(FailingTransport()), slow], quorum=2,
+		                  timeout=0.2)
+		start = time.monotonic()
+		results = asyncio.run(meta.asearch_list_result("python"))
+		self.assertLess(time.monotonic() - start, 1.)
+		self.assertEqual(get_google(StubTransport(GOOGLE_PAGE)).search_list_result("python"), results)
+	
+	def test_search_list_result_many(self):
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), get_google(StubTransport(BING_PAGE))])
+		queries = ["query {}".format(i) for i in range(10)]
+		found = [query for query, items in meta.search_list_result_many(queries, max_workers=3) if len(items) == 2]
+		self.assertEqual(sorted(queries), sorted(found))
+	
+	def test_quaero(self):
+		meta = MetaEngine([get_google(StubTransport(GOOGLE_PAGE)), get_google(StubTransport(BING_PAGE))])
+		quaero = Quaero(meta, parser="lxml")
+		self.assertIs(meta, quaero.web_engine)
+		self.assertEqual("lxml", meta.web_engines[1].parser.name)
+		self.assertEqual(10, len(list(quaero.search_many(["query {}".format(i) for i in range(10)]))))
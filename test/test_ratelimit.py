@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import urllib.error
+from unittest import TestCase
+
+from qr import TokenBucket, Backoff, BlockedError, WebEngine, Deadline, DeadlineExceededError
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+BLOCK_PAGE = """<html><body><form id="captcha-form" action="/sorry/index">Our systems have detected unusual traffic
+from your computer network.</form></body></html>"""
+
+
+class ThrottledTransport(StubTransport):
+	"""
+	Transport that answers the first requests with an error status code or a block page.
+	"""
+	
+	def __init__(self, page: str, failures: list):
+		super(ThrottledTransport, self).__init__(page)
+		self.failures = list(failures)
+		self.times = []
+	
+	def get(self, url, timeout=None):
+		self.times.append(time.monotonic())
+		if len(self.failures) > 0:
+			failure = self.failures.pop(0)
+			if isinstance(failure, int):
+				raise urllib.error.HTTPError(url, failure, "Throttled", {}, None)
+			self.urls.append(url)
+			return failure.encode("utf-8")
+		return super(ThrottledTransport, self).get(url, timeout)
+	
+	async def aget(self, url, timeout=None):
+		return self.get(url, timeout)
+
+
+def get_google(transport, **kwargs) -> WebEngine:
+	return WebEngine(name="Google", home_url="https://www.google.com/",
+	                 pattern_search_url="https://www.google.fr/search?q={}", transport=transport, **kwargs)
+
+
+class TestRateLimit(TestCase):
+
+	def test_token_bucket(self):
+		bucket = TokenBucket(rate=20, capacity=2)
+		start = time.monotonic()
+		delays = [bucket.acquire() for _ in range(6)]
+		# The first 2 tokens are given at once, and the next ones every 0.05 seconds
+		self.assertEqual([0., 0.], delays[:2])
+		self.assertGreaterEqual(time.monotonic() - start, 0.19)
+		metrics = bucket.metrics
+		self.assertEqual(6, metrics["acquisitions"])
+		self.assertAlmostEqual(sum(delays), metrics["queued"])
+		self.assertAlmostEqual(max(delays), metrics["max_queued"])
+		self.assertRaises(ValueError, TokenBucket, 0)
+		self.assertRaises(ValueError, TokenBucket, 1, 0)
+	
+	def test_shared_bucket(self):
+		bucket = TokenBucket(rate=50)
+		times = []
+		lock = threading.Lock()
+		
+		def take():
+			bucket.acquire()
+			with lock:
+				times.append(time.monotonic())
+		
+		async def atake():
+			await asyncio.gather(*[bucket.aacquire() for _ in range(5)])
+		
+		threads = [threading.Thread(target=take) for _ in range(5)]
+		start = time.monotonic()
+		for thread in threads:
+			thread.start()
+		asyncio.run(atake())
+		for thread in threads:
+			thread.join()
+		# 10 tokens, at most 1 every 0.02 seconds, whether they are taken by threads or tasks
+		self.assertGreaterEqual(time.monotonic() - start, 0.17)
+		self.assertEqual(10, bucket.metrics["acquisitions"])
+	
+	def test_deadline_and_penalty(self):
+		bucket = TokenBucket(rate=1)
+		bucket.acquire()
+		self.assertRaises(DeadlineExceededError, bucket.acquire, Deadline(0.1))
+		self.assertEqual(1, bucket.metrics["acquisitions"])
+		
+		bucket = TokenBucket(rate=100, capacity=10)
+		bucket.penalize(0.2)
+		start = time.monotonic()
+		bucket.acquire()
+		self.assertGreaterEqual(time.monotonic() - start, 0.19)
+		# The tokens are not given at once when the penalty ends
+		self.assertGreater(bucket.acquire(), 0.)
+	
+	def test_backoff(self):
+		backoff = Backoff(retries=4, base=0.1, cap=0.3)
+		delays = list(backoff.delays())
+		self.assertEqual(4, len(delays))
+		for delay, maximum in zip(delays, [0.1, 0.2, 0.3, 0.3]):
+			self.assertTrue(0. <= delay <= maximum)
+		
+		throttled = urllib.error.HTTPError("https://www.google.fr/", 429, "Too Many Requests", {"Retry-After": "10"},
+		                                   None)
+		self.assertTrue(backoff.is_retried(throttled))
+		self.assertEqual(0.3, backoff.get_delay(throttled, 0.1))
+		self.assertFalse(backoff.is_retried(urllib.error.HTTPError("https://www.google.fr/", 404, "", {}, None)))
+		self.assertRaises(BlockedError, Backoff.check_page, "https://www.google.fr/", BLOCK_PAGE)
+		Backoff.check_page("https://www.google.fr/", GOOGLE_PAGE)
+	
+	def test_retry(self):
+		transport = ThrottledTransport(GOOGLE_PAGE, [429, 503, BLOCK_PAGE])
+		google = get_google(transport, backoff=Backoff(retries=3, base=0.01))
+		self.assertEqual(2, len(google.search_list_result("python")))
+		self.assertEqual(4, len(transport.times))
+		self.assertEqual(2, len(list(google.iter_results("python"))))
+		
+		transport = ThrottledTransport(GOOGLE_PAGE, [429, 503, BLOCK_PAGE])
+		google = get_google(transport, backoff=Backoff(retries=3, base=0.01))
+		self.assertEqual(2, len(asyncio.run(google.asearch_list_result("python"))))
+		
+		google = get_google(ThrottledTransport(GOOGLE_PAGE, [BLOCK_PAGE] * 3), backoff=Backoff(retries=2, base=0.01))
+		self.assertRaises(BlockedError, google.search_html, "python")
+		google = get_google(ThrottledTransport(GOOGLE_PAGE, [404]), backoff=Backoff(retries=2, base=0.01))
+		self.assertRaises(urllib.error.HTTPError, google.search_html, "python")
+		# Without any retry policy, the errors are raised at once
+		google = get_google(ThrottledTransport(GOOGLE_PAGE, [429]))
+		self.assertRaises(urllib.error.HTTPError, google.search_html, "python")
+	
+	def test_rate_limited_retry(self):
+		transport = ThrottledTransport(GOOGLE_PAGE, [429])
+		bucket = TokenBucket(rate=100)
+		google = get_google(transport, rate_limiter=bucket, backoff=Backoff(retries=1, base=0.2, cap=0.2))
+		google.search_html("python")
+		# The retry has waited for its token until the end of the penalty given to the bucket
+		self.assertEqual(2, len(transport.times))
+		self.assertEqual(2, bucket.metrics["acquisitions"])
+		self.assertAlmostEqual(transport.times[1] - transport.times[0], bucket.metrics["max_queued"], delta=0.05)
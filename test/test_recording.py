@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+import time
+import urllib.error
+from unittest import TestCase
+
+from qr import Quaero, WebEngine, RecordingTransport, ReplayTransport, Deadline, DeadlineExceededError
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+class ErrorTransport(StubTransport):
+	"""
+	Transport that answers the urls containing 'missing' with an HTTPError 404.
+	"""
+	
+	def get(self, url, timeout=None):
+		if "missing" in url:
+			raise urllib.error.HTTPError(url, 404, "Not Found", {}, None)
+		return super(ErrorTransport, self).get(url, timeout)
+
+
+class TestRecording(TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.directory.name, "exchanges.zip")
+	
+	def tearDown(self):
+		self.directory.cleanup()
+	
+	def record(self) -> RecordingTransport:
+		stub = ErrorTransport(GOOGLE_PAGE)
+		with RecordingTransport(self.path, transport=stub) as recording:
+			google = WebEngine.get_google(transport=recording)
+			self.assertEqual(2, len(google.search_list_result("python")))
+			self.assertEqual(2, len(list(google.iter_results("pentatonix"))))
+			self.assertRaises(urllib.error.HTTPError, recording.get, "https://www.python.org/missing")
+		return recording
+	
+	def test_record(self):
+		recording = self.record()
+		self.assertEqual(3, len(recording))
+		self.assertTrue(os.path.isfile(self.path))
+		
+		replay = ReplayTransport(self.path)
+		self.assertEqual(recording.urls, replay.urls)
+		google = WebEngine.get_google(transport=replay)
+		self.assertEqual(GOOGLE_PAGE, google.search_html("python"))
+		self.assertEqual(2, len(list(google.iter_results("pentatonix"))))
+		self.assertRaises(urllib.error.HTTPError, replay.get, "https://www.python.org/missing")
+		self.assertRaises(urllib.error.HTTPError, google.search_html, "unknown")
+		self.assertEqual(4, replay.requests)
+		
+		self.assertRaises(ValueError, ReplayTransport, self.path, -1)
+		self.assertRaises(ValueError, ReplayTransport, self.path, 0, 0)
+		self.assertRaises(ValueError, RecordingTransport().save)
+	
+	def test_quaero(self):
+		# The whole pipeline is replayed: the result page, and then the website of the first result
+		stub = ErrorTransport(GOOGLE_PAGE)
+		with RecordingTransport(self.path, transport=stub) as recording:
+			Quaero(transport=recording).search("python")
+		self.assertEqual(2, len(recording))
+		
+		replay = ReplayTransport(self.path)
+		Quaero(transport=replay).search("python")
+		self.assertEqual(2, replay.requests)
+	
+	def test_latency(self):
+		self.record()
+		replay = ReplayTransport(self.path, latency=0.05, bandwidth=len(GOOGLE_PAGE) * 20)
+		url = replay.urls[0]
+		start = time.monotonic()
+		replay.get(url)
+		self.assertGreaterEqual(time.monotonic() - start, 0.1)
+		self.assertRaises(DeadlineExceededError, replay.get, url, Deadline(0.01))
+		self.assertRaises(TimeoutError, replay.get, url, 0.01)
+		self.assertRaises(DeadlineExceededError, list, replay.iter_content(url, 64, Deadline(0.07)))
+		
+		async def load():
+			# The concurrent requests wait at the same time
+			return await asyncio.gather(*(replay.aget(url) for _ in range(1000)))
+		
+		start = time.monotonic()
+		self.assertEqual(1000, len(asyncio.run(load())))
+		self.assertLess(time.monotonic() - start, 2.)
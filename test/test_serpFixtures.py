@@ -0,0 +1,53 @@
+import contextlib
+import io
+import urllib.error
+from unittest import TestCase
+
+from PIL import Image
+
+from qr import WebEngine, prefetch_thumbnails
+
+from serp_fixtures import ENGINES, FixtureTransport, get_queries
+
+
+class TestSerpFixtures(TestCase):
+
+	def test_corpus(self):
+		for engine in ENGINES:
+			self.assertEqual(["artificial intelligence tutorial", "pentatonix daft punk", "python debugger"],
+			                 get_queries(engine))
+	
+	def test_google(self):
+		transport = FixtureTransport()
+		google = WebEngine.get_google(transport=transport)
+		for query in get_queries("google"):
+			results = google.search_list_result(query)
+			self.assertEqual(10, len(results))
+			for result in results:
+				self.assertTrue(result.url.startswith("https://www.google.com/url?q=https://"))
+				self.assertGreater(len(result.title), 0)
+				self.assertGreater(len(result.description), 0)
+				self.assertIn("mars", result.date)
+			
+			prefetch_thumbnails(results)
+			self.assertTrue(all(isinstance(result.thumbnail, Image.Image) for result in results))
+		self.assertEqual(len(google.parse_list_result(google.search_html("python debugger"), "python debugger")),
+		                 len(list(google.iter_results("python debugger"))))
+	
+	def test_other_engines(self):
+		transport = FixtureTransport()
+		for engine, (builder, _) in ENGINES.items():
+			if engine == "google":
+				continue
+			web_engine = builder(transport=transport)
+			for query in get_queries(engine):
+				content = web_engine.search_html(query)
+				self.assertIn("<title>{} - ".format(query), content)
+				# parse_list_html() prints the items of the other engines
+				with contextlib.redirect_stdout(io.StringIO()):
+					self.assertEqual(10, len([item for item in web_engine.search_list_html(query, False)
+					                          if item.name == "li"]))
+	
+	def test_missing_page(self):
+		google = WebEngine.get_google(transport=FixtureTransport())
+		self.assertRaises(urllib.error.HTTPError, google.search_html, "not recorded")
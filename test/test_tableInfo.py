@@ -0,0 +1,58 @@
+import numpy as np
+from unittest import TestCase
+from typing import Union, List
+
+from qr import Info, TableInfo
+
+
+class TestTableInfo(TestCase):
+
+	def setUp(self):
+		self.data = [["My title", "My content", 25, 0.5], ["Title again", "Content again", 48, 1],
+		             ["My title", "Content again", -3, 2.5]]
+		self.table = TableInfo(self.data)
+	
+	def test_is_table(self):
+		self.assertTrue(TableInfo.is_table(self.data))
+		self.assertTrue(TableInfo.is_table([(1, True), (2, False)]))
+		self.assertFalse(TableInfo.is_table([]))
+		self.assertFalse(TableInfo.is_table([[]]))
+		self.assertFalse(TableInfo.is_table("text"))
+		self.assertFalse(TableInfo.is_table([["a", 1], ["b"]]))
+		self.assertFalse(TableInfo.is_table([["a", 1], [2, 1]]))
+		self.assertFalse(TableInfo.is_table([[None], [1]]))
+		self.assertFalse(TableInfo.is_table([[2 ** 64]]))
+	
+	def test_columns(self):
+		self.assertEqual((3, 4), self.table.shape)
+		self.assertEqual([str, str, int, float], self.table.column_types)
+		self.assertEqual(np.int64, self.table.columns[2].dtype)
+		self.assertEqual(["My title", "Title again", "My title"], self.table.get_column(0))
+		self.assertEqual([0.5, 1.0, 2.5], self.table.get_column(-1))
+		self.assertEqual(List[List[Union[str, int, float]]], self.table.dtype)
+		self.assertEqual(self.data, self.table.data)
+	
+	def test_getitem(self):
+		self.assertEqual(Info(48), self.table[1, 2])
+		self.assertIsInstance(self.table[1, 2].data, int)
+		self.assertEqual(Info("Content again"), self.table[-1, 1])
+		
+		row = self.table[0]
+		self.assertEqual(List[Info], row.dtype)
+		self.assertEqual([Info("My title"), Info("My content"), Info(25), Info(0.5)], row.data)
+		self.assertRaises(IndexError, self.table.__getitem__, 3)
+		
+		self.assertEqual(TableInfo(self.data[1:]), self.table[1:])
+		self.assertRaises(TypeError, self.table.__setitem__, 0, None)
+	
+	def test_create(self):
+		self.assertIsInstance(Info.create(self.data), TableInfo)
+		self.assertNotIsInstance(Info.create([["a", 1], ["b"]]), TableInfo)
+		self.assertIs(self.table, self.table.process())
+	
+	def test_memory(self):
+		rows = [["Title {}".format(i % 100), i, i / 3] for i in range(10000)]
+		table = TableInfo(rows)
+		self.assertEqual(rows, table.data)
+		# 8 bytes per number, 4 bytes per string index and the 100 distinct titles
+		self.assertLess(table.nbytes, 10000 * (8 + 8 + 4) + 2000)
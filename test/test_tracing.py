@@ -0,0 +1,105 @@
+from unittest import TestCase
+
+from qr import Quaero, WebEngine, SerpCache, MemoryCache, Info, tracing
+from qr.tracing import TraceHook, TraceRecorder, OpenTelemetryHook
+
+from test_webEngine import StubTransport, GOOGLE_PAGE
+
+
+class OrderHook(TraceHook):
+	"""
+	Hook recording the order in which the spans start and end.
+	"""
+	
+	def __init__(self):
+		self.events = []
+	
+	def on_start(self, name, attributes):
+		self.events.append(("start", name))
+		return name
+	
+	def on_end(self, name, attributes, state, duration, error):
+		self.events.append(("end", state, error is not None))
+
+
+class TestTracing(TestCase):
+
+	def setUp(self):
+		self.recorder = TraceRecorder()
+		tracing.add_hook(self.recorder)
+	
+	def tearDown(self):
+		for hook in tracing.get_hooks():
+			tracing.remove_hook(hook)
+	
+	def test_hooks(self):
+		tracing.add_hook(self.recorder)
+		self.assertEqual((self.recorder,), tracing.get_hooks())
+		self.assertTrue(tracing.is_enabled())
+		
+		hook = OrderHook()
+		tracing.add_hook(hook)
+		with tracing.span("outer") as span:
+			span.set_attribute("key", "value")
+			self.assertEqual({"key": "value"}, span.attributes)
+			with self.assertRaises(ValueError):
+				with tracing.span("inner"):
+					raise ValueError()
+		self.assertEqual([("start", "outer"), ("start", "inner"), ("end", "inner", True), ("end", "outer", False)],
+		                 hook.events)
+		self.assertEqual(1, self.recorder.spans["inner"]["errors"])
+		self.assertEqual(0, self.recorder.spans["outer"]["errors"])
+		
+		tracing.remove_hook(hook)
+		tracing.remove_hook(self.recorder)
+		self.assertFalse(tracing.is_enabled())
+		# Without any hook, the same span is returned every time
+		self.assertIs(tracing.span("outer"), tracing.span("inner", key="value"))
+		tracing.count("bytes_fetched", 10)
+		self.assertEqual(2, self.recorder.spans["outer"]["count"] + self.recorder.spans["inner"]["count"])
+		self.assertEqual({}, self.recorder.counters)
+	
+	def test_web_engine(self):
+		transport = StubTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		google.cache = SerpCache()
+		google.memory_cache = MemoryCache()
+		self.assertEqual(2, len(google.search_list_result("python")))
+		self.assertEqual(2, len(google.search_list_result("python")))
+		for stage in ("webengine.download", "webengine.parse", "webengine.extract"):
+			self.assertEqual(1, self.recorder.spans[stage]["count"], stage)
+		self.assertEqual(len(GOOGLE_PAGE.encode("utf-8")), self.recorder.counters["bytes_fetched"])
+		self.assertEqual(2, self.recorder.counters["results_parsed"])
+		self.assertEqual(1, self.recorder.counters["cache.hits"])
+		self.assertEqual(2, self.recorder.counters["cache.misses"])
+		
+		self.recorder.reset()
+		google.cache = None
+		self.assertEqual(2, len(list(google.iter_results("pentatonix"))))
+		self.assertEqual(len(GOOGLE_PAGE.encode("utf-8")), self.recorder.counters["bytes_fetched"])
+		self.assertEqual(1, self.recorder.spans["webengine.download"]["count"])
+		
+		# Stopping after the first result is not an error
+		next(google.iter_results("pentatonix"))
+		self.assertEqual(2, self.recorder.spans["webengine.download"]["count"])
+		self.assertEqual(0, self.recorder.spans["webengine.download"]["errors"])
+	
+	def test_quaero(self):
+		transport = StubTransport(GOOGLE_PAGE)
+		Quaero(transport=transport).search("python")
+		for stage in ("quaero.search", "searcher.download", "searcher.extract"):
+			self.assertEqual(1, self.recorder.spans[stage]["count"], stage)
+		# The whole website, but the result page only until its first result
+		self.assertGreater(self.recorder.counters["bytes_fetched"], len(GOOGLE_PAGE.encode("utf-8")))
+		self.assertLess(self.recorder.counters["bytes_fetched"], 2 * len(GOOGLE_PAGE.encode("utf-8")))
+		
+		Info([1, [2, 3]])
+		self.assertIn("info.process", self.recorder.spans)
+	
+	def test_opentelemetry(self):
+		if tracing.otel_trace is None:
+			self.assertRaises(ImportError, OpenTelemetryHook)
+		else:
+			tracing.add_hook(OpenTelemetryHook())
+			with tracing.span("outer"):
+				tracing.count("bytes_fetched", 10)
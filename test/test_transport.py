@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+
+from qr import Transport, Deadline, DeadlineExceededError
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	client_ports = set()
+
+	def do_GET(self):
+		KeepAliveHandler.client_ports.add(self.client_address[1])
+		if self.path == "/missing":
+			body = b"not found"
+			self.send_response(404)
+		elif self.path == "/hang":
+			time.sleep(0.5)
+			body = b"late"
+			self.send_response(200)
+		elif self.path == "/slow":
+			# Send the body in pieces, such that each read is fast but the whole body is slow
+			self.send_response(200)
+			self.send_header("Content-Length", "10")
+			self.end_headers()
+			try:
+				for i in range(10):
+					self.wfile.write(b'.')
+					self.wfile.flush()
+					time.sleep(0.05)
+			except OSError:
+				pass
+			return
+		else:
+			body = "<html>{}</html>".format(self.path).encode("utf-8")
+			self.send_response(200)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass
+
+
+class TestTransport(TestCase):
+
+	def setUp(self):
+		KeepAliveHandler.client_ports = set()
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+		self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+		self.thread.start()
+		self.base_url = "http://127.0.0.1:{}".format(self.server.server_port)
+		self.transport = Transport(pool_size=2)
+
+	def tearDown(self):
+		self.transport.close()
+		self.server.shutdown()
+		self.server.server_close()
+
+	def test_get_text(self):
+		self.assertEqual("<html>/search?q=python</html>", self.transport.get_text(self.base_url + "/search?q=python"))
+
+	def test_connection_reuse(self):
+		for i in range(11):
+			self.transport.get(self.base_url + "/thumbnail/{}.png".format(i))
+		self.assertEqual(1, len(KeepAliveHandler.client_ports))
+
+	def test_error_status(self):
+		with self.assertRaises(urllib.error.HTTPError) as context:
+			self.transport.get(self.base_url + "/missing")
+		self.assertEqual(404, context.exception.code)
+
+	def test_deadline(self):
+		self.assertEqual("<html>/fast</html>", self.transport.get_text(self.base_url + "/fast", timeout=Deadline(5)))
+		self.assertRaises(DeadlineExceededError, self.transport.get, self.base_url + "/hang", timeout=Deadline(0.1))
+		# The deadline bounds the whole body, and not only each read
+		self.assertRaises(DeadlineExceededError, self.transport.get, self.base_url + "/slow", timeout=Deadline(0.2))
+		self.assertEqual(b"..........", self.transport.get(self.base_url + "/slow", timeout=0.2))
+		self.assertRaises(DeadlineExceededError, self.transport.get, self.base_url + "/fast", timeout=Deadline(0))
+	
+	def test_async_sessions(self):
+		async def get_text():
+			async with self.transport:
+				text = await self.transport.aget_text(self.base_url + "/async")
+				return text, self.transport._Transport__get_async_session()
+
+		sessions = []
+		for i in range(3):
+			text, session = asyncio.run(get_text())
+			self.assertEqual("<html>/async</html>", text)
+			sessions.append(session)
+		# Each event loop has had its own session, closed by the transport
+		self.assertEqual(3, len(set(map(id, sessions))))
+		self.assertTrue(all(session.closed for session in sessions))
+		self.assertEqual(0, len(self.transport._async_sessions))
+		
+		# An event loop closed without aclose() is forgotten by the next asynchronous request
+		loop = asyncio.new_event_loop()
+		self.assertEqual(b"<html>/async</html>", loop.run_until_complete(self.transport.aget(self.base_url + "/async")))
+		loop.close()
+		self.assertEqual(1, len(self.transport._async_sessions))
+		asyncio.run(get_text())
+		self.assertEqual(0, len(self.transport._async_sessions))
+
+	def test_invalid_pool_size(self):
+		self.assertRaises(ValueError, Transport, pool_size=0)
+
+	def test_get_default(self):
+		self.assertIs(Transport.get_default(), Transport.get_default())
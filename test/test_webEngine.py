@@ -1,13 +1,94 @@
 import argparse
+import asyncio
+import threading
+import time
+import urllib.parse
 from unittest import TestCase
 
 from PIL import Image
 
-from qr import WebEngine, assess_url
+from qr import WebEngine, WebResult, Transport, SerpCache, assess_url
 
 import matplotlib.pyplot as plt
 
 
+GOOGLE_PAGE = """<html><body><div id="search">
+<div class="g"><h3 class="r"><a href="/url?q=https://www.python.org/">Welcome to <b>Python</b>.org</a></h3>
+<div class="s"><span class="st"><span class="f"><span class="nobr">12 mars 2018</span> - </span>The official home of
+the <b>Python</b> Programming Language</span></div></div>
+<div class="g"><h3 class="r"><a href="/url?q=https://docs.python.org/3/library/pdb.html">pdb - The
+<b>Python</b> Debugger</a></h3>
+<div class="s"><span class="st">The module pdb defines an interactive source code debugger</span></div></div>
+</div></body></html>"""
+
+
+class StubTransport(Transport):
+	"""
+	Transport that answers every request with the same page, without any network access.
+	"""
+	
+	def __init__(self, page: str, chunk_size: int = 64):
+		super(StubTransport, self).__init__()
+		self.page = page
+		self.chunk_size = chunk_size
+		self.urls = []
+		self.chunks_read = 0
+	
+	def get(self, url, timeout=None):
+		self.urls.append(url)
+		return self.page.encode("utf-8")
+	
+	def iter_content(self, url, chunk_size=16384, timeout=None):
+		content = self.get(url, timeout)
+		for i in range(0, len(content), self.chunk_size):
+			self.chunks_read += 1
+			yield content[i:i + self.chunk_size]
+	
+	async def aget(self, url, timeout=None):
+		return self.get(url, timeout)
+
+
+class PagedTransport(StubTransport):
+	"""
+	Transport answering the result pages of Google with 'total' numbered results, 10 per page.
+	"""
+	
+	def __init__(self, total: int = 35):
+		super(PagedTransport, self).__init__("")
+		self.total = total
+	
+	def get(self, url, timeout=None):
+		self.urls.append(url)
+		start = int(urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("start", ["0"])[0])
+		items = ''.join('<div class="g"><h3 class="r"><a href="/url?q=https://www.python.org/{0}/">Result {0}</a>'
+		                '</h3></div>'.format(i) for i in range(start, min(start + 10, self.total)))
+		return "<html><body>{}</body></html>".format(items).encode("utf-8")
+
+
+class SlowPagedTransport(PagedTransport):
+	"""
+	PagedTransport taking 'delay' seconds per page, and recording the maximum number of pages downloaded at once.
+	"""
+	
+	def __init__(self, total: int = 35, delay: float = 0.05):
+		super(SlowPagedTransport, self).__init__(total)
+		self.delay = delay
+		self.in_flight = 0
+		self.max_in_flight = 0
+		self.lock = threading.Lock()
+	
+	def get(self, url, timeout=None):
+		with self.lock:
+			self.in_flight += 1
+			self.max_in_flight = max(self.max_in_flight, self.in_flight)
+		try:
+			time.sleep(self.delay)
+			return super(SlowPagedTransport, self).get(url, timeout)
+		finally:
+			with self.lock:
+				self.in_flight -= 1
+
+
 class TestWebEngine(TestCase):
 	
 	query1 = "python artificial intelligence tutorial"
@@ -29,6 +110,120 @@ class TestWebEngine(TestCase):
 		google = WebEngine.get_google()
 		self.assertEqual("Google", google.name)
 	
+	def test_get_search_url(self):
+		google = WebEngine.get_google()
+		self.assertEqual("python+debugger", google.normalize_keywords(["python", "debugger"]))
+		self.assertEqual("https://www.google.fr/search?q=python+debugger&ie=UTF-8&oe=UTF-8",
+		                 google.get_search_url("python debugger"))
+		self.assertEqual("python%20debugger", WebEngine.get_qwant().normalize_keywords("python debugger"))
+	
+	def test_parse_list_result(self):
+		google = WebEngine.get_google(transport=StubTransport(GOOGLE_PAGE))
+		items = google.search_list_result("python debugger")
+		self.assertEqual(2, len(items))
+		self.assertEqual("Welcome to Python.org", items[0].title)
+		self.assertEqual("https://www.google.com/url?q=https://www.python.org/", items[0].url)
+		self.assertEqual("12 mars 2018", items[0].date)
+		self.assertEqual(["https://www.google.fr/search?q=python+debugger&ie=UTF-8&oe=UTF-8"], google.transport.urls)
+	
+	def test_parser_backends(self):
+		expected = WebEngine.get_google().parse_list_result(GOOGLE_PAGE, "python")
+		for parser in ("lxml", "selectolax"):
+			try:
+				google = WebEngine(name="Google", home_url="https://www.google.com/",
+				                   pattern_search_url="https://www.google.fr/search?q={}", parser=parser)
+			except ImportError:
+				continue
+			self.assertEqual(parser, google.parser.name)
+			self.assertEqual(expected, google.parse_list_result(GOOGLE_PAGE, "python"))
+			self.assertEqual(2, len(google.parse_list_html(GOOGLE_PAGE, "python")))
+		self.assertRaises(ValueError, WebEngine.get_google().__setattr__, "parser", "unknown")
+	
+	def test_asearch_list_result(self):
+		google = WebEngine.get_google(transport=StubTransport(GOOGLE_PAGE))
+		
+		async def search_all():
+			return await asyncio.gather(*[google.asearch_list_result(query) for query in TestWebEngine.queries])
+		
+		results = asyncio.run(search_all())
+		self.assertEqual(2, len(results))
+		for items in results:
+			self.assertEqual(google.parse_list_result(GOOGLE_PAGE, "python"), items)
+	
+	def test_iter_results(self):
+		transport = StubTransport(GOOGLE_PAGE)
+		google = WebEngine.get_google(transport=transport)
+		self.assertEqual(google.parse_list_result(GOOGLE_PAGE, "python"), list(google.iter_results("python")))
+		total_chunks = transport.chunks_read
+		
+		transport.chunks_read = 0
+		results = google.iter_results("python")
+		self.assertEqual("Welcome to Python.org", next(results).title)
+		results.close()
+		self.assertLess(transport.chunks_read, total_chunks)
+	
+	def test_iter_deep_results(self):
+		transport = PagedTransport()
+		google = WebEngine.get_google(transport=transport)
+		self.assertEqual("https://www.google.fr/search?q=python&ie=UTF-8&oe=UTF-8&start=20",
+		                 google.get_page_url("python", 2))
+		self.assertEqual("https://www.bing.com/search?q=python&first=11", WebEngine.get_bing().get_page_url("python", 1))
+		
+		results = google.search_list_result("python", max_results=25)
+		self.assertEqual(["Result {}".format(i) for i in range(25)], [result.title for result in results])
+		self.assertEqual(3, len(transport.urls))
+		
+		# The walk stops at the first page without any new result
+		transport.urls = []
+		self.assertEqual(35, len(google.search_list_result("python", max_results=100)))
+		transport.total = 10
+		self.assertEqual(10, len(google.search_list_result("python", max_results=100)))
+		
+		# The caller can stop before the end, and the pages are cached
+		google.cache = SerpCache()
+		results = google.iter_deep_results("python", max_results=50)
+		self.assertEqual("Result 0", next(results).title)
+		results.close()
+		self.assertEqual(10, len(google.search_list_result("python", max_results=10)))
+		self.assertRaises(ValueError, google.search_list_result, "python", None, 0)
+		self.assertRaises(ValueError, next, google.iter_deep_results("python", prefetch_pages=0))
+		self.assertRaises(ValueError, WebEngine("Stub", "https://www.stub.com/", "https://www.stub.com/?q={}")
+		                  .get_page_url, "python", 1)
+	
+	def test_iter_deep_results_window(self):
+		# Several pages are downloaded at once, but not more than needed to reach max_results
+		for prefetch_pages, max_in_flight in ((1, 1), (3, 3)):
+			transport = SlowPagedTransport()
+			google = WebEngine.get_google(transport=transport)
+			results = list(google.iter_deep_results("python", max_results=100, prefetch_pages=prefetch_pages))
+			self.assertEqual(["Result {}".format(i) for i in range(35)], [result.title for result in results])
+			self.assertEqual(max_in_flight, transport.max_in_flight)
+		
+		transport = SlowPagedTransport()
+		google = WebEngine.get_google(transport=transport)
+		self.assertEqual(15, len(list(google.iter_deep_results("python", max_results=15, prefetch_pages=4))))
+		self.assertEqual(2, len(transport.urls))
+		
+		# The results without url cannot be told apart, so none of them is skipped
+		google = WebEngine.get_google(transport=PagedTransport())
+		parse_list_result = google.parse_list_result
+		google.parse_list_result = lambda content, keywords: [WebResult(result.title, None, None, "", "")
+		                                                      for result in parse_list_result(content, keywords)]
+		results = list(google.iter_deep_results("python", max_results=25))
+		self.assertEqual(["Result {}".format(i) for i in range(25)], [result.title for result in results])
+	
+	def test_search_list_result_many(self):
+		google = WebEngine.get_google(transport=StubTransport(GOOGLE_PAGE))
+		queries = ["query {}".format(i) for i in range(20)]
+		expected = google.parse_list_result(GOOGLE_PAGE, "python")
+		for parse_in_processes in (False, True):
+			found = []
+			for query, items in google.search_list_result_many(queries, max_workers=3,
+			                                                   parse_in_processes=parse_in_processes):
+				self.assertEqual(expected, items)
+				found.append(query)
+			self.assertEqual(sorted(queries), sorted(found))
+	
 	def test_search_html(self):
 		google = WebEngine.get_google()
 		for query in TestWebEngine.queries:
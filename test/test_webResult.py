@@ -0,0 +1,134 @@
+import os
+import threading
+from unittest import TestCase
+
+from PIL import Image
+
+from qr import WebResult, Transport, ThumbnailStore, prefetch_thumbnails
+
+
+class ImageTransport(Transport):
+	"""
+	Transport that answers every request with the test image, without any network access.
+	"""
+	
+	def __init__(self):
+		super(ImageTransport, self).__init__()
+		with open(os.path.join(os.path.dirname(__file__), "..", "res", "test", "test.png"), "rb") as f:
+			self.image = f.read()
+		self.urls = []
+		self.lock = threading.Lock()
+	
+	def get(self, url, timeout=None):
+		with self.lock:
+			self.urls.append(url)
+		if "missing" in url:
+			raise OSError("The image '{}' is missing".format(url))
+		return self.image
+
+
+class TestWebResult(TestCase):
+
+	def setUp(self):
+		self.transport = ImageTransport()
+		self.results = [WebResult(title="Result {}".format(i), url="https://www.python.org/{}".format(i),
+		                          thumbnail="https://www.python.org/static/{}.png".format(i), date="",
+		                          description="", transport=self.transport) for i in range(10)]
+	
+	def test_lazy_thumbnail(self):
+		result = self.results[0]
+		self.assertFalse(result.is_thumbnail_downloaded)
+		self.assertEqual("https://www.python.org/static/0.png", str(result).split("thumbnail='")[1].split("'")[0])
+		self.assertEqual([], self.transport.urls)
+		
+		self.assertIsInstance(result.thumbnail, Image.Image)
+		self.assertIsInstance(result.thumbnail, Image.Image)
+		self.assertTrue(result.is_thumbnail_downloaded)
+		self.assertEqual(["https://www.python.org/static/0.png"], self.transport.urls)
+	
+	def test_invalid_thumbnail_url(self):
+		result = WebResult(title="", url="", thumbnail="data:image/png;base64,", date="", description="",
+		                   transport=self.transport)
+		self.assertEqual("data:image/png;base64,", result.thumbnail)
+		self.assertEqual([], self.transport.urls)
+	
+	def test_failed_thumbnail(self):
+		result = WebResult(title="", url="", thumbnail="https://www.python.org/static/missing.png", date="",
+		                   description="", transport=self.transport)
+		self.assertEqual("https://www.python.org/static/missing.png", result.thumbnail)
+		self.assertIsInstance(result.thumbnail_error, OSError)
+		# The failure is remembered
+		self.assertEqual("https://www.python.org/static/missing.png", result.thumbnail)
+		prefetch_thumbnails([result])
+		self.assertEqual(1, len(self.transport.urls))
+		
+		self.assertRaises(OSError, result.force_download_thumbnail)
+		self.assertEqual(2, len(self.transport.urls))
+		result.thumbnail = "https://www.python.org/static/0.png"
+		self.assertIsNone(result.thumbnail_error)
+		self.assertIsInstance(result.thumbnail, Image.Image)
+	
+	def test_prefetch_thumbnails(self):
+		prefetch_thumbnails(self.results, max_workers=4)
+		self.assertEqual(10, len(self.transport.urls))
+		self.assertTrue(all(result.is_thumbnail_downloaded for result in self.results))
+		
+		prefetch_thumbnails(self.results)
+		self.assertEqual(10, len(self.transport.urls))
+	
+	def test_frozen_thumbnail(self):
+		# A snapshot is never modified, so its thumbnail is not downloaded
+		frozen = self.results[0].freeze()
+		self.assertEqual("https://www.python.org/static/0.png", frozen.thumbnail)
+		self.assertRaises(AttributeError, frozen.force_download_thumbnail)
+		prefetch_thumbnails([frozen])
+		self.assertEqual([], self.transport.urls)
+		self.assertRaises(AttributeError, setattr, frozen, "thumbnail", None)
+		
+		self.assertIsInstance(self.results[0].thumbnail, Image.Image)
+		self.assertIsInstance(self.results[0].freeze().thumbnail, Image.Image)
+	
+	def test_thumbnail_store(self):
+		store = ThumbnailStore(max_size=(8, 8))
+		urls = ["https://www.python.org/static/favicon.png"] * 5 + ["https://www.python.org/static/logo.png"] * 5
+		results = [WebResult(title="", url="", thumbnail=url, date="", description="", transport=self.transport,
+		                     thumbnail_store=store) for url in urls]
+		prefetch_thumbnails(results)
+		
+		self.assertEqual(2, len(set(self.transport.urls)))
+		self.assertEqual(2, store.downloads)
+		# Both urls have the same content
+		self.assertEqual(1, len(store))
+		self.assertIs(results[0].thumbnail, results[9].thumbnail)
+		self.assertLessEqual(results[0].thumbnail.width, 8)
+		self.assertLessEqual(results[0].thumbnail.height, 8)
+		# The results only keep the url, the decoded images are kept by the store
+		self.assertTrue(results[0].is_thumbnail_downloaded)
+		self.assertIn("thumbnail='{}'".format(urls[0]), str(results[0]))
+		self.assertIs(results[0].thumbnail, results[0].freeze().thumbnail)
+		self.assertEqual(2, store.downloads)
+	
+	def test_thumbnail_store_errors(self):
+		store = ThumbnailStore()
+		frozen = WebResult(title="", url="", thumbnail="https://www.python.org/static/0.png", date="", description="",
+		                   transport=self.transport, thumbnail_store=store).freeze()
+		self.assertEqual("https://www.python.org/static/0.png", frozen.thumbnail)
+		prefetch_thumbnails([frozen])
+		self.assertIsInstance(frozen.thumbnail, Image.Image)
+		self.assertEqual(1, store.downloads)
+		
+		# A content that is no longer stored is downloaded again
+		store.memory_cache.clear()
+		store._connection.execute("DELETE FROM blobs")
+		self.assertIsInstance(store.get_image("https://www.python.org/static/0.png", self.transport), Image.Image)
+		self.assertEqual(2, store.downloads)
+		
+		self.assertRaises(OSError, store.get_image, "https://www.python.org/static/missing.png", self.transport)
+		self.assertEqual(3, len(self.transport.urls))
+		# The urls that cannot be downloaded do not keep their lock
+		self.assertEqual({}, store._url_locks)
+	
+	def test_slots(self):
+		self.assertFalse(hasattr(self.results[0], "__dict__"))
+		self.assertFalse(hasattr(self.results[0].freeze(), "__dict__"))
+		self.assertRaises(AttributeError, setattr, self.results[0], "rank", 1)
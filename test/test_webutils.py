@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from qr import assess_url, assess_urls, normalize_text, HtmlParser
+from qr.webutils import _URL_REGEX, _ENTITIES_CACHE_SIZE, _decode_entity
+
+
+class TestWebUtils(TestCase):
+
+	def setUp(self):
+		self.valid = ["https://www.google.com", "http://localhost:8080/search?q=python", "www.python.org",
+		              "ftp://127.0.0.1/file", "://example.com", "HTTPS://WWW.PYTHON.ORG/", "example.com/?u=http://a.b"]
+		self.invalid = ["", "#", "#top", "/search?q=a.b", "javascript:void(0)", "mailto:someone@example.com",
+		                "file://a.b", "a.com://b", "https://", "python debugger", "https://www.python.org/a b",
+		                "data:image/png;base64,", "http://[::1"]
+	
+	def test_assess_url(self):
+		for url in self.valid:
+			self.assertTrue(assess_url(url), url)
+		for url in self.invalid:
+			self.assertFalse(assess_url(url), url)
+			# The prefilter must never reject an url that the regex accepts
+			self.assertEqual(_URL_REGEX.match(url) is not None, assess_url(url), url)
+	
+	def test_assess_urls(self):
+		urls = self.valid + self.invalid + self.valid
+		self.assertEqual([assess_url(url) for url in urls], assess_urls(urls))
+		self.assertEqual([], assess_urls([]))
+	
+	def test_normalize_text(self):
+		self.assertEqual("Python & debugger\nText", normalize_text("<b>Python</b>  &amp;\n<i>debugger</i><br/>Text", True))
+		self.assertEqual("Python & debugger Text", normalize_text("<b>Python</b>  &amp;\n<i>debugger</i><br/>Text"))
+		self.assertEqual("a b\n\nc", normalize_text(" a <b> b</b> <br> <br/> c ", True))
+		self.assertEqual("1 < 2 & 3", normalize_text("1 < 2 & 3"))
+		self.assertEqual("already stripped text", normalize_text("  already \n stripped\ttext "))
+		self.assertEqual("", normalize_text("<p></p>"))
+		
+		# The numeric entities are unbounded, but the decoded entities that are kept are not
+		entities = "".join("&#{};".format(i) for i in range(256, 3256))
+		self.assertEqual("".join(map(chr, range(256, 3256))), normalize_text(entities))
+		self.assertLessEqual(_decode_entity.cache_info().currsize, _ENTITIES_CACHE_SIZE)
+	
+	def test_normalize_node(self):
+		fragment = "<div> Python <b>deb</b>ugger<br/> pdb &amp; ipdb<!-- comment --></div>"
+		for parser in ("html.parser", "selectolax"):
+			backend = HtmlParser.get(parser)
+			node = backend.select_one(backend.parse(fragment), "div")
+			self.assertEqual("Python debugger\npdb & ipdb", normalize_text(node, True, parser))
+			self.assertEqual("Python debugger pdb & ipdb", normalize_text(node, parser=backend))